@@ -0,0 +1,169 @@
+"""
+Declarative badge rules evaluated against already-loaded aggregates.
+
+Each badge owns a fixed bit in `Student.badge_mask`, so whether it is
+unlocked is checked in memory on the student row the event path has already
+loaded. Rules read only the aggregates that path has just updated: the
+student, that day's session and `student_daily_stats` row, and the mastery
+row of the answered skill. Evaluating every rule therefore adds no queries
+per event, and adding a badge means adding a `BadgeRule` here and running
+`scripts/reevaluate_badges.py`.
+
+Bits are permanent: never reuse or renumber one, only append.
+"""
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import Achievement, DailySession, Mastery, Student, StudentDailyStats
+
+
+class BadgeContext:
+    """Aggregates a rule may look at; any of the optional ones may be missing."""
+
+    def __init__(
+        self,
+        student: Student,
+        daily_session: Optional[DailySession] = None,
+        daily_stats: Optional[StudentDailyStats] = None,
+        mastery: Optional[Mastery] = None,
+    ):
+        self.student = student
+        self.daily_session = daily_session
+        self.daily_stats = daily_stats
+        self.mastery = mastery
+
+
+def _daily_answers(context: BadgeContext) -> Optional[float]:
+    return context.daily_stats.events_total if context.daily_stats else None
+
+
+def _daily_accuracy(context: BadgeContext) -> Optional[float]:
+    stats = context.daily_stats
+    if not stats or not stats.events_total:
+        return None
+    return stats.correct_total / stats.events_total
+
+
+def _daily_seconds_per_answer(context: BadgeContext) -> Optional[float]:
+    stats = context.daily_stats
+    if not stats or not stats.events_total:
+        return None
+    return stats.time_spent_total / stats.events_total
+
+
+# Quantities rules can put thresholds on; None means "not known here"
+METRICS: Dict[str, Callable[[BadgeContext], Optional[float]]] = {
+    # longest_streak covers re-evaluation, where current_streak may have lapsed
+    "streak_days": lambda context: max(context.student.current_streak or 0, context.student.longest_streak or 0),
+    "total_answers": lambda context: context.student.total_sessions,
+    "daily_goal_completed": lambda context: (
+        float(context.daily_session.is_completed) if context.daily_session else None
+    ),
+    "daily_answers": _daily_answers,
+    "daily_accuracy": _daily_accuracy,
+    "daily_seconds_per_answer": _daily_seconds_per_answer,
+    "skill_mastery": lambda context: context.mastery.mastery_score if context.mastery else None,
+    "skill_attempts": lambda context: context.mastery.total_attempts if context.mastery else None,
+}
+
+
+class BadgeRule:
+    """A badge unlocked once every `at_least` / `at_most` threshold holds."""
+
+    def __init__(
+        self,
+        key: str,
+        bit: int,
+        title: str,
+        description: str,
+        at_least: Optional[Dict[str, float]] = None,
+        at_most: Optional[Dict[str, float]] = None,
+    ):
+        for metric in {**(at_least or {}), **(at_most or {})}:
+            if metric not in METRICS:
+                raise ValueError(f"Badge {key} uses unknown metric {metric}")
+        self.key = key
+        self.bit = bit
+        self.mask = 1 << bit
+        self.title = title
+        self.description = description
+        self.at_least = at_least or {}
+        self.at_most = at_most or {}
+
+    def matches(self, context: BadgeContext) -> bool:
+        for metric, threshold in self.at_least.items():
+            value = METRICS[metric](context)
+            if value is None or value < threshold:
+                return False
+        for metric, threshold in self.at_most.items():
+            value = METRICS[metric](context)
+            if value is None or value > threshold:
+                return False
+        return True
+
+
+BADGE_RULES: Tuple[BadgeRule, ...] = (
+    BadgeRule("streak_3", 0, "连续3天", "连续练习 3 天", at_least={"streak_days": 3}),
+    BadgeRule("streak_7", 1, "连续7天", "连续练习 7 天", at_least={"streak_days": 7}),
+    BadgeRule("daily_goal_1", 2, "今日达标", "首次完成每日目标", at_least={"daily_goal_completed": 1}),
+    BadgeRule("sessions_20", 3, "练习达人", "累计完成 20 次答题", at_least={"total_answers": 20}),
+    BadgeRule(
+        "accuracy_90", 4, "神射手", "一天内答题 10 道以上且正确率达到 90%",
+        at_least={"daily_answers": 10, "daily_accuracy": 0.9},
+    ),
+    BadgeRule(
+        "quick_10", 5, "闪电手", "一天内答题 10 道以上、正确率 80% 以上且平均每题不超过 10 秒",
+        at_least={"daily_answers": 10, "daily_accuracy": 0.8},
+        at_most={"daily_seconds_per_answer": 10},
+    ),
+    BadgeRule(
+        "skill_master_1", 6, "技能大师", "首次掌握一项技能",
+        at_least={
+            "skill_mastery": settings.skill_mastery_threshold,
+            "skill_attempts": settings.skill_mastery_min_attempts,
+        },
+    ),
+)
+
+BADGES_BY_KEY: Dict[str, BadgeRule] = {rule.key: rule for rule in BADGE_RULES}
+
+if len({rule.bit for rule in BADGE_RULES}) != len(BADGE_RULES):
+    raise ValueError("Badge rules must each have their own bit")
+
+
+def badge_mask_for(badge_keys) -> int:
+    """Bitset of the given badge keys; keys without a rule are ignored."""
+    mask = 0
+    for badge_key in badge_keys:
+        rule = BADGES_BY_KEY.get(badge_key)
+        if rule:
+            mask |= rule.mask
+    return mask
+
+
+def evaluate(context: BadgeContext) -> List[BadgeRule]:
+    """Rules newly satisfied in `context` that the student hasn't unlocked yet."""
+    unlocked = context.student.badge_mask or 0
+    return [rule for rule in BADGE_RULES if not unlocked & rule.mask and rule.matches(context)]
+
+
+def grant_badges(db: Session, context: BadgeContext, unlocked_at: datetime) -> List[BadgeRule]:
+    """Unlock every newly satisfied badge: set its bit and add its Achievement row."""
+    granted = evaluate(context)
+    for rule in granted:
+        context.student.badge_mask = (context.student.badge_mask or 0) | rule.mask
+        db.add(
+            Achievement(
+                id=str(uuid4()),
+                student_id=context.student.id,
+                badge_key=rule.key,
+                title=rule.title,
+                description=rule.description,
+                unlocked_at=unlocked_at,
+            )
+        )
+    return granted
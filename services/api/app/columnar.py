@@ -0,0 +1,93 @@
+"""
+Compressed columnar files for archived and exported events.
+
+Parquet (zstd) when pyarrow is installed, otherwise NumPy's compressed `.npz`
+with one array per column. Neither is a hard dependency of the API, so they
+are only needed by the commands that write these files. Parquet is written
+one row group per chunk; the `.npz` fallback holds a file's rows in memory
+until it is closed.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def available() -> bool:
+    return pa is not None or np is not None
+
+
+def file_suffix() -> str:
+    return ".parquet" if pa is not None else ".npz"
+
+
+class ColumnarWriter:
+    """Append row chunks to one columnar file at `stem` + `file_suffix()`."""
+
+    def __init__(self, stem: Path, columns: Sequence[str]):
+        if not available():
+            raise RuntimeError("Columnar files need pyarrow (Parquet) or numpy (.npz): pip install pyarrow")
+        self.path = Path(f"{stem}{file_suffix()}")
+        self.columns = list(columns)
+        self.rows = 0
+        self._parquet = None
+        self._buffered: Dict[str, list] = {name: [] for name in self.columns}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def write(self, rows: List[tuple]) -> None:
+        """Append rows given as tuples in `columns` order."""
+        if not rows:
+            return
+        self.rows += len(rows)
+        chunk = {name: [row[index] for row in rows] for index, name in enumerate(self.columns)}
+        if pa is None:
+            for name, values in chunk.items():
+                self._buffered[name].extend(values)
+            return
+        table = pa.table(chunk)
+        if self._parquet is None:
+            self._parquet = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+        self._parquet.write_table(table)
+
+    def close(self) -> Path:
+        if pa is None:
+            np.savez_compressed(self.path, **{name: _array(values) for name, values in self._buffered.items()})
+            self._buffered = {name: [] for name in self.columns}
+        elif self._parquet is not None:
+            self._parquet.close()
+        else:
+            pq.write_table(pa.table({name: [] for name in self.columns}), self.path, compression="zstd")
+        return self.path
+
+
+def read_columns(path: Path) -> Dict[str, list]:
+    """Load a file written by `ColumnarWriter` back into {column: values}."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        if pq is None:
+            raise RuntimeError("Reading Parquet needs pyarrow: pip install pyarrow")
+        return pq.read_table(path).to_pydict()
+    if np is None:
+        raise RuntimeError("Reading .npz needs numpy: pip install numpy")
+    with np.load(path) as data:
+        return {name: data[name].tolist() for name in data.files}
+
+
+def _array(values: list):
+    """NumPy array without object dtype, so loading never needs pickle."""
+    present = [value for value in values if value is not None]
+    if present and all(isinstance(value, datetime) for value in present):
+        return np.array(values, dtype="datetime64[us]")
+    if all(isinstance(value, (bool, int, float)) for value in present) and len(present) == len(values):
+        return np.array(values)
+    return np.array(["" if value is None else str(value) for value in values])
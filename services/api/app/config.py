@@ -8,7 +8,57 @@ class Settings(BaseSettings):
     sqlite_fallback: str = f"sqlite:///{(Path(__file__).resolve().parents[1] / 'mathcoach.db').as_posix()}"
     api_title: str = "MathCoach API"
     api_version: str = "0.1.0"
-    debug: bool = True
+    debug: bool = False
+    # Engine / pool tuning (pool sizing applies to server databases such as Postgres)
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_pre_ping: bool = True
+    db_pool_recycle_seconds: int = 1800
+    db_statement_timeout_ms: int = 5000
+    # Apply pending migrations when the API starts; turn off where a deploy step runs scripts/migrate.py
+    db_migrate_on_startup: bool = True
+    # Rows per committed batch in online data backfills
+    db_migration_batch_size: int = 1000
+    # Pragmas applied to every connection of the SQLite fallback database
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    sqlite_busy_timeout_ms: int = 5000
+    # Per-request SQL counters, Server-Timing headers and /metrics
+    metrics_enabled: bool = True
+    item_index_refresh_seconds: float = 60.0
+    item_cache_max_entries: int = 5000
+    # Recently recorded event ids remembered per process to answer client retries without a query
+    event_dedup_cache_size: int = 100_000
+    # Extra attempts when concurrent event writes collide on a unique key
+    event_write_retries: int = 2
+    # Write-behind: /events only appends the event; a background worker applies aggregates
+    event_write_behind: bool = False
+    event_outbox_batch_size: int = 200
+    event_outbox_poll_seconds: float = 1.0
+    # Queue depth at which submitters drain a batch themselves, bounding the lag
+    event_outbox_max_pending: int = 5000
+    # Event storage by month (app/event_store.py): months kept in the SQLite `events` table
+    # before they move to shard tables, and Postgres partitions created ahead of time
+    event_hot_months: int = 3
+    event_partition_months_ahead: int = 3
+    # scripts/archive_events.py: months older than this are exported to files and dropped
+    event_archive_after_months: int = 12
+    event_archive_dir: str = str(Path(__file__).resolve().parents[1] / "archive" / "events")
+    # scripts/export_events.py: read from a replica when set, so exports never load the primary
+    analytics_database_url: Optional[str] = None
+    analytics_export_dir: str = str(Path(__file__).resolve().parents[1] / "export" / "events")
+    mastery_engine: str = "bkt"
+    mastery_decay_half_life_days: float = 30.0
+    # Skill tree compiled into the prerequisite graph at startup
+    skill_tree_path: str = str(Path(__file__).resolve().parents[2] / "content" / "output" / "skill_tree_v0.json")
+    # Decayed mastery score at which a skill counts as mastered for unlocking others
+    skill_mastery_threshold: float = 0.8
+    # ...and the fewest answers on it before the score is trusted; BKT and Elo pass
+    # the threshold after two or three correct answers
+    skill_mastery_min_attempts: int = 5
 
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False)
 
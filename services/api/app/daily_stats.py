@@ -0,0 +1,42 @@
+"""
+Helpers for the `student_daily_stats` rollup.
+
+The event write path and the backfill script both fold events in through
+`record_event`, so the rollup is identical however it was built.
+"""
+from datetime import date
+from typing import Optional
+
+from .models import StudentDailyStats
+
+
+def new_daily_stats(student_id: str, stat_date: date) -> StudentDailyStats:
+    return StudentDailyStats(
+        student_id=student_id,
+        stat_date=stat_date,
+        events_total=0,
+        correct_total=0,
+        time_spent_total=0.0,
+        hints_total=0,
+        skill_counts={},
+    )
+
+
+def record_event(
+    stats: StudentDailyStats,
+    is_correct: bool,
+    time_spent: float,
+    hint_requested: bool,
+    skill_id: Optional[str],
+) -> None:
+    stats.events_total += 1
+    stats.correct_total += 1 if is_correct else 0
+    stats.time_spent_total += time_spent or 0.0
+    stats.hints_total += 1 if hint_requested else 0
+
+    if skill_id:
+        # Reassign a copy so SQLAlchemy notices the JSON change
+        skill_counts = dict(stats.skill_counts or {})
+        attempts, correct = skill_counts.get(skill_id, (0, 0))
+        skill_counts[skill_id] = [attempts + 1, correct + (1 if is_correct else 0)]
+        stats.skill_counts = skill_counts
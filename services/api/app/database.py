@@ -1,17 +1,108 @@
-from sqlalchemy import create_engine
+from typing import Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from .config import settings
-from .models.student import Base
+from .migrations import migrate
+
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_db_url(db_url: str) -> str:
+    """Same database as `db_url`, addressed through its asyncio driver."""
+    url = make_url(db_url)
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+    return url.render_as_string(hide_password=False)
+
+
+def _engine_options(db_url: str, statement_timeout_ms: Optional[int] = None) -> dict:
+    """
+    create_engine / create_async_engine keyword arguments for the configured database.
+
+    `statement_timeout_ms` defaults to `settings.db_statement_timeout_ms`, sent
+    only when set. Given explicitly it is always sent, so 0 also lifts a
+    timeout configured on the Postgres role or database.
+    """
+    options = {"echo": settings.db_echo}
+    if db_url.startswith("sqlite"):
+        # SQLite keeps SQLAlchemy's default pool; pool sizing only matters for server databases
+        options["connect_args"] = {
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout_ms / 1000,
+        }
+        return options
+
+    options.update(
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle=settings.db_pool_recycle_seconds,
+    )
+    if statement_timeout_ms is None:
+        if settings.db_statement_timeout_ms <= 0:
+            return options
+        statement_timeout_ms = settings.db_statement_timeout_ms
+    if db_url.startswith("postgresql+asyncpg"):
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(statement_timeout_ms)}}
+    elif db_url.startswith("postgresql"):
+        options["connect_args"] = {"options": f"-c statement_timeout={statement_timeout_ms}"}
+    return options
+
+
+def _sqlite_pragmas() -> dict:
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+    }
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma, value in _sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {pragma}={value}")
+    finally:
+        cursor.close()
+
 
 # Create engine with SQLite fallback
-engine = create_engine(
-    settings.db_url,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.db_url else {},
-    echo=settings.debug
-)
+engine = create_engine(settings.db_url, **_engine_options(settings.db_url))
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", apply_sqlite_pragmas)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Same database without a statement timeout, for migrations and the scripts
+# in scripts/: a month-long copy or an index build must not be cancelled at
+# the request timeout. Connects only when used.
+maintenance_engine = create_engine(settings.db_url, **_engine_options(settings.db_url, statement_timeout_ms=0))
+
+if maintenance_engine.dialect.name == "sqlite":
+    event.listen(maintenance_engine, "connect", apply_sqlite_pragmas)
+
+MaintenanceSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=maintenance_engine)
+
+# Async engine on the same database for routers that must not block the event loop
+async_engine = create_async_engine(async_db_url(settings.db_url), **_engine_options(async_db_url(settings.db_url)))
+
+if async_engine.dialect.name == "sqlite":
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+
+# expire_on_commit=False: attributes can't be lazily reloaded outside the greenlet
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     """Dependency for FastAPI to get DB session."""
@@ -22,6 +113,45 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """
+    Dependency for FastAPI to get an AsyncSession.
+
+    Routers either query it directly or hand existing sync helpers to
+    `await db.run_sync(helper, ...)`, which runs them without blocking the loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
-    """Initialize database tables."""
-    Base.metadata.create_all(bind=engine)
+    """Create or upgrade the database schema to the latest migration, without a statement timeout."""
+    try:
+        return migrate(maintenance_engine)
+    finally:
+        # The API only migrates at startup; don't keep the connection
+        maintenance_engine.dispose()
+
+
+def describe_engine() -> dict:
+    """Effective engine and pool settings, for the startup report."""
+    report = {
+        "dialect": engine.dialect.name,
+        "driver": engine.dialect.driver,
+        "database": engine.url.render_as_string(hide_password=True),
+        "pool": type(engine.pool).__name__,
+        "echo": bool(engine.echo),
+    }
+    if engine.dialect.name == "sqlite":
+        report["pragmas"] = _sqlite_pragmas()
+        return report
+
+    report.update(
+        pool_size=engine.pool.size(),
+        max_overflow=settings.db_max_overflow,
+        pool_timeout_seconds=settings.db_pool_timeout_seconds,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        pool_recycle_seconds=settings.db_pool_recycle_seconds,
+        statement_timeout_ms=settings.db_statement_timeout_ms,
+    )
+    return report
@@ -0,0 +1,58 @@
+"""
+Bounded LRU set of recently recorded event ids.
+
+Mobile clients resend an event whenever a request times out, so the same
+event_id often arrives again within seconds. Ids are remembered once their
+write commits, and a retry that hits this set is answered without touching
+the database. The set is per process and forgets old ids, so it is only a
+fast path: the event_ids primary key stays the source of truth, and a miss
+falls through to an insert that fails on a duplicate id.
+"""
+import threading
+from collections import OrderedDict
+from typing import Iterable
+
+from .config import settings
+
+
+class RecentEventIds:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._ids = OrderedDict()
+        self._lock = threading.Lock()
+
+    def seen(self, event_id: str) -> bool:
+        with self._lock:
+            if event_id in self._ids:
+                self._ids.move_to_end(event_id)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, event_ids: Iterable[str]) -> None:
+        with self._lock:
+            for event_id in event_ids:
+                self._ids[event_id] = None
+                self._ids.move_to_end(event_id)
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ids.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._ids),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+recent_event_ids = RecentEventIds(max_entries=settings.event_dedup_cache_size)
@@ -0,0 +1,134 @@
+"""
+Write-behind worker for event aggregate updates.
+
+With `settings.event_write_behind` on, `POST /events` only inserts the raw
+event plus an `event_outbox` row in one short transaction and returns. This
+asyncio task then drains the outbox in arrival order and in batches of
+`event_outbox_batch_size`, applying the streak, daily-session, mastery,
+review-schedule and badge updates through the same code as the batch endpoint.
+
+The outbox is a table, so queued work survives a restart and is picked up by
+the next drain. Each drain deletes (claims) its rows before applying them and
+gives up if another process got there first, so several API processes can run
+a worker against one database. Lag stays bounded: once
+`event_outbox_max_pending` events are queued, submitters drain a batch
+themselves before enqueueing.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Optional
+
+from .config import settings
+from .database import AsyncSessionLocal
+
+log = logging.getLogger("uvicorn.error")
+
+
+class OutboxWorker:
+    def __init__(self, drain: Callable, batch_size: int, poll_seconds: float, max_pending: int):
+        # drain(db, batch_size) -> {"applied", "pending", "oldest_enqueued_at"}; commits
+        self.drain = drain
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_pending = max_pending
+        self.pending = 0
+        self.oldest_enqueued_at: Optional[datetime] = None
+        self.applied_total = 0
+        self.batches_total = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def backlogged(self) -> bool:
+        return self.pending >= self.max_pending
+
+    def lag_seconds(self, now: Optional[datetime] = None) -> float:
+        """Age of the oldest event whose aggregates are still pending."""
+        if not self.pending or self.oldest_enqueued_at is None:
+            return 0.0
+        return max(((now or datetime.now()) - self.oldest_enqueued_at).total_seconds(), 0.0)
+
+    def enqueued(self, count: int, at: datetime) -> None:
+        """Note `count` events queued by a committed request and wake the worker."""
+        if not count:
+            return
+        if not self.pending:
+            self.oldest_enqueued_at = at
+        self.pending += count
+        if self._wake is not None:
+            self._wake.set()
+
+    async def drain_once(self) -> int:
+        """Apply one batch; returns how many events it applied."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                state = await db.run_sync(self.drain, self.batch_size)
+        self.pending = state["pending"]
+        self.oldest_enqueued_at = state["oldest_enqueued_at"]
+        self.applied_total += state["applied"]
+        self.batches_total += 1 if state["applied"] else 0
+        return state["applied"]
+
+    async def flush(self) -> int:
+        """Drain until the outbox is empty; returns how many events were applied."""
+        applied = 0
+        while True:
+            batch = await self.drain_once()
+            applied += batch
+            if not self.pending:
+                return applied
+            if not batch:
+                # Another process claimed the head of the queue; let it finish
+                await asyncio.sleep(self.poll_seconds / 10)
+
+    def start(self) -> None:
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                applied = await self.drain_once()
+            except Exception:
+                log.exception("Event outbox drain failed; retrying in %.1fs", self.poll_seconds)
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            if applied and self.pending:
+                continue
+            # Idle: sleep until a request enqueues something, polling in case
+            # another process left work behind
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.event_write_behind,
+            "running": self.running,
+            "pending": self.pending,
+            "lag_seconds": round(self.lag_seconds(), 3),
+            "max_pending": self.max_pending,
+            "batch_size": self.batch_size,
+            "applied_total": self.applied_total,
+            "batches_total": self.batches_total,
+        }
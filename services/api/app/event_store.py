@@ -0,0 +1,378 @@
+"""
+Month-partitioned event storage.
+
+`events` only ever grows, so its rows are grouped by calendar month of
+`timestamp`:
+
+- Postgres: `events` is range-partitioned (migration 7) into `events_YYYY_MM`
+  partitions plus `events_default`, which catches rows for months that have
+  no partition yet. ORM inserts land in the right partition, and the planner
+  only reads the months a timestamp-bounded query covers.
+- SQLite has no partitioning. `events` keeps the last `event_hot_months`
+  months, and `seal_cold_months` moves older months into `events_YYYY_MM`
+  shard tables with the same columns.
+
+Routers keep reading and writing `Event` unchanged: the windows they query
+(today, the last week) are always in the hot table. Neither layout keeps
+event ids unique on its own (the Postgres primary key is (id, timestamp)), so
+every write also inserts the id into the unpartitioned `event_ids` table,
+which is never sealed or archived. Code that reads history (rebuilds,
+backfills, exports) selects from `event_source(db, start, end)`, which
+includes only the shards overlapping that range.
+
+Months older than the retention period are exported by `archive_month` to a
+compressed columnar file and then dropped. The `student_daily_stats` rollup,
+mastery rows and review schedules are derived state and are kept, so reports
+over archived months keep working. `event_partitions` records which months are
+sealed or archived.
+
+Late events for a sealed month land in `events` and are moved on the next
+seal.
+"""
+from datetime import date, datetime, time
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Column, Index, MetaData, Table, and_, func, inspect, select, text, union_all
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from .columnar import ColumnarWriter
+from .config import settings
+from .models import Event, EventOutbox, EventPartition
+
+ARCHIVE_CHUNK_SIZE = 5000
+
+EVENT_COLUMNS = [column.name for column in Event.__table__.columns]
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    """[start, end) of `month` as naive datetimes, like `Event.timestamp`."""
+    return datetime.combine(month, time.min), datetime.combine(add_months(month, 1), time.min)
+
+
+def partition_name(month: date) -> str:
+    return f"events_{month:%Y_%m}"
+
+
+def hot_window_start(today: Optional[date] = None) -> date:
+    """First month kept in the SQLite `events` table."""
+    return add_months(month_start(today or date.today()), -(settings.event_hot_months - 1))
+
+
+@lru_cache(maxsize=None)
+def _like_events(name: str) -> Table:
+    """A table with the columns of `events` (and its student/time and received_at indexes, if created)."""
+    table = Table(
+        name,
+        MetaData(),
+        *(Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+          for column in Event.__table__.columns),
+    )
+    Index(f"ix_{name}_student_timestamp", table.c.student_id, table.c.timestamp)
+    Index(f"ix_{name}_received_at", table.c.received_at)
+    return table
+
+
+def shard_table(month: date) -> Table:
+    """SQLite shard (or Postgres partition) holding one month of events."""
+    return _like_events(partition_name(month))
+
+
+def _months_before(conn: Connection, table: Table, before: datetime) -> List[date]:
+    """Distinct months of `table.timestamp` before `before`, grouped in the database."""
+    if conn.dialect.name == "postgresql":
+        month = func.date_trunc("month", table.c.timestamp)
+    else:
+        month = func.strftime("%Y-%m-01", table.c.timestamp)
+    values = conn.scalars(select(month).where(table.c.timestamp < before).group_by(month))
+    return sorted(value.date() if isinstance(value, datetime) else date.fromisoformat(value) for value in values)
+
+
+def sealed_months(db) -> List[date]:
+    return list(db.scalars(
+        select(EventPartition.month).where(EventPartition.state == "sealed").order_by(EventPartition.month)
+    ))
+
+
+def archived_months(db) -> List[date]:
+    return list(db.scalars(
+        select(EventPartition.month).where(EventPartition.state == "archived").order_by(EventPartition.month)
+    ))
+
+
+def event_source(db: Session, start: Optional[datetime] = None, end: Optional[datetime] = None):
+    """
+    Every stored event with `start <= timestamp < end` (either bound optional)
+    as one FROM clause with the columns of `events`. Callers still filter on
+    `timestamp` themselves.
+
+    On Postgres, and for ranges inside the hot window, this is `events` itself
+    and costs no query. Otherwise the sealed SQLite shards overlapping the
+    range are unioned in.
+    """
+    events = Event.__table__
+    if db.get_bind().dialect.name != "sqlite":
+        return events
+    if start is not None and start >= datetime.combine(hot_window_start(), time.min):
+        return events
+
+    shards = []
+    for month in sealed_months(db):
+        month_begin, month_end = month_bounds(month)
+        if (start is None or month_end > start) and (end is None or month_begin < end):
+            shards.append(shard_table(month))
+    if not shards:
+        return events
+    return union_all(select(events), *(select(shard) for shard in shards)).subquery("events")
+
+
+def flush_replayed(db: Session, rows: dict) -> int:
+    """
+    Insert the rows a rebuild folded from one student's events, then detach
+    them so the session stays small while streaming. Returns how many.
+    """
+    if not rows:
+        return 0
+    db.add_all(rows.values())
+    db.flush()
+    for row in rows.values():
+        db.expunge(row)
+    return len(rows)
+
+
+def _pending_aggregates(conn: Connection, month: date) -> int:
+    """Events of `month` whose write-behind aggregates haven't been applied yet."""
+    events, outbox = Event.__table__, EventOutbox.__table__
+    month_begin, month_end = month_bounds(month)
+    return conn.execute(
+        select(func.count())
+        .select_from(outbox.join(events, events.c.id == outbox.c.event_id))
+        .where(events.c.timestamp >= month_begin, events.c.timestamp < month_end)
+    ).scalar()
+
+
+def _set_partition(conn: Connection, month: date, state: str, rows: int, archived_path: str = None) -> None:
+    partitions = EventPartition.__table__
+    existing = conn.execute(
+        select(partitions.c.state, partitions.c.row_count).where(partitions.c.month == month)
+    ).first()
+    # A month archived again (late events) adds to its archived total
+    already_archived = existing is not None and existing.state == state == "archived"
+    values = {
+        "state": state,
+        "table_name": partition_name(month),
+        "updated_at": datetime.now(),
+        "row_count": rows + (existing.row_count if already_archived else 0),
+    }
+    if archived_path is not None:
+        values["archived_path"] = archived_path
+    if existing:
+        conn.execute(partitions.update().where(partitions.c.month == month).values(**values))
+    else:
+        conn.execute(partitions.insert().values(month=month, **values))
+
+
+# --- SQLite shards ------------------------------------------------------------
+
+
+def seal_cold_months(bind, today: Optional[date] = None) -> List[Tuple[date, int]]:
+    """
+    Move months before the hot window from `events` into their SQLite shard
+    tables, one transaction per month. Returns [(month, rows moved)]; a no-op
+    on Postgres, where partitions already do this.
+    """
+    if bind.dialect.name != "sqlite":
+        return []
+    events = Event.__table__
+    cutoff = datetime.combine(hot_window_start(today), time.min)
+    with bind.connect() as conn:
+        archived = set(archived_months(conn))
+        months = _months_before(conn, events, cutoff)
+
+    moved = []
+    for month in months:
+        if month in archived:
+            # Late events for a month already archived wait for the next archive run
+            continue
+        with bind.begin() as conn:
+            if _pending_aggregates(conn, month):
+                continue
+            shard = shard_table(month)
+            shard.create(bind=conn, checkfirst=True)
+            month_begin, month_end = month_bounds(month)
+            in_month = and_(events.c.timestamp >= month_begin, events.c.timestamp < month_end)
+            rows = conn.execute(
+                shard.insert().from_select(EVENT_COLUMNS, select(events).where(in_month))
+            ).rowcount
+            conn.execute(events.delete().where(in_month))
+            total = conn.execute(select(func.count()).select_from(shard)).scalar()
+            _set_partition(conn, month, "sealed", total)
+        moved.append((month, rows))
+    return moved
+
+
+# --- Postgres partitions ------------------------------------------------------
+
+
+def _partition_parent(conn: Connection, name: str) -> Optional[str]:
+    return conn.execute(text(
+        "SELECT parent.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE child.relname = :name"
+    ), {"name": name}).scalar()
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table JOIN pg_class ON pg_class.oid = partrelid "
+        "WHERE pg_class.relname = 'events'"
+    )).scalar() is not None
+
+
+def attach_month_partition(conn: Connection, month: date, parent: str = "events") -> bool:
+    """
+    Give `month` its own partition of `parent` (Postgres), creating the table
+    unless it exists detached, and first moving the month's rows out of the
+    default partition. Returns False if it is already attached. Caller commits.
+    """
+    name = partition_name(month)
+    if _partition_parent(conn, name):
+        return False
+    month_begin, month_end = month_bounds(month)
+    bounds = {"start": month_begin, "end": month_end}
+    in_month = '"timestamp" >= :start AND "timestamp" < :end'
+    default = f"{parent}_default"
+    conn.execute(text(f"CREATE TABLE IF NOT EXISTS {name} (LIKE {parent} INCLUDING DEFAULTS)"))
+    conn.execute(text(f"INSERT INTO {name} SELECT * FROM {default} WHERE {in_month}"), bounds)
+    conn.execute(text(f"DELETE FROM {default} WHERE {in_month}"), bounds)
+    conn.execute(text(
+        f"ALTER TABLE {parent} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{month_begin.isoformat(' ')}') TO ('{month_end.isoformat(' ')}')"
+    ))
+    return True
+
+
+def ensure_partitions(bind, today: Optional[date] = None) -> List[date]:
+    """Create Postgres partitions through `event_partition_months_ahead` months from now."""
+    if bind.dialect.name != "postgresql":
+        return []
+    current = month_start(today or date.today())
+    created = []
+    for offset in range(settings.event_partition_months_ahead + 1):
+        month = add_months(current, offset)
+        with bind.begin() as conn:
+            if attach_month_partition(conn, month):
+                created.append(month)
+    return created
+
+
+def attached_partitions(conn: Connection) -> List[str]:
+    """Names of the partitions attached to `events` (Postgres), including `events_default`."""
+    return conn.scalars(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = 'events' ORDER BY child.relname"
+    )).all()
+
+
+def _postgres_months(conn: Connection, before: datetime) -> List[date]:
+    names = [name for name in attached_partitions(conn) if name != "events_default"]
+    months = {date(int(name[7:11]), int(name[12:14]), 1) for name in names}
+    months |= set(_months_before(conn, _like_events("events_default"), before))
+    return sorted(month for month in months if month_bounds(month)[1] <= before)
+
+
+# --- Archival -----------------------------------------------------------------
+
+
+def archivable_months(bind, older_than_months: int, today: Optional[date] = None) -> List[date]:
+    """Months entirely before the retention cutoff that still have events in the database."""
+    cutoff = datetime.combine(add_months(month_start(today or date.today()), -older_than_months), time.min)
+    with bind.connect() as conn:
+        if bind.dialect.name == "postgresql" and is_partitioned(conn):
+            return _postgres_months(conn, cutoff)
+        months = set(sealed_months(conn)) | set(_months_before(conn, Event.__table__, cutoff))
+    return sorted(month for month in months if month_bounds(month)[1] <= cutoff)
+
+
+def archive_month(bind, month: date, directory: Path) -> dict:
+    """
+    Export one month of events to a columnar file under `directory`, then drop
+    them from the database. Rollups, mastery and schedules are not touched.
+    Months with write-behind aggregates still pending are skipped.
+
+    The month's own partition or shard is taken out of service first, so
+    nothing new lands in it. Late rows that still arrive in `events` (or
+    `events_default`) are deleted by the ids exported, never by time range.
+    """
+    month_begin, month_end = month_bounds(month)
+    name = partition_name(month)
+    with bind.connect() as conn:
+        if _pending_aggregates(conn, month):
+            return {"month": month, "rows": 0, "path": None, "skipped": "aggregates pending"}
+
+        partitioned = bind.dialect.name == "postgresql" and is_partitioned(conn)
+        month_table = None
+        if partitioned:
+            late_table = _like_events("events_default")
+            if _partition_parent(conn, name):
+                # New events for this month now go to the default partition
+                conn.execute(text(f"ALTER TABLE events DETACH PARTITION {name}"))
+                conn.commit()
+                month_table = shard_table(month)
+        else:
+            late_table = Event.__table__
+            if inspect(conn).has_table(name):
+                month_table = shard_table(month)
+
+        stem = directory / name
+        suffix = 1
+        while any(directory.glob(f"{stem.name}.*")):
+            # Late events for a month archived before get a file of their own
+            stem = directory / f"{name}_{suffix}"
+            suffix += 1
+
+        writer = ColumnarWriter(stem, EVENT_COLUMNS)
+        late_ids = []
+        try:
+            for table in [month_table, late_table]:
+                if table is None:
+                    continue
+                rows = conn.execution_options(yield_per=ARCHIVE_CHUNK_SIZE).execute(
+                    select(*(table.c[column] for column in EVENT_COLUMNS))
+                    .where(table.c.timestamp >= month_begin, table.c.timestamp < month_end)
+                    .order_by(table.c.timestamp, table.c.id)
+                )
+                for chunk in rows.partitions():
+                    writer.write([tuple(row) for row in chunk])
+                    if table is late_table:
+                        late_ids += [row.id for row in chunk]
+            path = writer.close()
+        except Exception:
+            conn.rollback()
+            writer.path.unlink(missing_ok=True)
+            if partitioned and month_table is not None:
+                attach_month_partition(conn, month)
+                conn.commit()
+            raise
+
+        if month_table is not None:
+            month_table.drop(bind=conn)
+        for index in range(0, len(late_ids), ARCHIVE_CHUNK_SIZE):
+            conn.execute(late_table.delete().where(late_table.c.id.in_(late_ids[index:index + ARCHIVE_CHUNK_SIZE])))
+        _set_partition(conn, month, "archived", writer.rows, str(path))
+        conn.commit()
+    return {"month": month, "rows": writer.rows, "path": path, "skipped": None}
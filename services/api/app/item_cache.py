@@ -0,0 +1,106 @@
+"""
+Bounded LRU cache of pre-serialized item payloads.
+
+Items are immutable once loaded, so the JSON body for an item only has to be
+built once per content pack version. Entries are keyed by (item_id, version);
+seeing a new version drops everything cached for the previous one.
+"""
+import json
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import Item
+
+
+def serialize_item(item: Item) -> dict:
+    return {
+        "item_id": item.id,
+        "skill_id": item.skill_id,
+        "question_text": item.question_text,
+        "question_type": item.question_type,
+        "difficulty": item.difficulty,
+        "parameters": item.parameters,
+        "correct_answer": item.correct_answer,
+        "hint": item.hint,
+        "explanation": item.explanation,
+        "validation_rule": item.validation_rule
+    }
+
+
+def encode_json(payload) -> bytes:
+    # Same encoding as FastAPI's JSONResponse
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class ItemPayloadCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._version = None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, item_id: str, version: str) -> Optional[bytes]:
+        payloads = self.get_many(db, [item_id], version)
+        return payloads[0] if payloads else None
+
+    def get_many(self, db: Session, item_ids: Iterable[str], version: str) -> List[bytes]:
+        """
+        Return encoded payloads in the order of `item_ids`, skipping unknown ids.
+        All misses are fetched with a single primary-key IN query.
+        """
+        item_ids = list(item_ids)
+        found = {}
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            for item_id in item_ids:
+                payload = self._entries.get(item_id)
+                if payload is not None:
+                    self._entries.move_to_end(item_id)
+                    found[item_id] = payload
+            self.hits += len(found)
+            self.misses += len(item_ids) - len(found)
+
+        missing = [item_id for item_id in item_ids if item_id not in found]
+        if missing:
+            fetched = {
+                item.id: encode_json(serialize_item(item))
+                for item in db.query(Item).filter(Item.id.in_(missing)).all()
+            }
+            with self._lock:
+                if version == self._version:
+                    for item_id, payload in fetched.items():
+                        self._entries[item_id] = payload
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            found.update(fetched)
+
+        return [found[item_id] for item_id in item_ids if item_id in found]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "version": self._version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+item_cache = ItemPayloadCache(max_entries=settings.item_cache_max_entries)
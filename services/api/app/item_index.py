@@ -0,0 +1,131 @@
+"""
+In-process catalogue of item ids used for random item selection.
+
+Replaces `ORDER BY random()` scans: ids are bucketed by (skill_id, difficulty)
+at startup, so picking a random item is an O(1) tuple lookup followed by a
+single primary-key fetch. Content is loaded out of process by
+`scripts/load_content.py`, so the index re-checks a cheap signature of the
+`items` table (plus the latest content pack version) at most every
+`settings.item_index_refresh_seconds` and rebuilds itself when it changes.
+"""
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Collection, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .models import ContentPack, Item
+
+
+class ItemIndex:
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._by_skill_difficulty: Dict[Tuple[str, int], Tuple[str, ...]] = {}
+        self._by_skill: Dict[str, Tuple[str, ...]] = {}
+        self._by_difficulty: Dict[int, Tuple[str, ...]] = {}
+        self._signature = None
+        self._checked_at = 0.0
+        self._rebuilding = threading.Lock()
+        self._swap_lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._signature is not None
+
+    @property
+    def version(self) -> str:
+        """Content pack version the index was built from ("0" before any pack is recorded)."""
+        return self._signature[0] if self._signature else "0"
+
+    def rebuild(self, db: Session) -> None:
+        """
+        Load every item id from the database and swap in the new buckets.
+
+        Async routes call this through `AsyncSession.run_sync`, where every
+        query yields to the event loop, so no lock is held while querying: a
+        request blocked on one would block the loop thread that the rebuilding
+        request needs to finish. If another rebuild is already running, the
+        current index keeps being served; before the first load each caller
+        builds its own copy.
+        """
+        if not self._rebuilding.acquire(blocking=False):
+            if self.is_loaded:
+                return
+            self._load(db)
+            return
+        try:
+            self._load(db)
+        finally:
+            self._rebuilding.release()
+
+    def _load(self, db: Session) -> None:
+        signature = self._current_signature(db)
+        by_skill_difficulty = defaultdict(list)
+        by_skill = defaultdict(list)
+        by_difficulty = defaultdict(list)
+
+        rows = db.query(Item.id, Item.skill_id, Item.difficulty).order_by(Item.id).all()
+        for item_id, skill_id, difficulty in rows:
+            by_skill_difficulty[(skill_id, difficulty)].append(item_id)
+            by_skill[skill_id].append(item_id)
+            by_difficulty[difficulty].append(item_id)
+
+        # Swap whole dicts so concurrent readers never see a half-built index.
+        # Nothing inside the lock can yield, so it is only ever held briefly.
+        with self._swap_lock:
+            self._by_skill_difficulty = {key: tuple(ids) for key, ids in by_skill_difficulty.items()}
+            self._by_skill = {key: tuple(ids) for key, ids in by_skill.items()}
+            self._by_difficulty = {key: tuple(ids) for key, ids in by_difficulty.items()}
+            self._signature = signature
+            self._checked_at = time.monotonic()
+
+    def ensure_fresh(self, db: Session) -> None:
+        """Rebuild if never loaded, or if the items table changed since the last check."""
+        if self.is_loaded and time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        if self._current_signature(db) != self._signature:
+            self.rebuild(db)
+        else:
+            self._checked_at = time.monotonic()
+
+    def invalidate(self) -> None:
+        """Force a rebuild on the next `ensure_fresh` call."""
+        self._signature = None
+
+    def item_ids(self, skill_id: Optional[str] = None, difficulty: Optional[int] = None) -> Tuple[str, ...]:
+        if skill_id is not None and difficulty is not None:
+            return self._by_skill_difficulty.get((skill_id, difficulty), ())
+        if skill_id is not None:
+            return self._by_skill.get(skill_id, ())
+        return self._by_difficulty.get(difficulty, ())
+
+    def choice(self, skill_id: Optional[str] = None, difficulty: Optional[int] = None) -> Optional[str]:
+        ids = self.item_ids(skill_id, difficulty)
+        return random.choice(ids) if ids else None
+
+    def sample(
+        self,
+        k: int,
+        skill_id: Optional[str] = None,
+        difficulty: Optional[int] = None,
+        exclude: Collection[str] = (),
+    ) -> List[str]:
+        ids = self.item_ids(skill_id, difficulty)
+        if not exclude:
+            return random.sample(ids, min(k, len(ids)))
+        # At most len(exclude) of the draws can be excluded, so over-draw by that
+        drawn = random.sample(ids, min(k + len(exclude), len(ids)))
+        return [item_id for item_id in drawn if item_id not in exclude][:k]
+
+    @staticmethod
+    def _current_signature(db: Session):
+        latest_pack = db.query(ContentPack.version).order_by(ContentPack.loaded_at.desc()).first()
+        item_count, max_item_id = db.query(func.count(Item.id), func.max(Item.id)).one()
+        return (latest_pack.version if latest_pack else "0", item_count, max_item_id)
+
+
+item_index = ItemIndex(refresh_interval=settings.item_index_refresh_seconds)
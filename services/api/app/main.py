@@ -1,17 +1,55 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from .routers import items, events, placement, mastery, students, daily_sessions, parent, achievements
-from .database import init_db
+from .routers import items, events, placement, mastery, students, daily_sessions, parent, achievements, skills
+from .database import SessionLocal, async_engine, describe_engine, engine, init_db
 from .config import settings
+from .migrations import HEAD_VERSION, current_version
+from .item_index import item_index
+from .skill_graph import skill_graph
+from . import metrics
+
+# Shows up alongside uvicorn's own startup lines
+log = logging.getLogger("uvicorn.error")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    log.info("Database engine: %s", describe_engine())
+
+    # One query when the schema is current; tables are only inspected when migrating
+    version = current_version(engine)
+    if version is None or version < HEAD_VERSION:
+        if not settings.db_migrate_on_startup:
+            raise RuntimeError(
+                f"Database schema is at version {version}, expected {HEAD_VERSION}; run scripts/migrate.py"
+            )
+        applied = init_db()
+        log.info("Database schema migrated to version %d (%d migrations)", HEAD_VERSION, len(applied))
+    log.info("Skill graph: %d skills", len(skill_graph))
+
+    # Warm the item catalogue so the first /next-item request doesn't pay for it
+    db = SessionLocal()
+    try:
+        item_index.rebuild(db)
+    finally:
+        db.close()
+
+    if settings.event_write_behind:
+        log.info("Event write-behind enabled: %s", events.outbox_worker.stats())
+        events.outbox_worker.start()
+    yield
+    await events.outbox_worker.stop()
 
-# Initialize database
-init_db()
 
 # Create FastAPI app
 app = FastAPI(
     title=settings.api_title,
     version=settings.api_version,
-    debug=settings.debug
+    debug=settings.debug,
+    lifespan=lifespan,
 )
 
 # CORS middleware for iOS app
@@ -23,6 +61,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.metrics_enabled:
+    metrics.instrument_engine(engine)
+    metrics.instrument_engine(async_engine.sync_engine)
+    # Added last so it wraps everything, including CORS handling
+    app.add_middleware(metrics.MetricsMiddleware)
+    metrics.registry.gauge(
+        "mathcoach_event_outbox_pending",
+        "Events whose aggregate updates are queued (write-behind)",
+        lambda: events.outbox_worker.pending,
+    )
+    metrics.registry.gauge(
+        "mathcoach_event_outbox_lag_seconds",
+        "Age of the oldest queued event (write-behind)",
+        events.outbox_worker.lag_seconds,
+    )
+
+    @app.get("/metrics", include_in_schema=False)
+    async def prometheus_metrics():
+        return Response(
+            content=metrics.registry.render_prometheus(),
+            media_type="text/plain; version=0.0.4",
+        )
+
 # Include routers
 app.include_router(items.router, prefix="/api/v1", tags=["items"])
 app.include_router(events.router, prefix="/api/v1", tags=["events"])
@@ -32,6 +93,7 @@ app.include_router(students.router, prefix="/api/v1", tags=["students"])
 app.include_router(daily_sessions.router, prefix="/api/v1", tags=["daily_session"])
 app.include_router(parent.router, prefix="/api/v1", tags=["parent"])
 app.include_router(achievements.router, prefix="/api/v1", tags=["achievements"])
+app.include_router(skills.router, prefix="/api/v1", tags=["skills"])
 
 
 @app.get("/")
@@ -0,0 +1,187 @@
+"""
+Pluggable mastery models.
+
+Each engine keeps a single float of sufficient statistics per (student, skill)
+in `Mastery.model_state` (next to the raw attempt counters), so an answer is
+folded in with O(1) work and no access to past events. Forgetting is applied
+lazily: the stored state is decayed by the time elapsed since
+`Mastery.last_updated` whenever it is read or updated.
+
+Engines:
+- "ratio": legacy correct/total ratio, no decay.
+- "bkt":   Bayesian Knowledge Tracing; state is P(skill known).
+- "elo":   Elo-style student rating against item ratings derived from difficulty.
+"""
+import math
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Optional
+
+from .config import settings
+from .models import Mastery
+
+
+def _elapsed_days(since: Optional[datetime], until: datetime) -> float:
+    if since is None:
+        return 0.0
+    # Client timestamps may be tz-aware while stored ones are naive
+    since = since.replace(tzinfo=None)
+    until = until.replace(tzinfo=None)
+    return max((until - since).total_seconds() / 86400.0, 0.0)
+
+
+class MasteryEngine(ABC):
+    name = "base"
+    prior = 0.0
+    decays = True
+
+    def __init__(self, half_life_days: float = 0.0):
+        self.half_life_days = half_life_days
+
+    def update(self, mastery: Mastery, is_correct: bool, difficulty: int, at: datetime) -> None:
+        """Fold one answer into `mastery` in place."""
+        if mastery.model != self.name or mastery.model_state is None:
+            # Row written by another engine (or before engines existed)
+            mastery.model_state = self.seed_state(mastery.total_attempts or 0, mastery.correct_attempts or 0)
+            mastery.model = self.name
+
+        state = self._decay(mastery.model_state, _elapsed_days(mastery.last_updated, at))
+        mastery.total_attempts = (mastery.total_attempts or 0) + 1
+        if is_correct:
+            mastery.correct_attempts = (mastery.correct_attempts or 0) + 1
+        mastery.model_state = self.observe(state, is_correct, difficulty, mastery)
+        mastery.mastery_score = self.score(mastery.model_state)
+        # An answer synced out of order is folded in with no decay and leaves
+        # last_updated alone, so later reads never decay from an older time
+        if mastery.last_updated is None or _elapsed_days(mastery.last_updated, at) > 0:
+            mastery.last_updated = at
+
+    def current_score(self, mastery: Mastery, now: Optional[datetime] = None) -> float:
+        """Mastery score with decay applied up to `now`; falls back to the stored score."""
+        if mastery.model != self.name or mastery.model_state is None:
+            return mastery.mastery_score
+        elapsed = _elapsed_days(mastery.last_updated, now or datetime.now())
+        return self.score(self._decay(mastery.model_state, elapsed))
+
+    def is_mastered(self, mastery: Mastery, now: Optional[datetime] = None) -> bool:
+        """Decayed score at the threshold, over at least `skill_mastery_min_attempts` answers."""
+        if (mastery.total_attempts or 0) < settings.skill_mastery_min_attempts:
+            return False
+        return self.current_score(mastery, now) >= settings.skill_mastery_threshold
+
+    def _decay(self, state: float, elapsed_days: float) -> float:
+        if not self.decays or self.half_life_days <= 0 or elapsed_days <= 0:
+            return state
+        prior_state = self.seed_state(0, 0)
+        return prior_state + (state - prior_state) * 0.5 ** (elapsed_days / self.half_life_days)
+
+    @abstractmethod
+    def seed_state(self, total_attempts: int, correct_attempts: int) -> float:
+        """State for a row with these counters and no model state yet."""
+
+    @abstractmethod
+    def observe(self, state: float, is_correct: bool, difficulty: int, mastery: Mastery) -> float:
+        """State after one more answer; the counters on `mastery` already include it."""
+
+    @abstractmethod
+    def score(self, state: float) -> float:
+        """Mastery score in [0, 1] for a state."""
+
+
+class RatioEngine(MasteryEngine):
+    name = "ratio"
+    decays = False
+
+    def seed_state(self, total_attempts, correct_attempts):
+        return correct_attempts / total_attempts if total_attempts else 0.0
+
+    def observe(self, state, is_correct, difficulty, mastery):
+        return mastery.correct_attempts / mastery.total_attempts
+
+    def score(self, state):
+        return state
+
+
+class BKTEngine(MasteryEngine):
+    name = "bkt"
+
+    def __init__(self, half_life_days=0.0, p_init=0.3, p_learn=0.15, p_slip=0.1, p_guess=0.2):
+        super().__init__(half_life_days)
+        self.p_init = p_init
+        self.p_learn = p_learn
+        self.p_slip = p_slip
+        self.p_guess = p_guess
+
+    def seed_state(self, total_attempts, correct_attempts):
+        # Blend the prior with observed accuracy, weighted like 5 pseudo-attempts
+        return (self.p_init * 5 + correct_attempts) / (5 + total_attempts)
+
+    def observe(self, state, is_correct, difficulty, mastery):
+        if is_correct:
+            evidence = state * (1 - self.p_slip)
+            posterior = evidence / (evidence + (1 - state) * self.p_guess)
+        else:
+            evidence = state * self.p_slip
+            posterior = evidence / (evidence + (1 - state) * (1 - self.p_guess))
+        return posterior + (1 - posterior) * self.p_learn
+
+    def score(self, state):
+        return state
+
+
+class EloEngine(MasteryEngine):
+    name = "elo"
+
+    def __init__(self, half_life_days=0.0, k_max=0.8, k_min=0.15):
+        super().__init__(half_life_days)
+        self.k_max = k_max
+        self.k_min = k_min
+
+    @staticmethod
+    def item_rating(difficulty: int) -> float:
+        # Difficulty 1-5 mapped onto the logit scale, centred on 3
+        return ((difficulty or 3) - 3) * 0.6
+
+    def seed_state(self, total_attempts, correct_attempts):
+        accuracy = (correct_attempts + 1) / (total_attempts + 2)
+        return math.log(accuracy / (1 - accuracy))
+
+    def observe(self, state, is_correct, difficulty, mastery):
+        expected = 1 / (1 + math.exp(self.item_rating(difficulty) - state))
+        # Large steps while the rating is uncertain, smaller as attempts accumulate
+        k = max(self.k_min, self.k_max / (1 + 0.1 * (mastery.total_attempts - 1)))
+        return state + k * ((1.0 if is_correct else 0.0) - expected)
+
+    def score(self, state):
+        # Probability of answering a mid-difficulty item correctly
+        return 1 / (1 + math.exp(-state))
+
+
+def target_difficulty(score: Optional[float]) -> int:
+    """Item difficulty (1-5) to serve at a given mastery score; 1 with no data."""
+    if score is None or score < 0.3:
+        return 1
+    if score < 0.5:
+        return 2
+    if score < 0.7:
+        return 3
+    if score < 0.9:
+        return 4
+    return 5
+
+
+MASTERY_ENGINES = {
+    RatioEngine.name: RatioEngine,
+    BKTEngine.name: BKTEngine,
+    EloEngine.name: EloEngine,
+}
+
+
+def get_mastery_engine(name: Optional[str] = None) -> MasteryEngine:
+    name = name or settings.mastery_engine
+    if name not in MASTERY_ENGINES:
+        raise ValueError(f"Unknown mastery engine: {name} (expected one of {', '.join(MASTERY_ENGINES)})")
+    return MASTERY_ENGINES[name](half_life_days=settings.mastery_decay_half_life_days)
+
+
+mastery_engine = get_mastery_engine()
@@ -0,0 +1,184 @@
+"""
+Per-request SQL statement counting and timing.
+
+`instrument_engine` hooks SQLAlchemy cursor events; `MetricsMiddleware` opens
+a per-request accumulator in a context variable (visible to sync routes in the
+threadpool and to `AsyncSession.run_sync` greenlets alike), adds a
+`Server-Timing` header to every response and feeds per-route histograms that
+`render_prometheus` exposes at `/metrics`.
+
+Nothing here is installed when `settings.metrics_enabled` is false, so a
+disabled deployment pays no per-statement or per-request cost.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Tuple
+
+from sqlalchemy import event
+
+# Upper bounds in seconds, shared by the request and DB-time histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("mathcoach_request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # The start lives on the per-statement execution context, so a statement
+    # that raises leaves nothing behind for the next one to pick up
+    if context is not None and _current_request.get() is not None:
+        context._mathcoach_query_start = time.perf_counter()
+
+
+def _record(context) -> None:
+    stats = _current_request.get()
+    started = getattr(context, "_mathcoach_query_start", None)
+    if stats is None or started is None:
+        return
+    del context._mathcoach_query_start
+    stats.queries += 1
+    stats.db_seconds += time.perf_counter() - started
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record(context)
+
+
+def _handle_error(exception_context):
+    # Failed statements still took a round trip
+    _record(exception_context.execution_context)
+
+
+def instrument_engine(sync_engine) -> None:
+    """Count statements on `sync_engine` (pass `async_engine.sync_engine` for async engines)."""
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class RouteMetrics:
+    def __init__(self):
+        self.request_seconds = Histogram(LATENCY_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._routes: Dict[Tuple[str, str, str], RouteMetrics] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+
+    def gauge(self, name: str, help_text: str, read: Callable[[], float]) -> None:
+        """Register a gauge whose value is read from `read()` at scrape time."""
+        self._gauges[name] = (help_text, read)
+
+    def observe(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        key = (method, route, str(status))
+        with self._lock:
+            metrics = self._routes.get(key)
+            if metrics is None:
+                metrics = self._routes[key] = RouteMetrics()
+            metrics.request_seconds.observe(elapsed)
+            metrics.db_seconds.observe(stats.db_seconds)
+            metrics.queries.observe(stats.queries)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+    def render_prometheus(self) -> str:
+        lines = []
+        families = [
+            ("mathcoach_http_request_duration_seconds", "Request latency by route", "request_seconds"),
+            ("mathcoach_db_duration_seconds", "Time spent in SQL per request by route", "db_seconds"),
+            ("mathcoach_db_queries_per_request", "SQL statements per request by route", "queries"),
+        ]
+        with self._lock:
+            routes = sorted(self._routes.items())
+            for name, help_text, attribute in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for (method, route, status), metrics in routes:
+                    histogram = getattr(metrics, attribute)
+                    labels = f'method="{method}",route="{route}",status="{status}"'
+                    cumulative = 0
+                    for bound, count in zip(histogram.bounds, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        for name, (help_text, read) in sorted(self._gauges.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {read()}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware so the context variable is set in the request's own task."""
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                timing = (
+                    f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.queries} queries", '
+                    f"app;dur={elapsed_ms:.2f}"
+                )
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            route = scope.get("route")
+            # Use the route template so /students/{student_id} is one series
+            route_path = getattr(route, "path", None) or "unmatched"
+            self.registry.observe(scope["method"], route_path, status, time.perf_counter() - started, stats)
@@ -0,0 +1,682 @@
+"""
+Versioned schema migrations.
+
+Every change to an existing table is a `Migration` with a fixed version
+number, and applied versions are recorded in `schema_version`. `migrate()`:
+- on an empty database, creates every table from the models and records
+  every version as applied
+- otherwise applies the pending migrations in order. Databases that predate
+  this module (tables but no `schema_version` rows) start from version 1, so
+  each migration checks for its change before making it.
+
+A migration runs in one transaction together with its version row unless it
+is `online`. Online migrations get a plain connection and commit as they go,
+batch by batch through `backfill_in_batches`, and build indexes CONCURRENTLY
+on Postgres, so the API keeps serving large tables while they run.
+
+Migrations read and write named columns through Core statements, never whole
+ORM entities, so they keep working after the models gain columns.
+
+API startup only calls `current_version()`, a single query, instead of
+inspecting every table. Never edit or renumber a released migration; append
+a new one.
+"""
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Callable, List, Optional, Tuple
+
+from sqlalchemy import (
+    JSON, BigInteger, Boolean, Column, Date, DateTime, Float, ForeignKey, Index, Integer, MetaData, String, Table, Text,
+    delete, func, insert, inspect, select, text, update,
+)
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+
+from . import event_store
+from .badges import badge_mask_for
+from .config import settings
+from .daily_stats import new_daily_stats, record_event
+from .models import Achievement, DailySession, Event, EventId, EventPartition, Item, SchemaVersion, Student, StudentDailyStats
+from .models.student import Base
+
+log = logging.getLogger("uvicorn.error")
+
+
+class Migration:
+    def __init__(
+        self,
+        version: int,
+        name: str,
+        upgrade: Callable[[Connection], None],
+        online: bool = False,
+        after_create: bool = False,
+    ):
+        self.version = version
+        self.name = name
+        self.upgrade = upgrade
+        self.online = online
+        # Also run on a freshly created database: the models can't express its change
+        self.after_create = after_create
+
+    def __repr__(self):
+        return f"<Migration({self.version} {self.name})>"
+
+
+def backfill_in_batches(
+    conn: Connection,
+    key_column,
+    apply: Callable[[Session, list], None],
+    batch_size: Optional[int] = None,
+) -> int:
+    """
+    Call `apply(db, keys)` on successive batches of `key_column` values in key
+    order and commit after each batch, so no lock is held for long. `key_column`
+    must be unique. An interrupted migration starts over, so `apply` must be
+    safe to repeat. Returns how many keys were visited.
+    """
+    batch_size = batch_size or settings.db_migration_batch_size
+    visited = 0
+    last_key = None
+    with Session(bind=conn, autoflush=False) as db:
+        while True:
+            query = select(key_column).order_by(key_column).limit(batch_size)
+            if last_key is not None:
+                query = query.where(key_column > last_key)
+            keys = db.scalars(query).all()
+            if not keys:
+                return visited
+            apply(db, keys)
+            db.commit()
+            visited += len(keys)
+            last_key = keys[-1]
+
+
+def _add_missing_columns(conn: Connection, table_name: str, alter_statements: dict) -> None:
+    existing_cols = {column["name"] for column in inspect(conn).get_columns(table_name)}
+    for col_name, statement in alter_statements.items():
+        if col_name not in existing_cols:
+            conn.execute(text(statement))
+
+
+# --- 1-3: tables and columns added before migrations were versioned ---------
+
+
+# The tables as they stood at version 1, frozen here so this migration never
+# changes when the models do; later migrations bring them up to date
+_V1_SCHEMA = MetaData()
+
+Table(
+    "students", _V1_SCHEMA,
+    Column("id", String, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("year_level", Integer, nullable=False),
+    Column("avatar", String, nullable=False, default="star"),
+    Column("target_daily_questions", Integer, nullable=False, default=10),
+    Column("current_streak", Integer, nullable=False, default=0),
+    Column("longest_streak", Integer, nullable=False, default=0),
+    Column("last_practice_date", Date, nullable=True),
+    Column("total_sessions", Integer, nullable=False, default=0),
+    Column("badge_mask", BigInteger, nullable=False, default=0),
+    Column("created_at", DateTime, nullable=False),
+)
+Table(
+    "items", _V1_SCHEMA,
+    Column("id", String, primary_key=True),
+    Column("skill_id", String, nullable=False),
+    Column("question_text", Text, nullable=False),
+    Column("question_type", String, nullable=False),
+    Column("difficulty", Integer, nullable=False, index=True),
+    Column("parameters", JSON, nullable=False),
+    Column("correct_answer", String, nullable=False),
+    Column("hint", Text),
+    Column("explanation", Text, nullable=False),
+    Column("validation_rule", String, nullable=False, default="exact_match"),
+    Index("ix_items_skill_difficulty", "skill_id", "difficulty"),
+)
+Table(
+    "events", _V1_SCHEMA,
+    Column("id", String, primary_key=True),
+    Column("student_id", String, ForeignKey("students.id"), nullable=False),
+    Column("item_id", String, ForeignKey("items.id"), nullable=False, index=True),
+    Column("answer_given", String, nullable=False),
+    Column("is_correct", Boolean, nullable=False),
+    Column("time_spent", Float, nullable=False),
+    Column("hint_requested", Boolean, default=False),
+    Column("timestamp", DateTime, nullable=False, index=True),
+    Index("ix_events_student_timestamp", "student_id", "timestamp"),
+)
+Table(
+    "mastery", _V1_SCHEMA,
+    Column("student_id", String, ForeignKey("students.id"), primary_key=True),
+    Column("skill_id", String, primary_key=True, index=True),
+    Column("total_attempts", Integer, default=0, nullable=False),
+    Column("correct_attempts", Integer, default=0, nullable=False),
+    Column("mastery_score", Float, default=0.0, nullable=False),
+    Column("last_updated", DateTime, nullable=False),
+    Column("model", String, nullable=True),
+    Column("model_state", Float, nullable=True),
+)
+Table(
+    "daily_sessions", _V1_SCHEMA,
+    Column("id", String, primary_key=True),
+    Column("student_id", String, ForeignKey("students.id"), nullable=False),
+    Column("session_date", Date, nullable=False, index=True),
+    Column("started_at", DateTime, nullable=False),
+    Column("completed_questions", Integer, nullable=False, default=0),
+    Column("target_questions", Integer, nullable=False, default=10),
+    Column("is_completed", Boolean, nullable=False, default=False),
+    Column("completed_at", DateTime, nullable=True),
+    Index("uq_daily_sessions_student_date", "student_id", "session_date", unique=True),
+)
+Table(
+    "achievements", _V1_SCHEMA,
+    Column("id", String, primary_key=True),
+    Column("student_id", String, ForeignKey("students.id"), nullable=False),
+    Column("badge_key", String, nullable=False, index=True),
+    Column("title", String, nullable=False),
+    Column("description", String, nullable=False),
+    Column("unlocked_at", DateTime, nullable=False),
+    Index("uq_achievements_student_badge", "student_id", "badge_key", unique=True),
+)
+Table(
+    "content_packs", _V1_SCHEMA,
+    Column("version", String, primary_key=True),
+    Column("source", String, nullable=False),
+    Column("item_count", Integer, nullable=False, default=0),
+    Column("loaded_at", DateTime, nullable=False, index=True),
+)
+Table(
+    "student_daily_stats", _V1_SCHEMA,
+    Column("student_id", String, ForeignKey("students.id"), primary_key=True),
+    Column("stat_date", Date, primary_key=True),
+    Column("events_total", Integer, nullable=False, default=0),
+    Column("correct_total", Integer, nullable=False, default=0),
+    Column("time_spent_total", Float, nullable=False, default=0.0),
+    Column("hints_total", Integer, nullable=False, default=0),
+    Column("skill_counts", JSON, nullable=False, default=dict),
+)
+Table(
+    "review_schedule", _V1_SCHEMA,
+    Column("student_id", String, ForeignKey("students.id"), primary_key=True),
+    Column("skill_id", String, primary_key=True),
+    Column("ease_factor", Float, nullable=False, default=2.5),
+    Column("interval_days", Float, nullable=False, default=0.0),
+    Column("repetitions", Integer, nullable=False, default=0),
+    Column("due_at", DateTime, nullable=False),
+    Column("last_reviewed_at", DateTime, nullable=True),
+    Index("ix_review_schedule_student_due", "student_id", "due_at", "skill_id"),
+)
+Table(
+    "event_outbox", _V1_SCHEMA,
+    Column("seq", Integer, primary_key=True, autoincrement=True),
+    Column("event_id", String, ForeignKey("events.id"), nullable=False, unique=True),
+    Column("enqueued_at", DateTime, nullable=False),
+)
+
+
+def _create_missing_tables(conn: Connection) -> None:
+    _V1_SCHEMA.create_all(bind=conn)
+
+
+def _add_student_profile_columns(conn: Connection) -> None:
+    _add_missing_columns(conn, "students", {
+        "avatar": "ALTER TABLE students ADD COLUMN avatar VARCHAR DEFAULT 'star' NOT NULL",
+        "target_daily_questions": "ALTER TABLE students ADD COLUMN target_daily_questions INTEGER DEFAULT 10 NOT NULL",
+        "current_streak": "ALTER TABLE students ADD COLUMN current_streak INTEGER DEFAULT 0 NOT NULL",
+        "longest_streak": "ALTER TABLE students ADD COLUMN longest_streak INTEGER DEFAULT 0 NOT NULL",
+        "last_practice_date": "ALTER TABLE students ADD COLUMN last_practice_date DATE",
+        "total_sessions": "ALTER TABLE students ADD COLUMN total_sessions INTEGER DEFAULT 0 NOT NULL",
+        "badge_mask": "ALTER TABLE students ADD COLUMN badge_mask BIGINT DEFAULT 0 NOT NULL",
+    })
+
+
+def _add_mastery_model_columns(conn: Connection) -> None:
+    _add_missing_columns(conn, "mastery", {
+        "model": "ALTER TABLE mastery ADD COLUMN model VARCHAR",
+        "model_state": "ALTER TABLE mastery ADD COLUMN model_state FLOAT",
+    })
+
+
+# --- 4: composite indexes -----------------------------------------------------
+
+# (name, table, columns, unique); hot queries filter on these column pairs
+COMPOSITE_INDEXES = [
+    ("ix_events_student_timestamp", "events", ("student_id", "timestamp"), False),
+    ("ix_items_skill_difficulty", "items", ("skill_id", "difficulty"), False),
+    ("uq_daily_sessions_student_date", "daily_sessions", ("student_id", "session_date"), True),
+    ("uq_achievements_student_badge", "achievements", ("student_id", "badge_key"), True),
+]
+
+# Single-column indexes that are a prefix of one of the composite indexes and only cost writes
+REDUNDANT_INDEXES = {
+    "events": ["ix_events_student_id"],
+    "items": ["ix_items_skill_id"],
+    "daily_sessions": ["ix_daily_sessions_student_id"],
+    "achievements": ["ix_achievements_student_id"],
+}
+
+
+def dedupe_daily_sessions(db: Session) -> int:
+    """Fold duplicate (student_id, session_date) sessions into the earliest one. Caller commits."""
+    sessions = DailySession.__table__
+    removed = 0
+    for student_id, session_date in _duplicate_keys(db, sessions.c.student_id, sessions.c.session_date):
+        keeper, *duplicates = db.execute(
+            select(
+                sessions.c.id,
+                sessions.c.started_at,
+                sessions.c.completed_questions,
+                sessions.c.target_questions,
+                sessions.c.is_completed,
+                sessions.c.completed_at,
+            )
+            .where(sessions.c.student_id == student_id, sessions.c.session_date == session_date)
+            .order_by(sessions.c.started_at, sessions.c.id)
+        ).all()
+        completed_questions = keeper.completed_questions + sum(row.completed_questions for row in duplicates)
+        target_questions = max(row.target_questions for row in [keeper, *duplicates])
+        values = {"completed_questions": completed_questions, "target_questions": target_questions}
+        if completed_questions >= target_questions and not keeper.is_completed:
+            values["is_completed"] = True
+            values["completed_at"] = min(
+                (row.completed_at for row in duplicates if row.completed_at),
+                default=keeper.started_at,
+            )
+        db.execute(update(sessions).where(sessions.c.id == keeper.id).values(**values))
+        db.execute(delete(sessions).where(sessions.c.id.in_([row.id for row in duplicates])))
+        removed += len(duplicates)
+    return removed
+
+
+def dedupe_achievements(db: Session) -> int:
+    """Keep the earliest unlock of each (student_id, badge_key). Caller commits."""
+    achievements = Achievement.__table__
+    removed = 0
+    for student_id, badge_key in _duplicate_keys(db, achievements.c.student_id, achievements.c.badge_key):
+        _, *duplicate_ids = db.scalars(
+            select(achievements.c.id)
+            .where(achievements.c.student_id == student_id, achievements.c.badge_key == badge_key)
+            .order_by(achievements.c.unlocked_at, achievements.c.id)
+        ).all()
+        db.execute(delete(achievements).where(achievements.c.id.in_(duplicate_ids)))
+        removed += len(duplicate_ids)
+    return removed
+
+
+def _duplicate_keys(db: Session, *columns) -> list:
+    return db.execute(select(*columns).group_by(*columns).having(func.count() > 1)).all()
+
+
+def invalid_indexes(conn: Connection) -> set:
+    """
+    Names of Postgres indexes marked invalid. A CREATE INDEX CONCURRENTLY that
+    fails or is cancelled (e.g. a duplicate row for a unique index) leaves its
+    index in place but unused and unenforced.
+    """
+    if conn.dialect.name != "postgresql":
+        return set()
+    return set(conn.scalars(text(
+        "SELECT index_class.relname FROM pg_index "
+        "JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid "
+        "WHERE NOT pg_index.indisvalid"
+    )))
+
+
+def _add_composite_indexes(conn: Connection) -> None:
+    with Session(bind=conn, autoflush=False) as db:
+        merged = dedupe_daily_sessions(db)
+        removed = dedupe_achievements(db)
+        db.commit()
+    if merged or removed:
+        log.info("Merged %d duplicate daily sessions and removed %d duplicate achievements", merged, removed)
+
+    concurrently = "CONCURRENTLY " if conn.dialect.name == "postgresql" else ""
+    # CREATE/DROP INDEX CONCURRENTLY can't run inside a transaction block
+    conn.execution_options(isolation_level="AUTOCOMMIT")
+    inspector = inspect(conn)
+    invalid = invalid_indexes(conn)
+    for name, table_name, columns, unique in COMPOSITE_INDEXES:
+        if name in invalid:
+            log.warning("Rebuilding index %s, left invalid by a failed or cancelled build", name)
+            conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+        elif name in {index["name"] for index in inspector.get_indexes(table_name)}:
+            continue
+        conn.execute(text(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {concurrently}IF NOT EXISTS {name} "
+            f"ON {table_name} ({', '.join(columns)})"
+        ))
+    for table_name, index_names in REDUNDANT_INDEXES.items():
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        for name in index_names:
+            if name in existing:
+                conn.execute(text(f"DROP INDEX {concurrently}IF EXISTS {name}"))
+
+
+# --- 5-6: backfills for columns and rollups added before migrations were versioned
+
+
+def _backfill_badge_masks(conn: Connection) -> None:
+    """Set `badge_mask` bits for achievements stored before the mask existed."""
+    students = Student.__table__
+    achievements = Achievement.__table__
+
+    def apply(db: Session, student_ids: list) -> None:
+        badge_keys = defaultdict(list)
+        for student_id, badge_key in db.execute(
+            select(achievements.c.student_id, achievements.c.badge_key)
+            .where(achievements.c.student_id.in_(student_ids))
+        ):
+            badge_keys[student_id].append(badge_key)
+        for student_id, keys in badge_keys.items():
+            mask = badge_mask_for(keys)
+            if mask:
+                db.execute(
+                    update(students)
+                    .where(students.c.id == student_id)
+                    .values(badge_mask=students.c.badge_mask.op("|")(mask))
+                )
+
+    backfill_in_batches(conn, students.c.id, apply)
+
+
+def _backfill_daily_stats(conn: Connection) -> None:
+    """
+    Build `student_daily_stats` rows from events for students that have none
+    yet, including events in sealed SQLite shards. Shards only exist once
+    migration 7 has created the `event_partitions` registry.
+    """
+    rollups = StudentDailyStats.__table__
+    items = Item.__table__
+    has_shards = inspect(conn).has_table(EventPartition.__tablename__)
+
+    def apply(db: Session, student_ids: list) -> None:
+        already_built = set(db.scalars(
+            select(rollups.c.student_id).where(rollups.c.student_id.in_(student_ids)).distinct()
+        ))
+        pending = [student_id for student_id in student_ids if student_id not in already_built]
+        if not pending:
+            return
+
+        events = event_store.event_source(db) if has_shards else Event.__table__
+        rows = {}
+        for student_id, timestamp, is_correct, time_spent, hint_requested, skill_id in db.execute(
+            select(
+                events.c.student_id,
+                events.c.timestamp,
+                events.c.is_correct,
+                events.c.time_spent,
+                events.c.hint_requested,
+                items.c.skill_id,
+            )
+            .outerjoin(items, items.c.id == events.c.item_id)
+            .where(events.c.student_id.in_(pending))
+        ):
+            key = (student_id, timestamp.date())
+            daily = rows.get(key)
+            if daily is None:
+                daily = rows[key] = new_daily_stats(student_id, timestamp.date())
+            record_event(daily, is_correct, time_spent, hint_requested, skill_id)
+
+        if rows:
+            db.execute(insert(rollups), [
+                {
+                    "student_id": daily.student_id,
+                    "stat_date": daily.stat_date,
+                    "events_total": daily.events_total,
+                    "correct_total": daily.correct_total,
+                    "time_spent_total": daily.time_spent_total,
+                    "hints_total": daily.hints_total,
+                    "skill_counts": daily.skill_counts,
+                }
+                for daily in rows.values()
+            ])
+
+    backfill_in_batches(conn, Student.__table__.c.id, apply)
+
+
+# --- 7: month-partitioned events -------------------------------------------
+
+
+def _partition_events(conn: Connection) -> None:
+    """
+    Create the `event_partitions` registry, and on Postgres convert `events`
+    into a table range-partitioned by month (see app/event_store.py).
+
+    Rows are copied one month per transaction into a partitioned copy that
+    already has its keys and indexes. Only the final step locks `events`
+    against writes: it re-copies the months whose row counts changed during
+    the copy and swaps the tables.
+    """
+    EventPartition.__table__.create(bind=conn, checkfirst=True)
+    conn.commit()
+    if conn.dialect.name != "postgresql" or event_store.is_partitioned(conn):
+        return
+
+    # A partitioned table's primary key must include the partition column, so
+    # `events.id` alone can no longer be referenced
+    for foreign_key in inspect(conn).get_foreign_keys("event_outbox"):
+        if foreign_key["referred_table"] == "events":
+            conn.execute(text(f"ALTER TABLE event_outbox DROP CONSTRAINT {foreign_key['name']}"))
+
+    # Indexes on columns a later migration adds are created by that migration
+    existing_columns = {column["name"] for column in inspect(conn).get_columns("events")}
+    indexes = {
+        index.name: [column.name for column in index.columns]
+        for index in Event.__table__.indexes
+        if {column.name for column in index.columns} <= existing_columns
+    }
+    conn.execute(text(
+        'CREATE TABLE events_partitioned (LIKE events INCLUDING DEFAULTS) PARTITION BY RANGE ("timestamp")'
+    ))
+    conn.execute(text('ALTER TABLE events_partitioned ADD CONSTRAINT events_partitioned_pkey PRIMARY KEY (id, "timestamp")'))
+    conn.execute(text(
+        "ALTER TABLE events_partitioned ADD CONSTRAINT events_partitioned_student_id_fkey "
+        "FOREIGN KEY (student_id) REFERENCES students (id)"
+    ))
+    conn.execute(text(
+        "ALTER TABLE events_partitioned ADD CONSTRAINT events_partitioned_item_id_fkey "
+        "FOREIGN KEY (item_id) REFERENCES items (id)"
+    ))
+    for name, columns in indexes.items():
+        quoted = ", ".join(f'"{column}"' for column in columns)
+        conn.execute(text(f"CREATE INDEX {name}_partitioned ON events_partitioned ({quoted})"))
+    conn.execute(text("CREATE TABLE events_partitioned_default PARTITION OF events_partitioned DEFAULT"))
+
+    oldest = conn.execute(text('SELECT min("timestamp") FROM events')).scalar()
+    current = event_store.month_start(date.today())
+    month = event_store.month_start(oldest) if oldest else current
+    months = []
+    while month <= event_store.add_months(current, settings.event_partition_months_ahead):
+        event_store.attach_month_partition(conn, month, parent="events_partitioned")
+        months.append(month)
+        month = event_store.add_months(month, 1)
+    conn.commit()
+
+    for month in months:
+        month_begin, month_end = event_store.month_bounds(month)
+        conn.execute(
+            text('INSERT INTO events_partitioned SELECT * FROM events WHERE "timestamp" >= :start AND "timestamp" < :end'),
+            {"start": month_begin, "end": month_end},
+        )
+        conn.commit()
+    conn.execute(
+        text('INSERT INTO events_partitioned SELECT * FROM events WHERE "timestamp" >= :start'),
+        {"start": event_store.month_bounds(months[-1])[1]},
+    )
+    conn.commit()
+
+    # Reads continue; writes wait for the swap
+    conn.execute(text("LOCK TABLE events IN EXCLUSIVE MODE"))
+    month_counts = 'SELECT date_trunc(\'month\', "timestamp"), count(*) FROM {} GROUP BY 1'
+    copied = dict(conn.execute(text(month_counts.format("events_partitioned"))).all())
+    for month, count in conn.execute(text(month_counts.format("events"))).all():
+        if copied.get(month) == count:
+            continue
+        month_begin, month_end = event_store.month_bounds(month)
+        conn.execute(text(
+            'INSERT INTO events_partitioned SELECT * FROM events e '
+            'WHERE e."timestamp" >= :start AND e."timestamp" < :end AND NOT EXISTS ('
+            'SELECT 1 FROM events_partitioned p WHERE p.id = e.id AND p."timestamp" = e."timestamp")'
+        ), {"start": month_begin, "end": month_end})
+    conn.execute(text("ALTER TABLE events RENAME TO events_unpartitioned"))
+    conn.execute(text("DROP TABLE events_unpartitioned"))
+    conn.execute(text("ALTER TABLE events_partitioned RENAME TO events"))
+    conn.execute(text("ALTER TABLE events_partitioned_default RENAME TO events_default"))
+    conn.execute(text("ALTER TABLE events RENAME CONSTRAINT events_partitioned_pkey TO events_pkey"))
+    conn.execute(text("ALTER TABLE events RENAME CONSTRAINT events_partitioned_student_id_fkey TO events_student_id_fkey"))
+    conn.execute(text("ALTER TABLE events RENAME CONSTRAINT events_partitioned_item_id_fkey TO events_item_id_fkey"))
+    for name in indexes:
+        conn.execute(text(f"ALTER INDEX {name}_partitioned RENAME TO {name}"))
+    conn.commit()
+
+
+# --- 8: event id registry ---------------------------------------------------
+
+
+def _add_event_ids(conn: Connection) -> None:
+    """
+    Create `event_ids` and record the id of every stored event in it,
+    including SQLite shards. Partitioned `events` can't keep ids unique itself.
+    """
+    event_ids = EventId.__table__
+    event_ids.create(bind=conn, checkfirst=True)
+    conn.commit()
+
+    def apply(db: Session, keys: list) -> None:
+        known = set(db.scalars(select(event_ids.c.id).where(event_ids.c.id.in_(keys))))
+        missing = [key for key in keys if key not in known]
+        if missing:
+            db.execute(insert(event_ids), [{"id": key} for key in missing])
+
+    tables = [Event.__table__] + [event_store.shard_table(month) for month in event_store.sealed_months(conn)]
+    for table in tables:
+        backfill_in_batches(conn, table.c.id, apply)
+
+
+# --- 9: ingestion time on events ---------------------------------------------
+
+
+def _add_event_received_at(conn: Connection) -> None:
+    """
+    Add the indexed `events.received_at` column, also to SQLite shards. The
+    analytics export tracks its progress by it. Existing rows stay NULL; a
+    full export covers them.
+
+    A partitioned Postgres index can't be built CONCURRENTLY, so it is created
+    on the parent alone and each partition's index is built concurrently and
+    attached.
+    """
+    postgres = conn.dialect.name == "postgresql"
+    tables = ["events"]
+    if not postgres:
+        tables += [event_store.partition_name(month) for month in event_store.sealed_months(conn)]
+    for table_name in tables:
+        _add_missing_columns(conn, table_name, {
+            "received_at": f"ALTER TABLE {table_name} ADD COLUMN received_at TIMESTAMP",
+        })
+    conn.commit()
+
+    if not postgres:
+        for table_name in tables:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS ix_{table_name}_received_at ON {table_name} (received_at)"))
+        conn.commit()
+        return
+
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_events_received_at ON ONLY events (received_at)"))
+    conn.commit()
+    conn.execution_options(isolation_level="AUTOCOMMIT")
+    invalid = invalid_indexes(conn)
+    for partition in event_store.attached_partitions(conn):
+        name = f"ix_{partition}_received_at"
+        if name in invalid:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {partition} (received_at)"))
+        attached = conn.execute(text(
+            "SELECT 1 FROM pg_inherits JOIN pg_class ON pg_class.oid = pg_inherits.inhrelid WHERE pg_class.relname = :name"
+        ), {"name": name}).scalar()
+        if not attached:
+            conn.execute(text(f"ALTER INDEX ix_events_received_at ATTACH PARTITION {name}"))
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create_missing_tables", _create_missing_tables),
+    Migration(2, "student_profile_columns", _add_student_profile_columns),
+    Migration(3, "mastery_model_columns", _add_mastery_model_columns),
+    Migration(4, "composite_indexes", _add_composite_indexes, online=True),
+    Migration(5, "backfill_badge_masks", _backfill_badge_masks, online=True),
+    Migration(6, "backfill_daily_stats", _backfill_daily_stats, online=True),
+    Migration(7, "partition_events", _partition_events, online=True, after_create=True),
+    Migration(8, "event_ids", _add_event_ids, online=True),
+    Migration(9, "event_received_at", _add_event_received_at, online=True),
+]
+
+HEAD_VERSION = MIGRATIONS[-1].version
+
+if [migration.version for migration in MIGRATIONS] != list(range(1, len(MIGRATIONS) + 1)):
+    raise ValueError("Migration versions must run 1, 2, 3, ... without gaps")
+
+
+def current_version(bind) -> Optional[int]:
+    """Latest applied version, 0 if none; None when `schema_version` doesn't exist yet."""
+    try:
+        with bind.connect() as conn:
+            return conn.execute(select(func.max(SchemaVersion.__table__.c.version))).scalar() or 0
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+def _plan(bind) -> Tuple[bool, List[Migration]]:
+    """(whether the database is empty, migrations still to apply)."""
+    version = current_version(bind)
+    if version is None and not inspect(bind).has_table(Student.__tablename__):
+        return True, list(MIGRATIONS)
+    return False, [migration for migration in MIGRATIONS if migration.version > (version or 0)]
+
+
+def pending_migrations(bind) -> List[Migration]:
+    return _plan(bind)[1]
+
+
+def migrate(bind, dry_run: bool = False) -> List[Migration]:
+    """Bring the schema up to `HEAD_VERSION`; returns the migrations applied (or pending, with dry_run)."""
+    empty, pending = _plan(bind)
+    if dry_run or not pending:
+        return pending
+
+    if empty:
+        # The models already describe the latest schema, short of a few dialect specifics
+        Base.metadata.create_all(bind=bind)
+        for migration in pending:
+            if migration.after_create:
+                with bind.connect() as conn:
+                    migration.upgrade(conn)
+                    conn.commit()
+        with bind.begin() as conn:
+            _record(conn, pending)
+        return pending
+
+    SchemaVersion.__table__.create(bind=bind, checkfirst=True)
+    for migration in pending:
+        started = time.perf_counter()
+        if migration.online:
+            with bind.connect() as conn:
+                migration.upgrade(conn)
+                _record(conn, [migration])
+                conn.commit()
+        else:
+            with bind.begin() as conn:
+                migration.upgrade(conn)
+                _record(conn, [migration])
+        log.info("Applied migration %d %s in %.1fs", migration.version, migration.name, time.perf_counter() - started)
+    return pending
+
+
+def _record(conn: Connection, migrations: List[Migration]) -> None:
+    now = datetime.now()
+    conn.execute(
+        insert(SchemaVersion.__table__),
+        [{"version": migration.version, "name": migration.name, "applied_at": now} for migration in migrations],
+    )
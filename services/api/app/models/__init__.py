@@ -1,8 +1,29 @@
 from .student import Student
 from .item import Item
 from .event import Event
+from .event_id import EventId
 from .mastery import Mastery
 from .daily_session import DailySession
 from .achievement import Achievement
+from .content_pack import ContentPack
+from .student_daily_stats import StudentDailyStats
+from .review_schedule import ReviewSchedule
+from .event_outbox import EventOutbox
+from .schema_version import SchemaVersion
+from .event_partition import EventPartition
 
-__all__ = ["Student", "Item", "Event", "Mastery", "DailySession", "Achievement"]
+__all__ = [
+    "Student",
+    "Item",
+    "Event",
+    "EventId",
+    "Mastery",
+    "DailySession",
+    "Achievement",
+    "ContentPack",
+    "StudentDailyStats",
+    "ReviewSchedule",
+    "EventOutbox",
+    "SchemaVersion",
+    "EventPartition",
+]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from .student import Base
@@ -6,9 +6,13 @@ from .student import Base
 
 class Achievement(Base):
     __tablename__ = "achievements"
+    __table_args__ = (
+        # Each badge is unlocked at most once per student
+        Index("uq_achievements_student_badge", "student_id", "badge_key", unique=True),
+    )
 
     id = Column(String, primary_key=True)
-    student_id = Column(String, ForeignKey("students.id"), nullable=False, index=True)
+    student_id = Column(String, ForeignKey("students.id"), nullable=False)
     badge_key = Column(String, nullable=False, index=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=False)
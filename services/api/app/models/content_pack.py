@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from .student import Base
+
+
+class ContentPack(Base):
+    __tablename__ = "content_packs"
+
+    version = Column(String, primary_key=True)
+    source = Column(String, nullable=False)
+    item_count = Column(Integer, nullable=False, default=0)
+    loaded_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<ContentPack(version={self.version}, items={self.item_count})>"
@@ -1,13 +1,17 @@
-from sqlalchemy import Column, String, Integer, DateTime, Date, Boolean, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, Date, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .student import Base
 
 
 class DailySession(Base):
     __tablename__ = "daily_sessions"
+    __table_args__ = (
+        # One session per student per day; concurrent first events rely on it to conflict
+        Index("uq_daily_sessions_student_date", "student_id", "session_date", unique=True),
+    )
 
     id = Column(String, primary_key=True)
-    student_id = Column(String, ForeignKey("students.id"), nullable=False, index=True)
+    student_id = Column(String, ForeignKey("students.id"), nullable=False)
     session_date = Column(Date, nullable=False, index=True)
     started_at = Column(DateTime, nullable=False)
     completed_questions = Column(Integer, nullable=False, default=0)
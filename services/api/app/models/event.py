@@ -1,19 +1,32 @@
-from sqlalchemy import Column, String, Boolean, Float, DateTime, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import Column, String, Boolean, Float, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .student import Base
 
 
 class Event(Base):
+    # On Postgres this is range-partitioned by month on `timestamp`, with
+    # primary key (id, timestamp); `event_ids` keeps ids unique. See
+    # app/event_store.py
     __tablename__ = "events"
+    __table_args__ = (
+        # A student's events in a time window (recent items, per-student reports)
+        Index("ix_events_student_timestamp", "student_id", "timestamp"),
+    )
 
     id = Column(String, primary_key=True)
-    student_id = Column(String, ForeignKey("students.id"), nullable=False, index=True)
+    student_id = Column(String, ForeignKey("students.id"), nullable=False)
     item_id = Column(String, ForeignKey("items.id"), nullable=False, index=True)
     answer_given = Column(String, nullable=False)
     is_correct = Column(Boolean, nullable=False)
     time_spent = Column(Float, nullable=False)
     hint_requested = Column(Boolean, default=False)
     timestamp = Column(DateTime, nullable=False, index=True)
+    # Server time the event was recorded; `timestamp` is the device's and can
+    # be days old for answers synced from offline. NULL for rows from before
+    # migration 9
+    received_at = Column(DateTime, nullable=True, index=True, default=datetime.now)
 
     # Relationships
     student = relationship("Student", back_populates="events")
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String
+from .student import Base
+
+
+class EventId(Base):
+    """
+    Every event id ever recorded, inserted in the same transaction as the event.
+
+    Makes event ids unique on their own: on Postgres `events` is partitioned
+    with primary key (id, timestamp), and SQLite shards and archived months
+    move rows out of `events`. Never partitioned, sealed or archived.
+    """
+    __tablename__ = "event_ids"
+
+    id = Column(String, primary_key=True)
+
+    def __repr__(self):
+        return f"<EventId(id={self.id})>"
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from .student import Base
+
+
+class EventOutbox(Base):
+    """Recorded events whose streak, session, mastery and badge updates are still pending (write-behind mode)."""
+    __tablename__ = "event_outbox"
+
+    # Arrival order; the worker applies events strictly in this order
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    # No foreign key: on Postgres `events` is partitioned and its id alone isn't a unique key
+    event_id = Column(String, nullable=False, unique=True)
+    enqueued_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<EventOutbox(seq={self.seq}, event={self.event_id}, enqueued_at={self.enqueued_at})>"
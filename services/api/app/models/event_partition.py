@@ -0,0 +1,19 @@
+from sqlalchemy import Column, String, Integer, Date, DateTime
+from .student import Base
+
+
+class EventPartition(Base):
+    """A month of events moved out of the hot `events` table (see app/event_store.py)."""
+    __tablename__ = "event_partitions"
+
+    # First day of the month
+    month = Column(Date, primary_key=True)
+    # "sealed": in its own SQLite shard table; "archived": exported to a file and dropped
+    state = Column(String, nullable=False)
+    table_name = Column(String, nullable=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    archived_path = Column(String, nullable=True)
+    updated_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<EventPartition(month={self.month}, state={self.state}, rows={self.row_count})>"
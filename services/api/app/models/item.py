@@ -1,13 +1,16 @@
-from sqlalchemy import Column, String, Integer, JSON, Text
+from sqlalchemy import Column, String, Integer, JSON, Text, Index
 from sqlalchemy.orm import relationship
 from .student import Base
 
 
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        Index("ix_items_skill_difficulty", "skill_id", "difficulty"),
+    )
 
     id = Column(String, primary_key=True)
-    skill_id = Column(String, nullable=False, index=True)
+    skill_id = Column(String, nullable=False)
     question_text = Column(Text, nullable=False)
     question_type = Column(String, nullable=False)
     difficulty = Column(Integer, nullable=False, index=True)
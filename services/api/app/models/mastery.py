@@ -12,6 +12,9 @@ class Mastery(Base):
     correct_attempts = Column(Integer, default=0, nullable=False)
     mastery_score = Column(Float, default=0.0, nullable=False)
     last_updated = Column(DateTime, nullable=False)
+    # Mastery engine that wrote model_state, and its sufficient statistic
+    model = Column(String, nullable=True)
+    model_state = Column(Float, nullable=True)
 
     # Relationships
     student = relationship("Student", back_populates="mastery")
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Integer, Float, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from .student import Base
+
+
+class ReviewSchedule(Base):
+    """SM-2 spaced-repetition state per (student, skill), maintained from the event write path."""
+    __tablename__ = "review_schedule"
+    __table_args__ = (
+        # "Due before T" for one student is a range scan on this index; skill_id
+        # is included so the scan never has to visit the table
+        Index("ix_review_schedule_student_due", "student_id", "due_at", "skill_id"),
+    )
+
+    student_id = Column(String, ForeignKey("students.id"), primary_key=True)
+    skill_id = Column(String, primary_key=True)
+    ease_factor = Column(Float, nullable=False, default=2.5)
+    interval_days = Column(Float, nullable=False, default=0.0)
+    repetitions = Column(Integer, nullable=False, default=0)
+    due_at = Column(DateTime, nullable=False)
+    last_reviewed_at = Column(DateTime, nullable=True)
+
+    student = relationship("Student")
+
+    def __repr__(self):
+        return (
+            f"<ReviewSchedule(student={self.student_id}, skill={self.skill_id}, "
+            f"interval={self.interval_days:.1f}d, due={self.due_at})>"
+        )
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Integer, DateTime
+from .student import Base
+
+
+class SchemaVersion(Base):
+    """One row per applied migration (see app/migrations.py)."""
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String, nullable=False)
+    applied_at = Column(DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<SchemaVersion(version={self.version}, name={self.name})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Date
+from sqlalchemy import BigInteger, Column, String, Integer, DateTime, Date
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -16,6 +16,8 @@ class Student(Base):
     longest_streak = Column(Integer, nullable=False, default=0)
     last_practice_date = Column(Date, nullable=True)
     total_sessions = Column(Integer, nullable=False, default=0)
+    # One bit per unlocked badge, see app/badges.py
+    badge_mask = Column(BigInteger, nullable=False, default=0)
     created_at = Column(DateTime, nullable=False)
 
     # Relationships
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, Integer, Float, Date, JSON, ForeignKey
+from sqlalchemy.orm import relationship
+from .student import Base
+
+
+class StudentDailyStats(Base):
+    """Per-student, per-day rollup of events, maintained from the event write path."""
+    __tablename__ = "student_daily_stats"
+
+    student_id = Column(String, ForeignKey("students.id"), primary_key=True)
+    stat_date = Column(Date, primary_key=True)
+    events_total = Column(Integer, nullable=False, default=0)
+    correct_total = Column(Integer, nullable=False, default=0)
+    time_spent_total = Column(Float, nullable=False, default=0.0)
+    hints_total = Column(Integer, nullable=False, default=0)
+    # {skill_id: [attempts, correct]}
+    skill_counts = Column(JSON, nullable=False, default=dict)
+
+    student = relationship("Student")
+
+    def __repr__(self):
+        return (
+            f"<StudentDailyStats(student={self.student_id}, date={self.stat_date}, "
+            f"correct={self.correct_total}/{self.events_total})>"
+        )
@@ -0,0 +1,85 @@
+"""
+SM-2 spaced-repetition scheduling per (student, skill).
+
+Every answer is graded on SM-2's 0-5 quality scale and folded into the
+student's `ReviewSchedule` row for the item's skill with O(1) work:
+
+- a wrong answer is a lapse: repetitions reset and the skill is due again
+  the next day
+- a correct answer at or after the due date is a successful review: the
+  interval grows 1 day, 6 days, then by the ease factor
+- a correct answer before the due date is extra practice and leaves the
+  schedule alone, so a day of drilling one skill doesn't push its next
+  review out by months
+
+The ease factor moves with every graded review as in SM-2 (never below 1.3).
+Rows are indexed on (student_id, due_at), so "what is due before T" is an
+index range scan rather than a pass over every mastery row.
+"""
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from .models import ReviewSchedule
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+PASSING_QUALITY = 3
+FIRST_INTERVAL_DAYS = 1.0
+SECOND_INTERVAL_DAYS = 6.0
+LAPSE_INTERVAL_DAYS = 1.0
+
+
+def answer_quality(is_correct: bool, hint_requested: bool = False) -> int:
+    """SM-2 quality (0-5) of one answer: 4 correct, 3 correct with a hint, 2 wrong."""
+    if not is_correct:
+        return 2
+    return 3 if hint_requested else 4
+
+
+def new_schedule(student_id: str, skill_id: str, at: datetime) -> ReviewSchedule:
+    return ReviewSchedule(
+        student_id=student_id,
+        skill_id=skill_id,
+        ease_factor=INITIAL_EASE,
+        interval_days=0.0,
+        repetitions=0,
+        due_at=at,
+        last_reviewed_at=None,
+    )
+
+
+def schedule_review(schedule: ReviewSchedule, quality: int, at: datetime) -> None:
+    """Fold one graded answer into `schedule` in place."""
+    # Client timestamps may be tz-aware while stored ones are naive
+    at = at.replace(tzinfo=None)
+    if quality < PASSING_QUALITY:
+        schedule.repetitions = 0
+        schedule.interval_days = LAPSE_INTERVAL_DAYS
+    elif schedule.last_reviewed_at is not None and at < schedule.due_at.replace(tzinfo=None):
+        return
+    else:
+        schedule.repetitions = (schedule.repetitions or 0) + 1
+        if schedule.repetitions == 1:
+            schedule.interval_days = FIRST_INTERVAL_DAYS
+        elif schedule.repetitions == 2:
+            schedule.interval_days = SECOND_INTERVAL_DAYS
+        else:
+            schedule.interval_days = schedule.interval_days * schedule.ease_factor
+
+    penalty = 5 - quality
+    schedule.ease_factor = max(MIN_EASE, schedule.ease_factor + 0.1 - penalty * (0.08 + penalty * 0.02))
+    schedule.last_reviewed_at = at
+    schedule.due_at = at + timedelta(days=schedule.interval_days)
+
+
+def due_skill_ids(db: Session, student_id: str, before: Optional[datetime] = None) -> List[str]:
+    """Skills due for review by `before` (default now), most overdue first."""
+    before = before or datetime.now()
+    rows = (
+        db.query(ReviewSchedule.skill_id)
+        .filter(ReviewSchedule.student_id == student_id, ReviewSchedule.due_at <= before)
+        .order_by(ReviewSchedule.due_at)
+    )
+    return [skill_id for (skill_id,) in rows]
@@ -8,7 +8,7 @@ router = APIRouter()
 
 
 @router.get("/achievements/{student_id}")
-async def get_achievements(student_id: str, db: Session = Depends(get_db)):
+def get_achievements(student_id: str, db: Session = Depends(get_db)):
     student = db.query(DBStudent).filter(DBStudent.id == student_id).first()
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
@@ -1,26 +1,29 @@
 from datetime import date, datetime
+from typing import Optional
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
+from ..database import get_async_db
 from ..models import DailySession as DBDailySession, Student as DBStudent
+from ..session_planner import plan_daily_set
+
+MAX_DAILY_SET_ITEMS = 50
 
 router = APIRouter()
 
 
 @router.post("/daily-session/start")
-async def start_daily_session(student_id: str, db: Session = Depends(get_db)):
-    student = db.query(DBStudent).filter(DBStudent.id == student_id).first()
+async def start_daily_session(student_id: str, db: AsyncSession = Depends(get_async_db)):
+    student = await db.get(DBStudent, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
     today = date.today()
-    session = db.query(DBDailySession).filter(
-        DBDailySession.student_id == student_id,
-        DBDailySession.session_date == today,
-    ).first()
+    session = await _get_daily_session(db, student_id, today)
 
     if not session:
         session = DBDailySession(
@@ -33,23 +36,20 @@ async def start_daily_session(student_id: str, db: Session = Depends(get_db)):
             is_completed=False,
         )
         db.add(session)
-        db.commit()
-        db.refresh(session)
+        await db.commit()
+        await db.refresh(session)
 
     return _serialize_daily_session(session)
 
 
 @router.get("/daily-session/status/{student_id}")
-async def get_daily_session_status(student_id: str, db: Session = Depends(get_db)):
-    student = db.query(DBStudent).filter(DBStudent.id == student_id).first()
+async def get_daily_session_status(student_id: str, db: AsyncSession = Depends(get_async_db)):
+    student = await db.get(DBStudent, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
     today = date.today()
-    session = db.query(DBDailySession).filter(
-        DBDailySession.student_id == student_id,
-        DBDailySession.session_date == today,
-    ).first()
+    session = await _get_daily_session(db, student_id, today)
 
     if not session:
         return {
@@ -70,6 +70,40 @@ async def get_daily_session_status(student_id: str, db: Session = Depends(get_db
     return payload
 
 
+@router.get("/daily-session/{student_id}")
+async def get_daily_set(
+    student_id: str,
+    count: Optional[int] = Query(None, ge=1, le=MAX_DAILY_SET_ITEMS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Plan the student's whole daily set in one call: weak skills, spaced
+    review and new frontier skills. `count` defaults to the student's
+    target_daily_questions.
+    """
+    plan = await db.run_sync(_plan_daily_set, student_id, count)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    return plan
+
+
+def _plan_daily_set(db: Session, student_id: str, count: Optional[int]):
+    student = db.get(DBStudent, student_id)
+    if student is None:
+        return None
+    return plan_daily_set(db, student, count)
+
+
+async def _get_daily_session(db: AsyncSession, student_id: str, session_date: date):
+    result = await db.execute(
+        select(DBDailySession).where(
+            DBDailySession.student_id == student_id,
+            DBDailySession.session_date == session_date,
+        ).limit(1)
+    )
+    return result.scalars().first()
+
+
 def _serialize_daily_session(session: DBDailySession) -> dict:
     return {
         "id": session.id,
@@ -1,40 +1,79 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
-from typing import Dict
+from typing import Dict, List
 from uuid import uuid4
 import sys
 sys.path.append("../../packages/shared")
 
-from ..database import get_db
+from ..badges import BadgeContext, grant_badges
+from ..config import settings
+from ..daily_stats import new_daily_stats, record_event
+from ..database import get_async_db
+from ..event_dedup import recent_event_ids
+from ..event_outbox import OutboxWorker
+from ..mastery_engine import mastery_engine
 from ..models import (
-    Achievement as DBAchievement,
     Event as DBEvent,
+    EventId as DBEventId,
+    EventOutbox as DBEventOutbox,
+    Item as DBItem,
     Mastery as DBMastery,
+    ReviewSchedule as DBReviewSchedule,
     Student as DBStudent,
     DailySession as DBDailySession,
+    StudentDailyStats as DBStudentDailyStats,
 )
+from ..review_scheduler import answer_quality, new_schedule, schedule_review
 
 router = APIRouter()
 
+REQUIRED_EVENT_FIELDS = ["event_id", "student_id", "item_id", "answer_given", "is_correct", "time_spent"]
+MAX_BATCH_EVENTS = 500
+# Postgres serialization failure / deadlock detected / lock not available
+RETRYABLE_SQLSTATES = {"40001", "40P01", "55P03"}
+UNIQUE_VIOLATION_SQLSTATE = "23505"
+
 
 @router.post("/events")
 async def create_event(
     event_data: Dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Record a student answer event and update mastery scores.
+
+    Idempotent on event_id: a resent event gets the original result back
+    with "duplicate": true and no streak, session, mastery or badge updates.
+    In write-behind mode (settings.event_write_behind) only the event is
+    written and "queued": true is returned; see event_outbox.py.
     """
-    missing_fields = [
-        field
-        for field in ["event_id", "student_id", "item_id", "answer_given", "is_correct", "time_spent"]
-        if field not in event_data
-    ]
+    missing_fields = _missing_fields(event_data)
     if missing_fields:
         raise HTTPException(status_code=400, detail=f"Missing fields: {', '.join(missing_fields)}")
 
-    student = db.query(DBStudent).filter(DBStudent.id == event_data["student_id"]).first()
+    defer = await _make_room_in_outbox()
+    result = await db.run_sync(_record_event, event_data, defer)
+    if result.get("queued"):
+        outbox_worker.enqueued(1, datetime.now())
+    return result
+
+
+def _record_event(db: Session, event_data: Dict, defer: bool = False) -> dict:
+    event_id = event_data["event_id"]
+    if recent_event_ids.seen(event_id):
+        return _event_result(event_id, duplicate=True)
+
+    result = _retry_on_conflict(db, _write_event, event_data, defer)
+    recent_event_ids.add([event_id])
+    return result
+
+
+def _write_event(db: Session, event_data: Dict, defer: bool = False) -> dict:
+    student = _lock_students(db, [event_data["student_id"]]).get(event_data["student_id"])
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
 
@@ -52,44 +91,378 @@ async def create_event(
         timestamp=event_timestamp
     )
 
-    db.add(event)
+    db.add_all([event, DBEventId(id=event.id)])
+    # Insert the event before any side effect: a resent event_id fails here
+    # on the event_ids primary key, before the streak or session counters
+    # move, whatever timestamp the resend carries
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        if db.get(DBEventId, event.id) is None:
+            raise
+        return _event_result(event.id, duplicate=True)
+
+    if defer:
+        _enqueue_aggregates(db, [event])
+        db.commit()
+        return _event_result(event.id, queued=True)
+
     _update_student_streak(student, event_timestamp.date())
     daily_session = _update_daily_session_progress(db, student, event_timestamp)
 
     # Update mastery
     # First get the skill_id from the item
-    from ..models import Item as DBItem
     item = db.query(DBItem).filter(DBItem.id == event_data["item_id"]).first()
 
+    mastery = None
     if item:
-        mastery = db.query(DBMastery).filter(
-            DBMastery.student_id == event_data["student_id"],
-            DBMastery.skill_id == item.skill_id
-        ).first()
+        mastery = _update_mastery(
+            db, student.id, item.skill_id, item.difficulty, event_data["is_correct"], event_timestamp
+        )
+        _update_review_schedule(db, event, item.skill_id)
+    daily_stats = _update_daily_stats(db, event, item.skill_id if item else None)
+
+    _unlock_achievements(db, student, daily_session, event_timestamp, daily_stats=daily_stats, mastery=mastery)
+    db.commit()
+
+    return _event_result(event.id)
+
+
+def _lock_students(db: Session, student_ids) -> Dict[str, DBStudent]:
+    """
+    Load the students' rows, locked until the transaction ends.
+
+    Every aggregate an event updates (streak and session counters, badge_mask,
+    mastery, review schedule, daily session and rollup rows) belongs to one
+    student and is a read-modify-write in Python, so concurrent requests for
+    the same student must not interleave. Postgres takes row locks with
+    SELECT ... FOR UPDATE, in id order so two batches can't deadlock. SQLite
+    has no row locks: a no-op UPDATE takes the database write lock before
+    anything is read, and other writers wait on the busy timeout.
+    """
+    student_ids = sorted(student_ids)
+    if not student_ids:
+        return {}
+    query = db.query(DBStudent).filter(DBStudent.id.in_(student_ids)).order_by(DBStudent.id)
+    if db.get_bind().dialect.name == "sqlite":
+        table = DBStudent.__table__
+        db.execute(update(table).where(table.c.id.in_(student_ids)).values(id=table.c.id))
+    else:
+        query = query.with_for_update()
+    # Refresh rows this session already holds: they may predate the lock
+    return {student.id: student for student in query.populate_existing().all()}
+
+
+def _event_result(event_id, duplicate: bool = False, queued: bool = False) -> dict:
+    result = {"status": "success", "event_id": event_id}
+    if duplicate:
+        result["duplicate"] = True
+    if queued:
+        result["queued"] = True
+    return result
+
+
+def _retry_on_conflict(db: Session, write, *args):
+    """
+    Run `write(db, *args)`, retrying from scratch when it collides with a concurrent write.
+
+    Writes for the same student are serialised by `_lock_students`, so this
+    mostly covers a concurrent resend of the same event getting in first (the
+    retry finds its event_id), lock timeouts and deadlocks. SQLite reports a
+    write whose read snapshot went stale as "database is locked" without
+    waiting out the busy timeout; that is retried the same way.
+    """
+    for attempt in range(settings.event_write_retries + 1):
+        try:
+            return write(db, *args)
+        except DBAPIError as exc:
+            db.rollback()
+            if attempt == settings.event_write_retries or not _is_write_conflict(exc):
+                raise
+
 
-        if mastery:
-            # Update existing mastery
-            mastery.total_attempts += 1
-            if event_data["is_correct"]:
-                mastery.correct_attempts += 1
-            mastery.mastery_score = mastery.correct_attempts / mastery.total_attempts
-            mastery.last_updated = datetime.now()
+def _is_write_conflict(exc: DBAPIError) -> bool:
+    """
+    Whether a concurrent write caused `exc`: a duplicate key on an event id or
+    on a row both requests tried to insert first, a serialization failure,
+    deadlock or lock timeout. NOT NULL, foreign key and check violations fail
+    the same way every time, so they are raised at once.
+    """
+    # psycopg2 exposes the SQLSTATE as pgcode, asyncpg as sqlstate
+    sqlstate = getattr(exc.orig, "pgcode", None) or getattr(exc.orig, "sqlstate", None)
+    if isinstance(exc, IntegrityError):
+        return sqlstate == UNIQUE_VIOLATION_SQLSTATE or "UNIQUE constraint failed" in str(exc.orig)
+    return sqlstate in RETRYABLE_SQLSTATES or "database is locked" in str(exc.orig)
+
+
+@router.post("/events/batch")
+async def create_events_batch(
+    events_data: List[Dict],
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Record an ordered batch of answer events (e.g. replayed from an offline buffer).
+
+    Every referenced row is loaded up front with a handful of IN (...) queries,
+    streak/session/mastery/badge updates are applied in memory in the given
+    order, and the whole batch is committed once. Events whose event_id is
+    already stored (or repeated earlier in the batch) are reported as
+    duplicates and have no side effects, so replaying a batch is safe.
+    """
+    if len(events_data) > MAX_BATCH_EVENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(events_data)} events (max {MAX_BATCH_EVENTS})",
+        )
+
+    defer = await _make_room_in_outbox()
+    response = await db.run_sync(_record_events_batch, events_data, defer)
+    if response.get("queued"):
+        outbox_worker.enqueued(response["created"], datetime.now())
+    return response
+
+
+def _record_events_batch(db: Session, events_data: List[Dict], defer: bool = False) -> dict:
+    response = _retry_on_conflict(db, _write_events_batch, events_data, defer)
+    recent_event_ids.add(result["event_id"] for result in response["results"] if result["status"] == "created")
+    return response
+
+
+def _write_events_batch(db: Session, events_data: List[Dict], defer: bool = False) -> dict:
+    results = [None] * len(events_data)
+    candidates = []
+    batch_ids = set()
+
+    for index, event_data in enumerate(events_data):
+        event_id = event_data.get("event_id")
+        missing_fields = _missing_fields(event_data)
+        if missing_fields:
+            results[index] = _batch_result(event_id, "rejected", f"Missing fields: {', '.join(missing_fields)}")
+        elif event_id in batch_ids or recent_event_ids.seen(event_id):
+            results[index] = _batch_result(event_id, "duplicate")
         else:
-            # Create new mastery record
-            mastery = DBMastery(
-                student_id=event_data["student_id"],
-                skill_id=item.skill_id,
-                total_attempts=1,
-                correct_attempts=1 if event_data["is_correct"] else 0,
-                mastery_score=1.0 if event_data["is_correct"] else 0.0,
-                last_updated=datetime.now()
-            )
-            db.add(mastery)
+            batch_ids.add(event_id)
+            candidates.append((index, event_data))
+
+    existing_ids = set()
+    students = {}
+    if candidates:
+        existing_ids = {
+            row.id for row in db.query(DBEventId.id).filter(DBEventId.id.in_(batch_ids)).all()
+        }
+        students = _lock_students(db, {event_data["student_id"] for _, event_data in candidates})
+
+    accepted = []
+    for index, event_data in candidates:
+        event_id = event_data["event_id"]
+        if event_id in existing_ids:
+            results[index] = _batch_result(event_id, "duplicate")
+            continue
+        if event_data["student_id"] not in students:
+            results[index] = _batch_result(event_id, "rejected", "Student not found")
+            continue
+
+        event = DBEvent(
+            id=event_id,
+            student_id=event_data["student_id"],
+            item_id=event_data["item_id"],
+            answer_given=event_data["answer_given"],
+            is_correct=event_data["is_correct"],
+            time_spent=event_data["time_spent"],
+            hint_requested=event_data.get("hint_requested", False),
+            timestamp=_parse_timestamp(event_data.get("timestamp")),
+        )
+        db.add_all([event, DBEventId(id=event_id)])
+        accepted.append(event)
+        results[index] = _batch_result(event_id, "created")
+
+    if accepted:
+        if defer:
+            _enqueue_aggregates(db, accepted)
+        else:
+            _apply_event_aggregates(db, accepted, students)
+        db.commit()
+
+    response = {
+        "status": "success",
+        "created": sum(1 for result in results if result["status"] == "created"),
+        "duplicates": sum(1 for result in results if result["status"] == "duplicate"),
+        "rejected": sum(1 for result in results if result["status"] == "rejected"),
+        "results": results,
+    }
+    if defer and accepted:
+        response["queued"] = True
+    return response
+
+
+@router.post("/events/flush")
+async def flush_event_outbox():
+    """
+    Apply every queued write-behind event now and return the worker stats.
+
+    For tests and deploys: afterwards streaks, sessions, mastery and badges
+    reflect every recorded event.
+    """
+    applied = await outbox_worker.flush()
+    return {"applied": applied, **outbox_worker.stats()}
 
-    _unlock_achievements(db, student, daily_session, event_timestamp)
-    db.commit()
 
-    return {"status": "success", "event_id": event.id}
+@router.get("/events/outbox-stats")
+async def get_event_outbox_stats():
+    """Queue depth, lag and throughput of the write-behind aggregate worker."""
+    return outbox_worker.stats()
+
+
+async def _make_room_in_outbox() -> bool:
+    """Whether this request should defer its aggregates; drains a batch first when the queue is full."""
+    if not settings.event_write_behind:
+        return False
+    if outbox_worker.backlogged:
+        # Backpressure: the submitter pays for one batch so the lag can't grow unbounded
+        await outbox_worker.drain_once()
+    return True
+
+
+def _enqueue_aggregates(db: Session, events: List[DBEvent]) -> None:
+    enqueued_at = datetime.now()
+    db.add_all(DBEventOutbox(event_id=event.id, enqueued_at=enqueued_at) for event in events)
+
+
+def _drain_outbox(db: Session, batch_size: int) -> dict:
+    """
+    Apply aggregates for the oldest `batch_size` queued events, in arrival order, and commit.
+
+    The outbox rows are deleted before anything is applied. If another
+    process deleted some of them first, this drain backs off and leaves the
+    batch to that process.
+    """
+    def apply_batch(db: Session) -> int:
+        rows = (
+            db.query(DBEventOutbox.seq, DBEventOutbox.event_id)
+            .order_by(DBEventOutbox.seq)
+            .limit(batch_size)
+            .all()
+        )
+        if not rows:
+            return 0
+        claimed = (
+            db.query(DBEventOutbox)
+            .filter(DBEventOutbox.seq.in_([seq for seq, _ in rows]))
+            .delete(synchronize_session=False)
+        )
+        if claimed != len(rows):
+            db.rollback()
+            return 0
+
+        by_id = {
+            event.id: event
+            for event in db.query(DBEvent).filter(DBEvent.id.in_([event_id for _, event_id in rows])).all()
+        }
+        events = [by_id[event_id] for _, event_id in rows if event_id in by_id]
+        students = _lock_students(db, {event.student_id for event in events})
+        events = [event for event in events if event.student_id in students]
+        if events:
+            _apply_event_aggregates(db, events, students)
+        db.commit()
+        return len(events)
+
+    applied = _retry_on_conflict(db, apply_batch)
+    oldest = db.query(DBEventOutbox.enqueued_at).order_by(DBEventOutbox.seq).first()
+    return {
+        "applied": applied,
+        "pending": db.query(func.count(DBEventOutbox.seq)).scalar(),
+        "oldest_enqueued_at": oldest[0] if oldest else None,
+    }
+
+
+outbox_worker = OutboxWorker(
+    _drain_outbox,
+    batch_size=settings.event_outbox_batch_size,
+    poll_seconds=settings.event_outbox_poll_seconds,
+    max_pending=settings.event_outbox_max_pending,
+)
+
+
+def _missing_fields(event_data: Dict) -> List[str]:
+    return [field for field in REQUIRED_EVENT_FIELDS if field not in event_data]
+
+
+def _batch_result(event_id, status: str, detail: str = None) -> dict:
+    result = {"event_id": event_id, "status": status}
+    if detail:
+        result["detail"] = detail
+    return result
+
+
+def _apply_event_aggregates(db: Session, events: List[DBEvent], students: Dict[str, DBStudent]):
+    """
+    Apply streak, daily-session, mastery, review-schedule and badge updates for already-added events.
+
+    Items, mastery rows, review schedules and daily sessions for the whole batch
+    are preloaded into dicts so the per-event helpers never query; unlocked
+    badges are already on the student rows (badge_mask).
+    """
+    student_ids = {event.student_id for event in events}
+    item_ids = {event.item_id for event in events}
+    practice_dates = {event.timestamp.date() for event in events}
+
+    item_skills = {
+        row.id: (row.skill_id, row.difficulty)
+        for row in db.query(DBItem.id, DBItem.skill_id, DBItem.difficulty).filter(DBItem.id.in_(item_ids)).all()
+    }
+    skill_ids = {skill_id for skill_id, _ in item_skills.values()}
+
+    mastery_rows = {}
+    schedules = {}
+    if skill_ids:
+        mastery_rows = {
+            (row.student_id, row.skill_id): row
+            for row in db.query(DBMastery).filter(
+                DBMastery.student_id.in_(student_ids),
+                DBMastery.skill_id.in_(skill_ids),
+            ).all()
+        }
+        schedules = {
+            (row.student_id, row.skill_id): row
+            for row in db.query(DBReviewSchedule).filter(
+                DBReviewSchedule.student_id.in_(student_ids),
+                DBReviewSchedule.skill_id.in_(skill_ids),
+            ).all()
+        }
+
+    sessions = {
+        (row.student_id, row.session_date): row
+        for row in db.query(DBDailySession).filter(
+            DBDailySession.student_id.in_(student_ids),
+            DBDailySession.session_date.in_(practice_dates),
+        ).all()
+    }
+
+    daily_stats = {
+        (row.student_id, row.stat_date): row
+        for row in db.query(DBStudentDailyStats).filter(
+            DBStudentDailyStats.student_id.in_(student_ids),
+            DBStudentDailyStats.stat_date.in_(practice_dates),
+        ).all()
+    }
+
+    for event in events:
+        student = students[event.student_id]
+        _update_student_streak(student, event.timestamp.date())
+        daily_session = _update_daily_session_progress(db, student, event.timestamp, sessions=sessions)
+
+        skill_id = None
+        mastery = None
+        if event.item_id in item_skills:
+            skill_id, difficulty = item_skills[event.item_id]
+            mastery = _update_mastery(
+                db, student.id, skill_id, difficulty, event.is_correct, event.timestamp, mastery_rows=mastery_rows
+            )
+            _update_review_schedule(db, event, skill_id, schedules=schedules)
+        stats = _update_daily_stats(db, event, skill_id, daily_stats=daily_stats)
+
+        _unlock_achievements(db, student, daily_session, event.timestamp, daily_stats=stats, mastery=mastery)
 
 
 def _parse_timestamp(raw_value):
@@ -124,12 +497,21 @@ def _update_student_streak(student: DBStudent, practice_date):
     student.total_sessions += 1
 
 
-def _update_daily_session_progress(db: Session, student: DBStudent, event_timestamp: datetime):
+def _update_daily_session_progress(
+    db: Session,
+    student: DBStudent,
+    event_timestamp: datetime,
+    sessions: Dict = None,
+):
     practice_date = event_timestamp.date()
-    session = db.query(DBDailySession).filter(
-        DBDailySession.student_id == student.id,
-        DBDailySession.session_date == practice_date,
-    ).first()
+    if sessions is not None:
+        # Preloaded by the batch path, keyed by (student_id, session_date).
+        session = sessions.get((student.id, practice_date))
+    else:
+        session = db.query(DBDailySession).filter(
+            DBDailySession.student_id == student.id,
+            DBDailySession.session_date == practice_date,
+        ).first()
 
     if not session:
         session = DBDailySession(
@@ -143,6 +525,8 @@ def _update_daily_session_progress(db: Session, student: DBStudent, event_timest
             completed_at=None,
         )
         db.add(session)
+        if sessions is not None:
+            sessions[(student.id, practice_date)] = session
 
     session.completed_questions += 1
 
@@ -153,40 +537,104 @@ def _update_daily_session_progress(db: Session, student: DBStudent, event_timest
     return session
 
 
-BADGE_DEFS = {
-    "streak_3": ("连续3天", "连续练习 3 天"),
-    "streak_7": ("连续7天", "连续练习 7 天"),
-    "daily_goal_1": ("今日达标", "首次完成每日目标"),
-    "sessions_20": ("练习达人", "累计完成 20 次答题"),
-}
+def _update_mastery(
+    db: Session,
+    student_id: str,
+    skill_id: str,
+    difficulty: int,
+    is_correct: bool,
+    answered_at: datetime,
+    mastery_rows: Dict = None,
+):
+    if mastery_rows is not None:
+        # Preloaded by the batch path, keyed by (student_id, skill_id).
+        mastery = mastery_rows.get((student_id, skill_id))
+    else:
+        mastery = db.query(DBMastery).filter(
+            DBMastery.student_id == student_id,
+            DBMastery.skill_id == skill_id
+        ).first()
 
+    if not mastery:
+        # Create new mastery record
+        mastery = DBMastery(
+            student_id=student_id,
+            skill_id=skill_id,
+            total_attempts=0,
+            correct_attempts=0,
+            mastery_score=0.0,
+            last_updated=answered_at,
+        )
+        db.add(mastery)
+        if mastery_rows is not None:
+            mastery_rows[(student_id, skill_id)] = mastery
 
-def _unlock_achievements(db: Session, student: DBStudent, daily_session: DBDailySession, now: datetime):
-    _maybe_grant_badge(db, student.id, "streak_3", student.current_streak >= 3, now)
-    _maybe_grant_badge(db, student.id, "streak_7", student.current_streak >= 7, now)
-    _maybe_grant_badge(db, student.id, "daily_goal_1", bool(daily_session and daily_session.is_completed), now)
-    _maybe_grant_badge(db, student.id, "sessions_20", student.total_sessions >= 20, now)
+    # O(1) update from the stored sufficient statistics, see mastery_engine.py
+    mastery_engine.update(mastery, is_correct, difficulty, answered_at)
+    return mastery
 
 
-def _maybe_grant_badge(db: Session, student_id: str, badge_key: str, condition: bool, unlocked_at: datetime):
-    if not condition:
-        return
+def _update_review_schedule(
+    db: Session,
+    event: DBEvent,
+    skill_id: str,
+    schedules: Dict = None,
+):
+    key = (event.student_id, skill_id)
+    if schedules is not None:
+        # Preloaded by the batch path, keyed by (student_id, skill_id).
+        schedule = schedules.get(key)
+    else:
+        schedule = db.query(DBReviewSchedule).filter(
+            DBReviewSchedule.student_id == key[0],
+            DBReviewSchedule.skill_id == key[1],
+        ).first()
 
-    exists = db.query(DBAchievement).filter(
-        DBAchievement.student_id == student_id,
-        DBAchievement.badge_key == badge_key,
-    ).first()
-    if exists:
-        return
+    if not schedule:
+        schedule = new_schedule(*key, event.timestamp.replace(tzinfo=None))
+        db.add(schedule)
+        if schedules is not None:
+            schedules[key] = schedule
 
-    title, description = BADGE_DEFS[badge_key]
-    db.add(
-        DBAchievement(
-            id=str(uuid4()),
-            student_id=student_id,
-            badge_key=badge_key,
-            title=title,
-            description=description,
-            unlocked_at=unlocked_at,
-        )
-    )
+    # SM-2 update, see review_scheduler.py
+    schedule_review(schedule, answer_quality(event.is_correct, event.hint_requested), event.timestamp)
+    return schedule
+
+
+def _update_daily_stats(
+    db: Session,
+    event: DBEvent,
+    skill_id: str = None,
+    daily_stats: Dict = None,
+):
+    key = (event.student_id, event.timestamp.date())
+    if daily_stats is not None:
+        # Preloaded by the batch path, keyed by (student_id, stat_date).
+        stats = daily_stats.get(key)
+    else:
+        stats = db.query(DBStudentDailyStats).filter(
+            DBStudentDailyStats.student_id == key[0],
+            DBStudentDailyStats.stat_date == key[1],
+        ).first()
+
+    if not stats:
+        stats = new_daily_stats(*key)
+        db.add(stats)
+        if daily_stats is not None:
+            daily_stats[key] = stats
+
+    record_event(stats, event.is_correct, event.time_spent, event.hint_requested, skill_id)
+    return stats
+
+
+def _unlock_achievements(
+    db: Session,
+    student: DBStudent,
+    daily_session: DBDailySession,
+    now: datetime,
+    daily_stats: DBStudentDailyStats = None,
+    mastery: DBMastery = None,
+):
+    # Rules and unlocked state are both in memory, see badges.py
+    context = BadgeContext(student, daily_session=daily_session, daily_stats=daily_stats, mastery=mastery)
+    return grant_badges(db, context, now)
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import Optional
 import sys
 sys.path.append("../../packages/shared")
 
-from ..database import get_db
-from ..models import Item as DBItem, Event as DBEvent, Mastery as DBMastery
+from ..database import get_async_db
+from ..item_cache import item_cache
+from ..item_index import item_index
+from ..mastery_engine import mastery_engine, target_difficulty
+from ..models import Mastery as DBMastery
+from ..review_scheduler import due_skill_ids
+from ..skill_graph import student_frontier
 
 router = APIRouter()
 
@@ -15,13 +20,26 @@ router = APIRouter()
 async def get_next_item(
     student_id: str,
     skill_id: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Fetch next item for a student based on their mastery level.
     If skill_id is provided, filter items for that skill.
-    Otherwise, select based on student's weakest skills.
+    Otherwise, serve the most overdue spaced-repetition review, then select
+    from the student's frontier skills (prerequisites mastered, skill not yet
+    mastered), falling back to their weakest skill.
     """
+    payload = await db.run_sync(_next_item_payload, student_id, skill_id)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="No items available")
+
+    # Pre-encoded JSON bytes, same shape as the Pydantic Item schema
+    return Response(content=payload, media_type="application/json")
+
+
+def _next_item_payload(db: Session, student_id: str, skill_id: Optional[str]) -> Optional[bytes]:
+    item_index.ensure_fresh(db)
+
     # Get student's mastery data
     if skill_id:
         mastery = db.query(DBMastery).filter(
@@ -29,57 +47,44 @@ async def get_next_item(
             DBMastery.skill_id == skill_id
         ).first()
 
-        # Determine difficulty based on mastery score
-        if mastery:
-            if mastery.mastery_score < 0.3:
-                target_difficulty = 1
-            elif mastery.mastery_score < 0.5:
-                target_difficulty = 2
-            elif mastery.mastery_score < 0.7:
-                target_difficulty = 3
-            elif mastery.mastery_score < 0.9:
-                target_difficulty = 4
-            else:
-                target_difficulty = 5
-        else:
-            # No mastery data, start with difficulty 1
-            target_difficulty = 1
+        # Determine difficulty based on (decayed) mastery score;
+        # no mastery data starts at difficulty 1
+        target = target_difficulty(mastery_engine.current_score(mastery) if mastery else None)
 
-        # Fetch item with target difficulty
-        item = db.query(DBItem).filter(
-            DBItem.skill_id == skill_id,
-            DBItem.difficulty == target_difficulty
-        ).order_by(func.random()).first()
+        # Pick item with target difficulty
+        item_id = item_index.choice(skill_id=skill_id, difficulty=target)
     else:
-        # No skill specified - find weakest skill and provide item for it
-        weakest_skill = db.query(DBMastery).filter(
+        # No skill specified - a review that has come due goes first (index
+        # range scan on review_schedule), then the weakest skill on the student's
+        # frontier, then the earliest new one; outside the curriculum graph
+        # fall back to the weakest skill overall. Decay depends on
+        # last_updated, so rank in Python (one row per skill).
+        mastery_rows = db.query(DBMastery).filter(
             DBMastery.student_id == student_id
-        ).order_by(DBMastery.mastery_score).first()
+        ).all()
+        scores, frontier = student_frontier(mastery_rows)
+        started = [frontier_skill for frontier_skill in frontier if frontier_skill in scores]
+        due = [due_skill for due_skill in due_skill_ids(db, student_id) if item_index.item_ids(skill_id=due_skill)]
+        if due:
+            skill_id = due[0]
+        elif started:
+            skill_id = min(started, key=scores.get)
+        elif frontier:
+            skill_id = frontier[0]
+        else:
+            weakest_skill = min(mastery_rows, key=mastery_engine.current_score, default=None)
+            skill_id = weakest_skill.skill_id if weakest_skill else None
 
-        if weakest_skill:
-            skill_id = weakest_skill.skill_id
-            item = db.query(DBItem).filter(
-                DBItem.skill_id == skill_id
-            ).order_by(func.random()).first()
+        if skill_id:
+            item_id = item_index.choice(skill_id=skill_id)
         else:
             # Student has no mastery data - select any item
-            item = db.query(DBItem).filter(
-                DBItem.difficulty == 1
-            ).order_by(func.random()).first()
+            item_id = item_index.choice(difficulty=1)
+
+    return item_cache.get(db, item_id, item_index.version) if item_id else None
 
-    if not item:
-        raise HTTPException(status_code=404, detail="No items available")
 
-    # Convert to dict format matching Pydantic schema
-    return {
-        "item_id": item.id,
-        "skill_id": item.skill_id,
-        "question_text": item.question_text,
-        "question_type": item.question_type,
-        "difficulty": item.difficulty,
-        "parameters": item.parameters,
-        "correct_answer": item.correct_answer,
-        "hint": item.hint,
-        "explanation": item.explanation,
-        "validation_rule": item.validation_rule
-    }
+@router.get("/items/cache-stats")
+async def get_item_cache_stats():
+    """Hit/miss counters for the serialized item payload cache."""
+    return {**item_cache.stats(), "index_version": item_index.version}
@@ -5,19 +5,21 @@ import sys
 sys.path.append("../../packages/shared")
 
 from ..database import get_db
+from ..mastery_engine import mastery_engine
 from ..models import Mastery as DBMastery
 
 router = APIRouter()
 
 
 @router.get("/mastery/{student_id}")
-async def get_mastery(
+def get_mastery(
     student_id: str,
     db: Session = Depends(get_db)
 ):
     """
     Get all mastery data for a student.
-    Returns mastery scores for all skills the student has attempted.
+    Returns mastery scores for all skills the student has attempted,
+    with time decay applied as of now.
     """
     mastery_records = db.query(DBMastery).filter(
         DBMastery.student_id == student_id
@@ -34,7 +36,7 @@ async def get_mastery(
             "skill_id": record.skill_id,
             "total_attempts": record.total_attempts,
             "correct_attempts": record.correct_attempts,
-            "mastery_score": record.mastery_score,
+            "mastery_score": mastery_engine.current_score(record),
             "last_updated": record.last_updated.isoformat()
         })
 
@@ -1,62 +1,147 @@
+from collections import defaultdict
 from datetime import date, datetime, time, timedelta
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import and_, case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db
-from ..models import Achievement as DBAchievement, DailySession as DBDailySession, Event as DBEvent, Student as DBStudent
+from ..database import get_async_db
+from ..models import (
+    Achievement as DBAchievement,
+    DailySession as DBDailySession,
+    Event as DBEvent,
+    Student as DBStudent,
+    StudentDailyStats as DBStudentDailyStats,
+)
 
 router = APIRouter()
 
+# A school term is 10-11 weeks; longer ranges should be split by the caller
+MAX_REPORT_DAYS = 120
+
 
 @router.get("/parent/daily-summary")
-async def get_parent_daily_summary(db: Session = Depends(get_db)):
+async def get_parent_daily_summary(db: AsyncSession = Depends(get_async_db)):
     today = date.today()
-    students = db.query(DBStudent).order_by(DBStudent.name.asc()).all()
-    return [_build_student_daily_summary(db, student, today) for student in students]
+    rows = await db.run_sync(_daily_summary_rows, today)
+    return [_serialize_daily_summary(row, today) for row in rows]
 
 
 @router.get("/parent/daily-summary/{student_id}")
-async def get_parent_daily_summary_for_student(student_id: str, db: Session = Depends(get_db)):
-    student = db.query(DBStudent).filter(DBStudent.id == student_id).first()
+async def get_parent_daily_summary_for_student(student_id: str, db: AsyncSession = Depends(get_async_db)):
+    student = await db.get(DBStudent, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-    return _build_student_daily_summary(db, student, date.today())
+    return await db.run_sync(_build_student_daily_summary, student, date.today())
 
 
 @router.get("/parent/weekly-summary")
-async def get_parent_weekly_summary(db: Session = Depends(get_db)):
+async def get_parent_weekly_summary(db: AsyncSession = Depends(get_async_db)):
     today = date.today()
     start_day = today - timedelta(days=6)
 
-    students = db.query(DBStudent).order_by(DBStudent.name.asc()).all()
-    return [_build_student_weekly_summary(db, student, start_day, today) for student in students]
+    students = await _list_students(db)
+    return await db.run_sync(_build_range_summaries, students, start_day, today)
+
+
+@router.get("/parent/monthly-summary")
+async def get_parent_monthly_summary(month: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """Calendar-month summary; `month` is YYYY-MM and defaults to the current month."""
+    today = date.today()
+    try:
+        start_day = datetime.strptime(month, "%Y-%m").date() if month else today.replace(day=1)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must be formatted as YYYY-MM")
+    next_month = (start_day.replace(day=28) + timedelta(days=4)).replace(day=1)
+    end_day = next_month - timedelta(days=1)
+
+    students = await _list_students(db)
+    return await db.run_sync(_build_range_summaries, students, start_day, end_day)
+
+
+@router.get("/parent/term-summary")
+async def get_parent_term_summary(start_date: date, end_date: date, db: AsyncSession = Depends(get_async_db)):
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if (end_date - start_date).days + 1 > MAX_REPORT_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range must be at most {MAX_REPORT_DAYS} days")
+
+    students = await _list_students(db)
+    return await db.run_sync(_build_range_summaries, students, start_date, end_date)
+
+
+async def _list_students(db: AsyncSession) -> List[DBStudent]:
+    result = await db.execute(select(DBStudent).order_by(DBStudent.name.asc()))
+    return list(result.scalars().all())
 
 
 def _build_student_daily_summary(db: Session, student: DBStudent, day: date) -> dict:
+    row = _daily_summary_rows(db, day, student_id=student.id)[0]
+    return _serialize_daily_summary(row, day)
+
+
+def _daily_summary_rows(db: Session, day: date, student_id: str = None) -> list:
+    """
+    One query for the whole report: students left-joined with today's session,
+    per-student event aggregates and badge counts, instead of 3 queries per student.
+    """
     start_dt = datetime.combine(day, time.min)
     end_dt = datetime.combine(day, time.max)
 
-    events = db.query(DBEvent).filter(
-        DBEvent.student_id == student.id,
+    event_stats = db.query(
+        DBEvent.student_id.label("student_id"),
+        func.count(DBEvent.id).label("events_total"),
+        func.sum(case((DBEvent.is_correct, 1), else_=0)).label("correct_answers"),
+        func.avg(DBEvent.time_spent).label("average_time_spent"),
+    ).filter(
         DBEvent.timestamp >= start_dt,
         DBEvent.timestamp <= end_dt,
-    ).all()
-
-    correct_count = sum(1 for event in events if event.is_correct)
-    total_count = len(events)
+    )
+    badge_counts = db.query(
+        DBAchievement.student_id.label("student_id"),
+        func.count(DBAchievement.id).label("badge_count"),
+    )
+    students = db.query(
+        DBStudent,
+        DBDailySession,
+    )
+    if student_id is not None:
+        event_stats = event_stats.filter(DBEvent.student_id == student_id)
+        badge_counts = badge_counts.filter(DBAchievement.student_id == student_id)
+        students = students.filter(DBStudent.id == student_id)
+
+    event_stats = event_stats.group_by(DBEvent.student_id).subquery()
+    badge_counts = badge_counts.group_by(DBAchievement.student_id).subquery()
+
+    return students.add_columns(
+        event_stats.c.events_total,
+        event_stats.c.correct_answers,
+        event_stats.c.average_time_spent,
+        badge_counts.c.badge_count,
+    ).outerjoin(
+        DBDailySession,
+        and_(DBDailySession.student_id == DBStudent.id, DBDailySession.session_date == day),
+    ).outerjoin(
+        event_stats, event_stats.c.student_id == DBStudent.id
+    ).outerjoin(
+        badge_counts, badge_counts.c.student_id == DBStudent.id
+    ).order_by(DBStudent.name.asc()).all()
+
+
+def _serialize_daily_summary(row, day: date) -> dict:
+    student = row.Student
+    session = row.DailySession
+
+    total_count = row.events_total or 0
+    correct_count = int(row.correct_answers or 0)
     accuracy = round((correct_count / total_count) * 100, 1) if total_count else 0.0
-    avg_time = round(sum(event.time_spent for event in events) / total_count, 2) if total_count else 0.0
-
-    session = db.query(DBDailySession).filter(
-        DBDailySession.student_id == student.id,
-        DBDailySession.session_date == day,
-    ).first()
+    avg_time = round(row.average_time_spent, 2) if total_count else 0.0
 
     completed_questions = session.completed_questions if session else 0
     target_questions = session.target_questions if session else student.target_daily_questions
     is_completed = session.is_completed if session else False
-    badge_count = db.query(DBAchievement).filter(DBAchievement.student_id == student.id).count()
 
     return {
         "student_id": student.id,
@@ -72,28 +157,65 @@ def _build_student_daily_summary(db: Session, student: DBStudent, day: date) ->
         "average_time_spent_seconds": avg_time,
         "current_streak": student.current_streak,
         "longest_streak": student.longest_streak,
-        "badge_count": badge_count,
+        "badge_count": row.badge_count or 0,
     }
 
 
 def _build_student_weekly_summary(db: Session, student: DBStudent, start_day: date, end_day: date) -> dict:
-    start_dt = datetime.combine(start_day, time.min)
-    end_dt = datetime.combine(end_day, time.max)
-
-    events = db.query(DBEvent).filter(
-        DBEvent.student_id == student.id,
-        DBEvent.timestamp >= start_dt,
-        DBEvent.timestamp <= end_dt,
-    ).all()
-    total_events = len(events)
-    correct_events = sum(1 for event in events if event.is_correct)
-    accuracy = round((correct_events / total_events) * 100, 1) if total_events else 0.0
-
-    sessions = db.query(DBDailySession).filter(
-        DBDailySession.student_id == student.id,
+    return _build_range_summaries(db, [student], start_day, end_day)[0]
+
+
+def _build_range_summaries(db: Session, students: List[DBStudent], start_day: date, end_day: date) -> List[dict]:
+    """
+    Summaries over [start_day, end_day] read from the student_daily_stats rollup
+    (one row per student per active day) and daily_sessions: two queries in total.
+    """
+    student_ids = [student.id for student in students]
+    if not student_ids:
+        return []
+
+    stats_by_student = defaultdict(list)
+    for row in db.query(DBStudentDailyStats).filter(
+        DBStudentDailyStats.student_id.in_(student_ids),
+        DBStudentDailyStats.stat_date >= start_day,
+        DBStudentDailyStats.stat_date <= end_day,
+    ).all():
+        stats_by_student[row.student_id].append(row)
+
+    sessions_by_student = defaultdict(list)
+    for session in db.query(DBDailySession).filter(
+        DBDailySession.student_id.in_(student_ids),
         DBDailySession.session_date >= start_day,
         DBDailySession.session_date <= end_day,
-    ).all()
+    ).all():
+        sessions_by_student[session.student_id].append(session)
+
+    return [
+        _serialize_range_summary(
+            student, start_day, end_day, stats_by_student[student.id], sessions_by_student[student.id]
+        )
+        for student in students
+    ]
+
+
+def _serialize_range_summary(
+    student: DBStudent,
+    start_day: date,
+    end_day: date,
+    daily_stats: List[DBStudentDailyStats],
+    sessions: List[DBDailySession],
+) -> dict:
+    total_events = sum(row.events_total for row in daily_stats)
+    correct_events = sum(row.correct_total for row in daily_stats)
+    accuracy = round((correct_events / total_events) * 100, 1) if total_events else 0.0
+    total_time = sum(row.time_spent_total for row in daily_stats)
+    avg_time = round(total_time / total_events, 2) if total_events else 0.0
+
+    skill_totals = defaultdict(lambda: [0, 0])
+    for row in daily_stats:
+        for skill_id, (attempts, correct) in (row.skill_counts or {}).items():
+            skill_totals[skill_id][0] += attempts
+            skill_totals[skill_id][1] += correct
 
     completed_days = sum(1 for session in sessions if session.is_completed)
     total_completed_questions = sum(session.completed_questions for session in sessions)
@@ -108,6 +230,17 @@ def _build_student_weekly_summary(db: Session, student: DBStudent, start_day: da
         "total_completed_questions": total_completed_questions,
         "total_events": total_events,
         "accuracy_percent": accuracy,
+        "active_days": sum(1 for row in daily_stats if row.events_total),
+        "average_time_spent_seconds": avg_time,
+        "hints_used": sum(row.hints_total for row in daily_stats),
+        "skills": {
+            skill_id: {
+                "attempts": attempts,
+                "correct": correct,
+                "accuracy_percent": round((correct / attempts) * 100, 1) if attempts else 0.0,
+            }
+            for skill_id, (attempts, correct) in sorted(skill_totals.items())
+        },
         "current_streak": student.current_streak,
         "longest_streak": student.longest_streak,
     }
@@ -1,18 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List
 import sys
 sys.path.append("../../packages/shared")
 
 from ..database import get_db
-from ..models import Item as DBItem
+from ..item_cache import encode_json, item_cache
+from ..item_index import item_index
 
 router = APIRouter()
 
 
 @router.post("/placement/start")
-async def start_placement_test(
+def start_placement_test(
     student_id: str,
     year_level: int,
     db: Session = Depends(get_db)
@@ -26,33 +26,21 @@ async def start_placement_test(
 
     # Fetch items across difficulty levels (1-5) with variety
     # For placement test: 2 items per difficulty level = 10 total items
-    items = []
-
+    item_index.ensure_fresh(db)
+    item_ids = []
     for difficulty in range(1, 6):
-        difficulty_items = db.query(DBItem).filter(
-            DBItem.difficulty == difficulty
-        ).order_by(func.random()).limit(2).all()
-
-        for item in difficulty_items:
-            items.append({
-                "item_id": item.id,
-                "skill_id": item.skill_id,
-                "question_text": item.question_text,
-                "question_type": item.question_type,
-                "difficulty": item.difficulty,
-                "parameters": item.parameters,
-                "correct_answer": item.correct_answer,
-                "hint": item.hint,
-                "explanation": item.explanation,
-                "validation_rule": item.validation_rule
-            })
+        item_ids.extend(item_index.sample(2, difficulty=difficulty))
+
+    items = item_cache.get_many(db, item_ids, item_index.version)
 
     if not items:
         raise HTTPException(status_code=404, detail="No placement test items available")
 
-    return {
+    # Splice the cached item bytes into the envelope instead of re-encoding them
+    envelope = encode_json({
         "student_id": student_id,
         "year_level": year_level,
-        "items": items,
         "total_items": len(items)
-    }
+    })
+    body = b'{"items":[' + b",".join(items) + b"]," + envelope[1:]
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ..database import get_db
+from ..item_index import item_index
+from ..models import Mastery as DBMastery, Student as DBStudent
+from ..skill_graph import skill_graph, student_frontier
+
+router = APIRouter()
+
+
+@router.get("/skills/frontier/{student_id}")
+def get_skill_frontier(
+    student_id: str,
+    db: Session = Depends(get_db)
+):
+    """
+    Skills the student is ready to work on: not yet mastered, with every
+    prerequisite mastered. Skills without items are treated as satisfied
+    prerequisites and are not offered themselves.
+    """
+    if db.get(DBStudent, student_id) is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+
+    item_index.ensure_fresh(db)
+    mastery_rows = db.query(DBMastery).filter(DBMastery.student_id == student_id).all()
+    scores, frontier = student_frontier(mastery_rows)
+
+    return {
+        "student_id": student_id,
+        "frontier": [
+            {
+                "skill_id": skill_id,
+                "description": skill_graph.skills[skill_id].get("description"),
+                "year_level": skill_graph.skills[skill_id].get("year_level"),
+                "domain": skill_graph.skills[skill_id].get("domain"),
+                "mastery_score": scores.get(skill_id),
+            }
+            for skill_id in frontier
+        ],
+    }
@@ -22,13 +22,13 @@ def _serialize_student(student: DBStudent) -> dict:
 
 
 @router.get("/students")
-async def list_students(db: Session = Depends(get_db)):
+def list_students(db: Session = Depends(get_db)):
     students = db.query(DBStudent).order_by(DBStudent.name.asc()).all()
     return [_serialize_student(student) for student in students]
 
 
 @router.get("/students/{student_id}")
-async def get_student(student_id: str, db: Session = Depends(get_db)):
+def get_student(student_id: str, db: Session = Depends(get_db)):
     student = db.query(DBStudent).filter(DBStudent.id == student_id).first()
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
@@ -0,0 +1,139 @@
+"""
+Daily practice set planner.
+
+Builds a student's whole daily set in one pass instead of N `/next-item`
+calls. Skills are sorted into three buckets from the student's (decayed)
+mastery rows and the skill graph:
+
+- "weak":   started but not yet mastered, weakest first
+- "review": mastered and due for review (see review_scheduler.py), most
+            overdue first
+- "new":    frontier skills the student hasn't started
+
+Slots are split across the non-empty buckets by `PLAN_MIX` and handed to each
+bucket's skills round-robin in priority order. Items come from the in-memory
+item index (at the difficulty matching the skill's score, skipping items seen
+in the last `RECENT_ITEM_DAYS`) and the payload cache, so a plan costs a
+fixed handful of queries however many items it holds.
+"""
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .item_cache import item_cache
+from .item_index import item_index
+from .mastery_engine import mastery_engine, target_difficulty
+from .models import Event, Mastery, Student
+from .review_scheduler import due_skill_ids
+from .skill_graph import student_frontier
+
+# Share of the daily set per bucket; empty buckets' shares go to the others
+PLAN_MIX = {"weak": 0.5, "new": 0.3, "review": 0.2}
+RECENT_ITEM_DAYS = 7
+
+
+def _split_slots(count: int, buckets: Dict[str, List[str]]) -> Dict[str, int]:
+    """Largest-remainder split of `count` over the non-empty buckets by PLAN_MIX weight."""
+    weights = {name: PLAN_MIX[name] for name, skills in buckets.items() if skills}
+    if not weights:
+        return {}
+    total = sum(weights.values())
+    exact = {name: count * weight / total for name, weight in weights.items()}
+    quotas = {name: int(share) for name, share in exact.items()}
+    leftover = count - sum(quotas.values())
+    for name in sorted(exact, key=lambda name: exact[name] - quotas[name], reverse=True)[:leftover]:
+        quotas[name] += 1
+    return quotas
+
+
+def _slot_order(quotas: Dict[str, int], buckets: Dict[str, List[str]]) -> List[Tuple[str, str]]:
+    """(skill_id, reason) per slot, interleaving buckets so the set alternates topics."""
+    per_bucket = {
+        name: [buckets[name][slot % len(buckets[name])] for slot in range(quota)]
+        for name, quota in quotas.items()
+    }
+    slots = []
+    while any(per_bucket.values()):
+        for name in PLAN_MIX:
+            if per_bucket.get(name):
+                slots.append((per_bucket[name].pop(0), name))
+    return slots
+
+
+def _pick_items(slots, scores: Dict[str, float], recent: set) -> List[Tuple[str, str]]:
+    """(item_id, reason) per slot; relaxes difficulty, then recency, before giving up on a slot."""
+    chosen = set()
+    picks = []
+    for skill_id, reason in slots:
+        difficulty = target_difficulty(scores.get(skill_id))
+        item_id = None
+        for candidate_difficulty, excluded in (
+            (difficulty, recent | chosen),
+            (None, recent | chosen),
+            (None, chosen),
+        ):
+            found = item_index.sample(1, skill_id=skill_id, difficulty=candidate_difficulty, exclude=excluded)
+            if found:
+                item_id = found[0]
+                break
+        if item_id:
+            chosen.add(item_id)
+            picks.append((item_id, reason))
+    return picks
+
+
+def plan_daily_set(db: Session, student: Student, count: Optional[int] = None, now: Optional[datetime] = None) -> dict:
+    now = now or datetime.now()
+    count = count or student.target_daily_questions or 10
+    item_index.ensure_fresh(db)
+
+    mastery_rows = db.query(Mastery).filter(Mastery.student_id == student.id).all()
+    scores, frontier = student_frontier(mastery_rows, now)
+    mastered = {row.skill_id for row in mastery_rows if mastery_engine.is_mastered(row, now)}
+    playable = {row.skill_id: row for row in mastery_rows if item_index.item_ids(skill_id=row.skill_id)}
+
+    buckets = {
+        "weak": sorted((skill for skill in playable if skill not in mastered), key=scores.get),
+        "new": [skill for skill in frontier if skill not in scores],
+        # Due-date index range scan; weak skills are already in their own bucket
+        "review": [
+            skill for skill in due_skill_ids(db, student.id, now) if skill in playable and skill in mastered
+        ],
+    }
+
+    recent = {
+        item_id
+        for (item_id,) in db.query(Event.item_id)
+        .filter(Event.student_id == student.id, Event.timestamp >= now - timedelta(days=RECENT_ITEM_DAYS))
+        .distinct()
+    }
+
+    quotas = _split_slots(count, buckets)
+    picks = _pick_items(_slot_order(quotas, buckets), scores, recent)
+    if len(picks) < count:
+        # Nothing (more) to plan from: top up with easy items, as /next-item does
+        chosen = {item_id for item_id, _ in picks}
+        picks += [(item_id, "new") for item_id in item_index.sample(count - len(picks), difficulty=1, exclude=chosen)]
+
+    items = []
+    payloads = item_cache.get_many(db, [item_id for item_id, _ in picks], item_index.version)
+    reasons = dict(picks)
+    for payload in payloads:
+        item = json.loads(payload)
+        # `skill` / `answer` are the field names services/notes expects
+        item.update(reason=reasons[item["item_id"]], skill=item["skill_id"], answer=item["correct_answer"])
+        items.append(item)
+
+    mix = {name: 0 for name in PLAN_MIX}
+    for item in items:
+        mix[item["reason"]] += 1
+
+    return {
+        "student_id": student.id,
+        "session_date": now.date().isoformat(),
+        "target_questions": count,
+        "mix": mix,
+        "items": items,
+    }
@@ -0,0 +1,119 @@
+"""
+Compiled prerequisite graph of the curriculum skill tree.
+
+The skill tree JSON written by `services/content/generate_items.py`
+(`skill_tree_v0.json`) is compiled once at startup into a DAG in topological
+order, with each skill's ancestors (transitive prerequisites) stored as an int
+bitset. A student's mastered skills become one bitset too, so finding the
+"frontier" — unmastered skills whose prerequisites are all mastered — is a
+single pass of integer ANDs over the skills, with no per-request traversal.
+"""
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import settings
+from .item_index import item_index
+from .mastery_engine import mastery_engine
+
+log = logging.getLogger("uvicorn.error")
+
+
+class SkillGraph:
+    def __init__(self, skills: List[dict]):
+        by_id = {skill["skill_id"]: skill for skill in skills}
+        for skill in skills:
+            for prerequisite in skill.get("prerequisites", []):
+                if prerequisite not in by_id:
+                    raise ValueError(f"Skill {skill['skill_id']} has unknown prerequisite {prerequisite}")
+
+        order = self._topological_order(skills)
+        self.skill_ids: Tuple[str, ...] = tuple(order)
+        self.bit: Dict[str, int] = {skill_id: 1 << position for position, skill_id in enumerate(order)}
+        self.skills: Dict[str, dict] = {skill_id: by_id[skill_id] for skill_id in order}
+
+        # Parents come first in topological order, so one forward pass suffices
+        ancestors = {}
+        for skill_id in order:
+            mask = 0
+            for prerequisite in by_id[skill_id].get("prerequisites", []):
+                mask |= self.bit[prerequisite] | ancestors[prerequisite]
+            ancestors[skill_id] = mask
+        self.ancestor_mask: Tuple[int, ...] = tuple(ancestors[skill_id] for skill_id in order)
+
+    @staticmethod
+    def _topological_order(skills: List[dict]) -> List[str]:
+        # Kahn's algorithm; ties keep the authored (year level) order
+        remaining = {skill["skill_id"]: set(skill.get("prerequisites", [])) for skill in skills}
+        order = []
+        while remaining:
+            ready = [skill_id for skill_id, prerequisites in remaining.items() if not prerequisites]
+            if not ready:
+                raise ValueError(f"Skill prerequisites contain a cycle among: {', '.join(sorted(remaining))}")
+            for skill_id in ready:
+                del remaining[skill_id]
+                order.append(skill_id)
+            for prerequisites in remaining.values():
+                prerequisites.difference_update(ready)
+        return order
+
+    def __len__(self) -> int:
+        return len(self.skill_ids)
+
+    def __contains__(self, skill_id: str) -> bool:
+        return skill_id in self.bit
+
+    def mask(self, skill_ids: Iterable[str]) -> int:
+        """Bitset of the given skills; ids not in the graph are ignored."""
+        mask = 0
+        for skill_id in skill_ids:
+            mask |= self.bit.get(skill_id, 0)
+        return mask
+
+    def ancestors(self, skill_id: str) -> List[str]:
+        """Transitive prerequisites of `skill_id`, in topological order."""
+        mask = self.ancestor_mask[self.bit[skill_id].bit_length() - 1]
+        return [other for other in self.skill_ids if mask & self.bit[other]]
+
+    def frontier(self, mastered: int, satisfied: int = 0) -> List[str]:
+        """Unmastered skills whose ancestors are all mastered, in topological order.
+
+        `satisfied` marks skills that count as mastered for unlocking others
+        without being offered themselves (e.g. skills with no items yet).
+        """
+        done = mastered | satisfied
+        return [
+            skill_id
+            for skill_id, ancestor_mask in zip(self.skill_ids, self.ancestor_mask)
+            if not done & self.bit[skill_id] and not ancestor_mask & ~done
+        ]
+
+
+def load_skill_graph(path: Optional[str] = None) -> SkillGraph:
+    """Compile the skill tree at `path`; an empty graph if the file is missing."""
+    path = Path(path or settings.skill_tree_path)
+    if not path.exists():
+        log.warning("Skill tree not found at %s; prerequisite-aware selection is disabled", path)
+        return SkillGraph([])
+    return SkillGraph(json.loads(path.read_text()))
+
+
+skill_graph = load_skill_graph()
+
+
+def student_frontier(mastery_rows, now: Optional[datetime] = None) -> Tuple[Dict[str, float], List[str]]:
+    """(decayed score per skill, frontier skills that have items) for one student's mastery rows.
+
+    Skills without any items in the index count as satisfied prerequisites, so
+    content gaps never block the skills that depend on them. Call
+    `item_index.ensure_fresh` first.
+    """
+    now = now or datetime.now()
+    scores = {row.skill_id: mastery_engine.current_score(row, now) for row in mastery_rows}
+    mastered = skill_graph.mask(row.skill_id for row in mastery_rows if mastery_engine.is_mastered(row, now))
+    without_items = skill_graph.mask(
+        skill_id for skill_id in skill_graph.skill_ids if not item_index.item_ids(skill_id=skill_id)
+    )
+    return scores, skill_graph.frontier(mastered, satisfied=without_items)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Keep the events table small: maintain monthly partitions and archive old months.
+
+Each run:
+1. creates Postgres partitions for the coming months, or on SQLite moves
+   months older than EVENT_HOT_MONTHS from `events` into shard tables
+2. exports every month older than --older-than-months to a compressed
+   columnar file (Parquet with pyarrow installed, else NumPy .npz) under
+   --dir, then drops it from the database
+
+Rollups, mastery and review schedules are kept, so parent reports over
+archived months are unchanged. Run it monthly, e.g. from cron.
+
+Usage:
+  cd services/api/scripts
+  python archive_events.py [--older-than-months 12] [--dir ../archive/events] [--dry-run]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app import columnar
+from app.config import settings
+from app.database import init_db, maintenance_engine
+from app.event_store import archivable_months, archive_month, ensure_partitions, seal_cold_months
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--older-than-months", type=int, default=settings.event_archive_after_months)
+    parser.add_argument("--dir", type=Path, default=Path(settings.event_archive_dir))
+    parser.add_argument("--dry-run", action="store_true", help="list the months that would be archived")
+    args = parser.parse_args()
+
+    if args.older_than_months < settings.event_hot_months:
+        print(f"❌ --older-than-months must be at least EVENT_HOT_MONTHS ({settings.event_hot_months})")
+        return False
+
+    init_db()
+    started = time.perf_counter()
+    try:
+        months = archivable_months(maintenance_engine, args.older_than_months)
+        if args.dry_run:
+            print(f"📦 Would archive {len(months)} months to {args.dir}")
+            for month in months:
+                print(f"   {month:%Y-%m}")
+            return True
+        if months and not columnar.available():
+            print("❌ Archiving needs pyarrow (Parquet) or numpy (.npz): pip install pyarrow")
+            return False
+
+        for month in ensure_partitions(maintenance_engine):
+            print(f"   + partition {month:%Y-%m}")
+        for month, rows in seal_cold_months(maintenance_engine):
+            print(f"   ~ sealed {month:%Y-%m} ({rows} events)")
+
+        archived = 0
+        for month in months:
+            result = archive_month(maintenance_engine, month, args.dir)
+            if result["skipped"]:
+                print(f"   ⚠️  {month:%Y-%m} skipped: {result['skipped']}")
+                continue
+            archived += result["rows"]
+            print(f"   - {month:%Y-%m}: {result['rows']} events -> {result['path']}")
+    except Exception as exc:
+        print(f"❌ Failed to archive events: {exc}")
+        return False
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Archived {archived} events from {len(months)} months in {elapsed:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    ok = main()
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Rebuild the student_daily_stats rollup from historical events.
+
+Events are streamed once, ordered by student and time, and only the current
+student's daily rows are held in memory. The old rollup is replaced inside a
+single transaction, so parent reports keep working while it runs. Rollup rows
+of archived months are kept, since their events are no longer in the database.
+
+Usage:
+  cd services/api/scripts
+  python backfill_daily_stats.py
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.daily_stats import new_daily_stats, record_event
+from app.database import MaintenanceSessionLocal, init_db
+from app.event_store import archived_months, event_source, flush_replayed, month_bounds
+from app.models import Item, StudentDailyStats
+
+STREAM_CHUNK_SIZE = 5000
+
+
+def rebuild_daily_stats(db) -> dict:
+    """Replace all rollup rows by replaying events. Caller commits."""
+    stats = {"events": 0, "rows": 0}
+
+    archived = archived_months(db)
+    since = month_bounds(archived[-1])[1] if archived else None
+    rollups = db.query(StudentDailyStats)
+    if since:
+        rollups = rollups.filter(StudentDailyStats.stat_date >= since.date())
+    rollups.delete(synchronize_session=False)
+
+    source = event_source(db, since)
+    events = (
+        db.query(
+            source.c.student_id,
+            source.c.timestamp,
+            source.c.is_correct,
+            source.c.time_spent,
+            source.c.hint_requested,
+            Item.skill_id,
+        )
+        .outerjoin(Item, Item.id == source.c.item_id)
+        .order_by(source.c.student_id, source.c.timestamp)
+        .execution_options(yield_per=STREAM_CHUNK_SIZE)
+    )
+    if since:
+        events = events.filter(source.c.timestamp >= since)
+
+    current_student = None
+    rows = {}
+    for student_id, timestamp, is_correct, time_spent, hint_requested, skill_id in events:
+        if student_id != current_student:
+            stats["rows"] += flush_replayed(db, rows)
+            current_student = student_id
+            rows = {}
+
+        stat_date = timestamp.date()
+        daily = rows.get(stat_date)
+        if daily is None:
+            daily = rows[stat_date] = new_daily_stats(student_id, stat_date)
+        record_event(daily, is_correct, time_spent, hint_requested, skill_id)
+        stats["events"] += 1
+
+    stats["rows"] += flush_replayed(db, rows)
+    return stats
+
+
+def main() -> bool:
+    init_db()
+    db = MaintenanceSessionLocal()
+    started = time.perf_counter()
+    try:
+        stats = rebuild_daily_stats(db)
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        print(f"❌ Failed to backfill daily stats: {exc}")
+        return False
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Built {stats['rows']} daily rollup rows from {stats['events']} events in {elapsed:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    ok = main()
+    raise SystemExit(0 if ok else 1)
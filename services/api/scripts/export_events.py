@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Export events for offline analytics as columnar files, one per day.
+
+Events are joined with their item's skill_id and difficulty and written as
+Parquet (pyarrow installed) or NumPy .npz under `--dir`, one file per day of
+the event `timestamp`:
+
+  <dir>/date=2026-02-19/events.parquet
+  <dir>/_state.json          watermark of the last export
+
+Exports are incremental in the order events reached the server, not in event
+time: `timestamp` is set by the device, and answers synced from offline can
+be weeks old when they arrive. A run finds the days of every event received
+(`received_at`) since the watermark, less `--overlap-minutes` for writes that
+were still committing during the last run. It then rewrites those days' files
+whole through a server-side cursor, `EXPORT_CHUNK_SIZE` rows at a time. Days
+with nothing new are left alone and no row is exported twice. The first run,
+and `--full`, export everything; that also covers events recorded before
+`received_at` existed.
+
+Set ANALYTICS_DATABASE_URL to read from a replica instead of the primary.
+Months already archived by archive_events.py are not in the database; their
+archive files cover them.
+
+Usage:
+  cd services/api/scripts
+  python export_events.py [--dir ../export/events] [--overlap-minutes 5] [--full]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from app import columnar
+from app.config import settings
+from app.event_store import event_source
+from app.models import Item
+
+EXPORT_CHUNK_SIZE = 10_000
+OVERLAP = timedelta(minutes=5)
+STATE_FILE = "_state.json"
+
+EXPORT_COLUMNS = [
+    "id", "student_id", "item_id", "skill_id", "difficulty",
+    "answer_given", "is_correct", "time_spent", "hint_requested", "timestamp", "received_at",
+]
+
+
+def read_watermark(directory: Path) -> Optional[datetime]:
+    path = directory / STATE_FILE
+    if not path.exists():
+        return None
+    # State written before received_at was tracked holds none, so the next run is a full one
+    watermark = json.loads(path.read_text()).get("received_watermark")
+    return datetime.fromisoformat(watermark) if watermark else None
+
+
+def _write_watermark(directory: Path, watermark: datetime) -> None:
+    path = directory / STATE_FILE
+    staged = path.with_suffix(".tmp")
+    staged.write_text(json.dumps(
+        {"received_watermark": watermark.isoformat(), "exported_at": datetime.now().isoformat()}, indent=2
+    ))
+    os.replace(staged, path)
+
+
+class _DayFile:
+    """One day's export, written next to the live file and swapped in on close."""
+
+    def __init__(self, directory: Path, day: date):
+        self.directory = directory / f"date={day.isoformat()}"
+        self.writer = columnar.ColumnarWriter(self.directory / ".events.partial", EXPORT_COLUMNS)
+
+    def close(self) -> Path:
+        staged = self.writer.close()
+        path = self.directory / f"events{staged.suffix}"
+        os.replace(staged, path)
+        for stale in self.directory.glob("events.*"):
+            # Left behind by the other format, e.g. after pyarrow was installed
+            if stale != path:
+                stale.unlink()
+        return path
+
+
+def _days_received_since(db: Session, since: datetime) -> List[date]:
+    """Event days of everything received at or after `since`, read through the received_at index."""
+    source = event_source(db)
+    days = set()
+    rows = db.execute(
+        select(source.c.timestamp).where(source.c.received_at >= since),
+        execution_options={"yield_per": EXPORT_CHUNK_SIZE},
+    )
+    for chunk in rows.partitions():
+        days.update(timestamp.date() for (timestamp,) in chunk)
+    return sorted(days)
+
+
+def _day_ranges(days: List[date]) -> List[Tuple[datetime, datetime]]:
+    """[start, end) ranges covering `days`, consecutive days merged into one range read."""
+    ranges = []
+    for day in days:
+        start = datetime.combine(day, datetime.min.time())
+        if ranges and ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], start + timedelta(days=1))
+        else:
+            ranges.append((start, start + timedelta(days=1)))
+    return ranges
+
+
+def _export_range(db: Session, directory: Path, start: Optional[datetime], end: Optional[datetime], stats: dict) -> None:
+    """Replace the day files of every event with `start <= timestamp < end` (either bound optional)."""
+    items = Item.__table__
+    source = event_source(db, start, end)
+    query = (
+        select(
+            source.c.id,
+            source.c.student_id,
+            source.c.item_id,
+            items.c.skill_id,
+            items.c.difficulty,
+            source.c.answer_given,
+            source.c.is_correct,
+            source.c.time_spent,
+            source.c.hint_requested,
+            source.c.timestamp,
+            source.c.received_at,
+        )
+        .outerjoin(items, items.c.id == source.c.item_id)
+        .order_by(source.c.timestamp, source.c.id)
+    )
+    if start is not None:
+        query = query.where(source.c.timestamp >= start)
+    if end is not None:
+        query = query.where(source.c.timestamp < end)
+
+    # yield_per streams through a server-side cursor instead of fetching every row
+    result = db.execute(query, execution_options={"yield_per": EXPORT_CHUNK_SIZE})
+    day_file = None
+    day = None
+    for chunk in result.partitions():
+        pending = []
+        for row in chunk:
+            if row.timestamp.date() != day:
+                if day_file is not None:
+                    day_file.writer.write(pending)
+                    day_file.close()
+                    stats["days"] += 1
+                pending = []
+                day = row.timestamp.date()
+                day_file = _DayFile(directory, day)
+            pending.append(tuple(row))
+        day_file.writer.write(pending)
+        stats["rows"] += len(chunk)
+    if day_file is not None:
+        day_file.close()
+        stats["days"] += 1
+
+
+def export_events(bind, directory: Path, watermark: Optional[datetime] = None, overlap: timedelta = OVERLAP) -> dict:
+    """
+    Export every event (`watermark` None), or rewrite the days of the events
+    received since `overlap` before `watermark`. Then record the new watermark
+    and return it with the rows and days written.
+    """
+    stats = {"rows": 0, "days": 0, "since": None, "watermark": watermark}
+    with Session(bind=bind) as db:
+        # Read first: whatever arrives while exporting is picked up by the next run
+        latest = db.execute(select(func.max(event_source(db).c.received_at))).scalar()
+        if watermark is None:
+            _export_range(db, directory, None, None, stats)
+        else:
+            stats["since"] = watermark - overlap
+            for start, end in _day_ranges(_days_received_since(db, stats["since"])):
+                _export_range(db, directory, start, end, stats)
+
+    if latest is not None and (watermark is None or latest > watermark):
+        # Only once every file is in place, so a failed run is simply repeated
+        stats["watermark"] = latest
+        _write_watermark(directory, latest)
+    return stats
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, default=Path(settings.analytics_export_dir))
+    parser.add_argument(
+        "--overlap-minutes", type=float, default=OVERLAP.total_seconds() / 60,
+        help="also re-check events received this long before the watermark",
+    )
+    parser.add_argument("--full", action="store_true", help="ignore the watermark and export everything")
+    args = parser.parse_args()
+
+    if not columnar.available():
+        print("❌ Exporting needs pyarrow (Parquet) or numpy (.npz): pip install pyarrow")
+        return False
+
+    # Read-only: no init_db(), so a replica is never migrated from here
+    bind = create_engine(settings.analytics_database_url or settings.db_url)
+    watermark = None if args.full else read_watermark(args.dir)
+    started = time.perf_counter()
+    try:
+        stats = export_events(bind, args.dir, watermark, timedelta(minutes=args.overlap_minutes))
+    except Exception as exc:
+        print(f"❌ Failed to export events: {exc}")
+        return False
+    finally:
+        bind.dispose()
+
+    elapsed = time.perf_counter() - started
+    scope = f"received since {stats['since'].isoformat(' ', 'seconds')}" if stats["since"] else "in full"
+    print(
+        f"✅ Exported {stats['rows']} events ({scope}) into {stats['days']} daily "
+        f"{columnar.file_suffix()} files under {args.dir} in {elapsed:.1f}s"
+    )
+    if stats["watermark"] is not None:
+        print(f"   Watermark: received_at {stats['watermark'].isoformat()}")
+    return True
+
+
+if __name__ == "__main__":
+    ok = main()
+    raise SystemExit(0 if ok else 1)
@@ -2,25 +2,149 @@
 """
 Load generated content into the database
 Run this after generating content with generate_items.py
+
+Packs are streamed (JSON array, JSON Lines or a columnar pack directory), so
+memory stays flat no matter how many items they hold. With --skills only those
+skills are loaded; for a columnar pack the other skills' files are not read.
+Items are written in batches: existing ids are prefetched per batch with one
+IN query and the rest go in with a single bulk INSERT ... ON CONFLICT,
+committed once per batch.
+
+Usage:
+  cd services/api
+  python scripts/load_content.py [path/to/pack.json|pack.jsonl|pack_dir] [--batch-size 1000] [--update]
+                                 [--skills yr4_mult_div_001 ...]
 """
-import json
+import argparse
 import sys
+import time
+from datetime import datetime
 from pathlib import Path
 
+CONTENT_ROOT = Path(__file__).parent.parent.parent / "content"
+
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent))
-
-from app.database import SessionLocal, init_db
-from app.models import Item
-
-def load_content():
+# Pack readers are shared with the content service
+sys.path.append(str(CONTENT_ROOT))
+
+from sqlalchemy import func, insert, update
+
+from app.database import MaintenanceSessionLocal, init_db
+from app.item_index import item_index
+from app.models import ContentPack, Item
+from pack_io import PackReader
+
+DEFAULT_CONTENT_PATH = CONTENT_ROOT / "output" / "content_pack_v0.json"
+DEFAULT_BATCH_SIZE = 1000
+
+ITEM_COLUMNS = (
+    "skill_id",
+    "question_text",
+    "question_type",
+    "difficulty",
+    "parameters",
+    "correct_answer",
+    "hint",
+    "explanation",
+    "validation_rule",
+)
+
+
+def _item_row(item_data: dict) -> dict:
+    row = {"id": item_data["item_id"]}
+    for column in ITEM_COLUMNS:
+        row[column] = item_data.get(column)
+    row["validation_rule"] = row["validation_rule"] or "exact_match"
+    return row
+
+
+def _insert_statement(db, update_existing: bool):
+    """Bulk INSERT that tolerates existing ids; None if the dialect has no ON CONFLICT."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        return None
+
+    statement = dialect_insert(Item.__table__)
+    if update_existing:
+        return statement.on_conflict_do_update(
+            index_elements=["id"],
+            set_={column: statement.excluded[column] for column in ITEM_COLUMNS},
+        )
+    return statement.on_conflict_do_nothing(index_elements=["id"])
+
+
+def load_items(db, items, batch_size: int = DEFAULT_BATCH_SIZE, update_existing: bool = False, progress=None) -> dict:
+    """Bulk-write `items` in batches, committing after each one. Returns counts.
+
+    Each distinct id counts once as added, updated or skipped; further copies of
+    an id within the pack count as repeated.
+    """
+    stats = {"seen": 0, "added": 0, "updated": 0, "skipped": 0, "repeated": 0}
+    upsert = _insert_statement(db, update_existing)
+    batch = {}
+    # Ids written by earlier batches of this load, so a copy further on in the
+    # pack isn't mistaken for an item that was already in the database
+    loaded = set()
+
+    def flush():
+        if not batch:
+            return
+        existing = {row[0] for row in db.query(Item.id).filter(Item.id.in_(list(batch)))}
+        new_rows = [row for item_id, row in batch.items() if item_id not in existing]
+        repeated = existing & loaded
+
+        if upsert is not None:
+            rows = list(batch.values()) if update_existing else new_rows
+            if rows:
+                db.execute(upsert, rows)
+        else:
+            # Plain INSERT is safe: rows are filtered against the prefetched ids
+            if new_rows:
+                db.execute(insert(Item.__table__), new_rows)
+            if update_existing and existing:
+                db.execute(update(Item), [batch[item_id] for item_id in existing])
+
+        stats["added"] += len(new_rows)
+        stats["repeated"] += len(repeated)
+        stats["updated" if update_existing else "skipped"] += len(existing - repeated)
+        loaded.update(batch)
+        db.commit()
+        batch.clear()
+        if progress:
+            progress(stats)
+
+    for item_data in items:
+        stats["seen"] += 1
+        row = _item_row(item_data)
+        if row["id"] in batch:
+            # Repeated id within the pack: the first copy wins, unless updating,
+            # where the later copy overwrites it like any existing item
+            stats["repeated"] += 1
+            if not update_existing:
+                continue
+        batch[row["id"]] = row
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return stats
+
+
+def load_content(
+    content_path: Path = DEFAULT_CONTENT_PATH,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    update_existing: bool = False,
+    skills=None,
+):
     """Load content pack into database"""
     # Initialize database
     init_db()
 
-    # Path to content pack
-    content_path = Path(__file__).parent.parent.parent / "content" / "output" / "content_pack_v0.json"
-
+    content_path = Path(content_path)
     if not content_path.exists():
         print(f"❌ Content pack not found at: {content_path}")
         print("\n💡 Please run generate_items.py first:")
@@ -28,57 +152,49 @@ def load_content():
         print("   python generate_items.py")
         return False
 
-    # Load content
-    with open(content_path) as f:
-        items_data = json.load(f)
-
-    print(f"📦 Loading {len(items_data)} items into database...")
+    print(f"📦 Loading items from {content_path.name} (batch size {batch_size})...")
 
     # Create session
-    db = SessionLocal()
+    db = MaintenanceSessionLocal()
+    started = time.perf_counter()
 
-    try:
-        # Clear existing items (optional - comment out to preserve data)
-        # db.query(Item).delete()
-        # print("🗑️  Cleared existing items")
-
-        # Add items
-        items_added = 0
-        items_skipped = 0
-
-        for item_data in items_data:
-            # Check if item already exists
-            existing = db.query(Item).filter(Item.id == item_data['item_id']).first()
-
-            if existing:
-                items_skipped += 1
-                continue
+    def report(stats):
+        rate = stats["seen"] / max(time.perf_counter() - started, 1e-9)
+        print(f"   {stats['seen']:,} items read ({rate:,.0f} items/sec)", end="\r", flush=True)
 
-            item = Item(
-                id=item_data['item_id'],
-                skill_id=item_data['skill_id'],
-                question_text=item_data['question_text'],
-                question_type=item_data['question_type'],
-                difficulty=item_data['difficulty'],
-                parameters=item_data['parameters'],
-                correct_answer=item_data['correct_answer'],
-                hint=item_data['hint'],
-                explanation=item_data['explanation'],
-                validation_rule=item_data.get('validation_rule', 'exact_match')
-            )
-            db.add(item)
-            items_added += 1
+    try:
+        reader = PackReader(content_path, skills=skills)
+        stats = load_items(db, reader, batch_size=batch_size, update_existing=update_existing, progress=report)
+        elapsed = time.perf_counter() - started
+
+        # Record the pack version; the API keys its item index and payload
+        # cache on the latest one, so a new pack invalidates both.
+        pack_version = reader.version
+        pack = db.get(ContentPack, pack_version)
+        if pack is None:
+            pack = ContentPack(version=pack_version, source=content_path.name)
+            db.add(pack)
+        pack.item_count = stats["seen"]
+        pack.loaded_at = datetime.now()
 
         db.commit()
+        # A running API notices the new pack on its next index signature check;
+        # in-process callers (tests, benchmarks) get an immediate rebuild.
+        item_index.invalidate()
 
         print(f"\n✅ Successfully loaded content:")
-        print(f"   Added: {items_added} items")
-        if items_skipped > 0:
-            print(f"   Skipped: {items_skipped} items (already exist)")
+        print(f"   Version: {pack_version}")
+        print(f"   Added: {stats['added']} items")
+        if stats["updated"] > 0:
+            print(f"   Updated: {stats['updated']} items")
+        if stats["skipped"] > 0:
+            print(f"   Skipped: {stats['skipped']} items (already exist)")
+        if stats["repeated"] > 0:
+            print(f"   Repeated: {stats['repeated']} copies of ids already in the pack")
+        print(f"   Rate: {stats['seen'] / max(elapsed, 1e-9):,.0f} items/sec ({elapsed:.1f}s)")
 
         # Print summary by skill
         print("\n📊 Items by skill:")
-        from sqlalchemy import func
         results = db.query(
             Item.skill_id,
             func.count(Item.id).label('count')
@@ -98,6 +214,16 @@ def load_content():
         db.close()
 
 
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("content_path", nargs="?", type=Path, default=DEFAULT_CONTENT_PATH)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="items per INSERT and commit")
+    parser.add_argument("--update", action="store_true", help="overwrite items that already exist")
+    parser.add_argument("--skills", nargs="+", help="only load these skill ids")
+    args = parser.parse_args()
+    return load_content(args.content_path, batch_size=args.batch_size, update_existing=args.update, skills=args.skills)
+
+
 if __name__ == "__main__":
-    success = load_content()
+    success = main()
     sys.exit(0 if success else 1)
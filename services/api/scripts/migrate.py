@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Apply pending schema migrations (see app/migrations.py).
+
+An empty database is created straight at the latest version. Databases made
+before migrations were versioned are upgraded from version 1. Online
+migrations (index builds, batched backfills) commit as they go, so this can
+run while the API is serving.
+
+Usage:
+  cd services/api/scripts
+  python migrate.py [--dry-run]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.database import maintenance_engine
+from app.migrations import HEAD_VERSION, current_version, migrate
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="list pending migrations without applying them")
+    args = parser.parse_args()
+
+    version = current_version(maintenance_engine)
+    print(f"📦 Schema version: {'unversioned' if version is None else version}, latest: {HEAD_VERSION}")
+    started = time.perf_counter()
+    try:
+        migrations = migrate(maintenance_engine, dry_run=args.dry_run)
+    except Exception as exc:
+        print(f"❌ Migration failed: {exc}")
+        return False
+
+    if not migrations:
+        print("✅ Schema already up to date")
+        return True
+    for migration in migrations:
+        print(f"   {migration.version:>3} {migration.name}{' (online)' if migration.online else ''}")
+    elapsed = time.perf_counter() - started
+    verb = "Would apply" if args.dry_run else "Applied"
+    print(f"✅ {verb} {len(migrations)} migrations in {elapsed:.1f}s")
+    return True
+
+
+if __name__ == "__main__":
+    ok = main()
+    raise SystemExit(0 if ok else 1)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Rebuild every mastery row and review schedule from the events table with a
+chosen mastery engine.
+
+Events are streamed once, ordered by student and time, and folded into the
+engine's O(1) update and the SM-2 review schedule; only the current student's
+skill states are held in memory. Old rows are replaced inside a single
+transaction, so the API keeps serving the previous scores until the rebuild
+commits. Archived months (scripts/archive_events.py) can't be replayed, so
+the script refuses to run unless --skip-archived is given.
+
+Usage:
+  cd services/api/scripts
+  python rebuild_mastery.py --engine elo
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.database import MaintenanceSessionLocal, init_db
+from app.mastery_engine import MASTERY_ENGINES, get_mastery_engine
+from app.event_store import archived_months, event_source, flush_replayed
+from app.models import Item, Mastery, ReviewSchedule
+from app.review_scheduler import answer_quality, new_schedule, schedule_review
+
+STREAM_CHUNK_SIZE = 5000
+
+
+def rebuild_mastery(db, engine_name: str = None) -> dict:
+    """Replace all mastery rows and review schedules by replaying events. Caller commits."""
+    model = get_mastery_engine(engine_name)
+    stats = {"events": 0, "rows": 0}
+
+    db.query(Mastery).delete(synchronize_session=False)
+    db.query(ReviewSchedule).delete(synchronize_session=False)
+
+    source = event_source(db)
+    events = (
+        db.query(
+            source.c.student_id,
+            source.c.is_correct,
+            source.c.hint_requested,
+            source.c.timestamp,
+            Item.skill_id,
+            Item.difficulty,
+        )
+        .join(Item, Item.id == source.c.item_id)
+        .order_by(source.c.student_id, source.c.timestamp, source.c.id)
+        .execution_options(yield_per=STREAM_CHUNK_SIZE)
+    )
+
+    current_student = None
+    rows = {}
+    schedules = {}
+    for student_id, is_correct, hint_requested, timestamp, skill_id, difficulty in events:
+        if student_id != current_student:
+            stats["rows"] += flush_replayed(db, rows)
+            flush_replayed(db, schedules)
+            current_student = student_id
+            rows = {}
+            schedules = {}
+
+        mastery = rows.get(skill_id)
+        if mastery is None:
+            mastery = Mastery(
+                student_id=student_id,
+                skill_id=skill_id,
+                total_attempts=0,
+                correct_attempts=0,
+                mastery_score=0.0,
+                last_updated=timestamp,
+            )
+            rows[skill_id] = mastery
+        model.update(mastery, is_correct, difficulty, timestamp)
+
+        schedule = schedules.get(skill_id)
+        if schedule is None:
+            schedule = new_schedule(student_id, skill_id, timestamp)
+            schedules[skill_id] = schedule
+        schedule_review(schedule, answer_quality(is_correct, hint_requested), timestamp)
+        stats["events"] += 1
+
+    stats["rows"] += flush_replayed(db, rows)
+    flush_replayed(db, schedules)
+    return stats
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engine", choices=sorted(MASTERY_ENGINES), default=settings.mastery_engine)
+    parser.add_argument(
+        "--skip-archived",
+        action="store_true",
+        help="rebuild even though archived months can no longer be replayed",
+    )
+    args = parser.parse_args()
+
+    init_db()
+    db = MaintenanceSessionLocal()
+    started = time.perf_counter()
+    try:
+        archived = archived_months(db)
+        if archived and not args.skip_archived:
+            print(
+                f"❌ {len(archived)} months of events are archived ({archived[0]:%Y-%m} to {archived[-1]:%Y-%m}); "
+                "a rebuild would drop their effect on mastery. Pass --skip-archived to rebuild anyway."
+            )
+            return False
+        stats = rebuild_mastery(db, args.engine)
+        db.commit()
+    except Exception as exc:
+        db.rollback()
+        print(f"❌ Failed to rebuild mastery: {exc}")
+        return False
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"✅ Rebuilt {stats['rows']} mastery rows and review schedules from {stats['events']} events "
+        f"with engine={args.engine} in {elapsed:.1f}s"
+    )
+    if args.engine != settings.mastery_engine:
+        print(f"💡 Set MASTERY_ENGINE={args.engine} and restart the API to serve these scores")
+    return True
+
+
+if __name__ == "__main__":
+    ok = main()
+    raise SystemExit(0 if ok else 1)
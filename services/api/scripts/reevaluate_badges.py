@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Re-evaluate every badge rule for every student, e.g. after adding a rule.
+
+Students are processed in chunks. Each chunk's achievements, completed daily
+sessions, daily rollups and mastery rows are loaded with one IN query each.
+For every student this script:
+- sets `badge_mask` bits for achievements already stored that are missing
+  from the mask (migration 5 does this once for older databases)
+- grants badges the student qualifies for under the current rules, dated
+  when the qualifying aggregate was recorded
+
+Everything is committed in one transaction.
+
+Usage:
+  cd services/api/scripts
+  python reevaluate_badges.py [--dry-run]
+"""
+import argparse
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.badges import BadgeContext, badge_mask_for, grant_badges
+from app.database import MaintenanceSessionLocal, init_db
+from app.models import Achievement, DailySession, Mastery, Student, StudentDailyStats
+
+STUDENT_CHUNK_SIZE = 500
+
+
+def reevaluate_badges(db, now: datetime = None) -> dict:
+    """Sync badge masks with stored achievements and grant newly earned badges. Caller commits."""
+    now = now or datetime.now()
+    stats = {"students": 0, "masks_synced": 0, "granted": 0}
+    granted_by_key = defaultdict(int)
+
+    last_id = None
+    while True:
+        query = db.query(Student).order_by(Student.id)
+        if last_id is not None:
+            query = query.filter(Student.id > last_id)
+        students = query.limit(STUDENT_CHUNK_SIZE).all()
+        if not students:
+            break
+        last_id = students[-1].id
+        student_ids = [student.id for student in students]
+
+        badge_keys = _group(db.query(Achievement.student_id, Achievement.badge_key), Achievement, student_ids)
+        sessions = _group(
+            db.query(DailySession)
+            .filter(DailySession.is_completed.is_(True))
+            .order_by(DailySession.session_date),
+            DailySession,
+            student_ids,
+        )
+        daily_stats = _group(
+            db.query(StudentDailyStats).order_by(StudentDailyStats.stat_date), StudentDailyStats, student_ids
+        )
+        mastery_rows = _group(db.query(Mastery).order_by(Mastery.last_updated), Mastery, student_ids)
+
+        for student in students:
+            stored_mask = badge_mask_for(badge_key for _, badge_key in badge_keys[student.id])
+            if stored_mask & ~(student.badge_mask or 0):
+                student.badge_mask = (student.badge_mask or 0) | stored_mask
+                stats["masks_synced"] += 1
+
+            # Student-wide rules first, then per-day and per-skill aggregates in date order
+            candidates = [(BadgeContext(student), now)]
+            candidates += [
+                (BadgeContext(student, daily_session=session), session.completed_at or now)
+                for session in sessions[student.id]
+            ]
+            candidates += [
+                (BadgeContext(student, daily_stats=rollup), datetime.combine(rollup.stat_date, datetime.min.time()))
+                for rollup in daily_stats[student.id]
+            ]
+            candidates += [(BadgeContext(student, mastery=row), row.last_updated) for row in mastery_rows[student.id]]
+
+            for context, unlocked_at in candidates:
+                for rule in grant_badges(db, context, unlocked_at):
+                    granted_by_key[rule.key] += 1
+                    stats["granted"] += 1
+            stats["students"] += 1
+
+        db.flush()
+        # Keep the identity map small across chunks
+        db.expunge_all()
+
+    stats["granted_by_badge"] = dict(granted_by_key)
+    return stats
+
+
+def _group(query, model, student_ids) -> dict:
+    grouped = defaultdict(list)
+    for row in query.filter(model.student_id.in_(student_ids)):
+        grouped[row.student_id].append(row)
+    return grouped
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="report what would change, then roll back")
+    args = parser.parse_args()
+
+    init_db()
+    db = MaintenanceSessionLocal()
+    started = time.perf_counter()
+    try:
+        stats = reevaluate_badges(db)
+        if args.dry_run:
+            db.rollback()
+        else:
+            db.commit()
+    except Exception as exc:
+        db.rollback()
+        print(f"❌ Failed to re-evaluate badges: {exc}")
+        return False
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    verb = "Would grant" if args.dry_run else "Granted"
+    print(
+        f"✅ {verb} {stats['granted']} badges to {stats['students']} students "
+        f"({stats['masks_synced']} badge masks synced) in {elapsed:.1f}s"
+    )
+    for badge_key, count in sorted(stats["granted_by_badge"].items()):
+        print(f"   {badge_key}: {count}")
+    return True
+
+
+if __name__ == "__main__":
+    ok = main()
+    raise SystemExit(0 if ok else 1)
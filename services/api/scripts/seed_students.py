@@ -12,9 +12,7 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from sqlalchemy import text
-
-from app.database import SessionLocal, init_db, engine
+from app.database import MaintenanceSessionLocal, init_db
 from app.models import Student
 
 STUDENTS = [
@@ -35,18 +33,16 @@ STUDENTS = [
 ]
 
 
-def seed_students() -> bool:
+def seed_students(students=None) -> bool:
     init_db()
-    db = SessionLocal()
+    db = MaintenanceSessionLocal()
     now = datetime.now()
 
     created = 0
     updated = 0
 
     try:
-        _ensure_student_schema(db)
-
-        for entry in STUDENTS:
+        for entry in students or STUDENTS:
             existing = db.query(Student).filter(Student.id == entry["id"]).first()
             if existing:
                 existing.name = entry["name"]
@@ -73,7 +69,7 @@ def seed_students() -> bool:
 
         db.commit()
         print(f"✅ Seed complete. created={created}, updated={updated}")
-        for student in db.query(Student).order_by(Student.name.asc()).all():
+        for student in db.query(Student).order_by(Student.name.asc()).limit(20).all():
             print(
                 f"   - {student.id}: {student.name} (Year {student.year_level}, "
                 f"avatar={student.avatar}, daily_target={student.target_daily_questions})"
@@ -87,31 +83,6 @@ def seed_students() -> bool:
         db.close()
 
 
-def _ensure_student_schema(db) -> None:
-    if engine.dialect.name != "sqlite":
-        return
-
-    existing_cols = {
-        row[1]
-        for row in db.execute(text("PRAGMA table_info(students)")).fetchall()
-    }
-
-    alter_statements = {
-        "avatar": "ALTER TABLE students ADD COLUMN avatar VARCHAR DEFAULT 'star' NOT NULL",
-        "target_daily_questions": "ALTER TABLE students ADD COLUMN target_daily_questions INTEGER DEFAULT 10 NOT NULL",
-        "current_streak": "ALTER TABLE students ADD COLUMN current_streak INTEGER DEFAULT 0 NOT NULL",
-        "longest_streak": "ALTER TABLE students ADD COLUMN longest_streak INTEGER DEFAULT 0 NOT NULL",
-        "last_practice_date": "ALTER TABLE students ADD COLUMN last_practice_date DATE",
-        "total_sessions": "ALTER TABLE students ADD COLUMN total_sessions INTEGER DEFAULT 0 NOT NULL",
-    }
-
-    for col_name, statement in alter_statements.items():
-        if col_name not in existing_cols:
-            db.execute(text(statement))
-
-    db.commit()
-
-
 if __name__ == "__main__":
     ok = seed_students()
     raise SystemExit(0 if ok else 1)
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Latency / throughput benchmark for the hot API endpoints.
+
+Seeds a throwaway SQLite database with N students (seed_students.py) and
+M generated items (load_content.py), then drives each endpoint through an
+in-process ASGI client at a fixed concurrency and reports p50/p95/p99 latency,
+throughput and SQL statements per request. Results can be saved as a baseline
+and later runs compared against it; regressions make the script exit 1.
+
+Usage:
+  cd services/api
+  python tests/benchmarks/bench_api.py --students 50 --items 2000 --requests 500 --concurrency 16
+  python tests/benchmarks/bench_api.py --output baseline.json
+  python tests/benchmarks/bench_api.py --baseline baseline.json --tolerance 0.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+API_ROOT = Path(__file__).resolve().parents[2]
+CONTENT_ROOT = API_ROOT.parent / "content"
+ENDPOINTS = ["events", "next-item", "placement-start", "parent-daily-summary"]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=300, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="SQLite file to use (default: fresh temp file)")
+    parser.add_argument("--output", help="write results JSON here (e.g. to save a baseline)")
+    parser.add_argument("--baseline", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    return parser.parse_args()
+
+
+def configure_database(db_path: str) -> None:
+    # Settings are read at import time, so this must run before importing `app`
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["DEBUG"] = "false"
+    os.environ["DB_ECHO"] = "false"
+    sys.path.insert(0, str(API_ROOT))
+
+
+def seed(num_students: int, num_items: int, rng: random.Random, workdir: Path) -> list:
+    from scripts.load_content import load_content
+    from scripts.seed_students import seed_students
+
+    students = [
+        {
+            "id": f"bench_student_{index:05d}",
+            "name": f"Bench {index:05d}",
+            "year_level": 3 + index % 4,
+            "avatar": "star",
+            "target_daily_questions": 10,
+        }
+        for index in range(num_students)
+    ]
+    seed_students(students)
+
+    sys.path.insert(0, str(CONTENT_ROOT))
+    from curriculum.nsw_year3_6 import get_skill_tree
+    from templates import TEMPLATES
+
+    levels = {skill["skill_id"]: skill["difficulty_levels"] for skill in get_skill_tree()}
+    # Templates draw from the global random module
+    random.seed(rng.random())
+    items = []
+    attempts = 0
+    while len(items) < num_items:
+        template = TEMPLATES[attempts % len(TEMPLATES)]
+        attempts += 1
+        try:
+            item = template.generate(rng.choice(levels[template.skill_id]))
+        except ValueError:
+            # Same as generate_items.py: some random draws are invalid, skip them
+            continue
+        item["item_id"] = f"bench_{len(items):07d}_{item['item_id']}"
+        items.append(item)
+
+    pack_path = workdir / "bench_content_pack.json"
+    pack_path.write_text(json.dumps(items))
+    load_content(pack_path)
+    return [student["id"] for student in students]
+
+
+class QueryCounter:
+    """Counts statements on both the sync and async engines."""
+
+    def __init__(self):
+        from sqlalchemy import event
+        from app.database import async_engine, engine
+
+        self.count = 0
+        for target in (engine, async_engine.sync_engine):
+            event.listen(target, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def build_request(endpoint: str, rng: random.Random, student_ids: list, item_ids: list, sequence: int):
+    student_id = rng.choice(student_ids)
+    if endpoint == "events":
+        return "POST", "/api/v1/events", {
+            "json": {
+                "event_id": f"bench_evt_{sequence:08d}_{rng.getrandbits(32):08x}",
+                "student_id": student_id,
+                "item_id": rng.choice(item_ids),
+                "answer_given": "1",
+                "is_correct": rng.random() < 0.7,
+                "time_spent": round(rng.uniform(2, 30), 2),
+                "hint_requested": rng.random() < 0.1,
+                "timestamp": datetime.now().isoformat(),
+            }
+        }
+    if endpoint == "next-item":
+        return "GET", "/api/v1/next-item", {"params": {"student_id": student_id}}
+    if endpoint == "placement-start":
+        return "POST", "/api/v1/placement/start", {"params": {"student_id": student_id, "year_level": rng.randint(3, 6)}}
+    return "GET", "/api/v1/parent/daily-summary", {}
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+async def run_endpoint(client, endpoint, requests, concurrency, rng, student_ids, item_ids, counter) -> dict:
+    planned = [build_request(endpoint, rng, student_ids, item_ids, index) for index in range(requests)]
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for request in planned:
+        queue.put_nowait(request)
+
+    async def worker():
+        nonlocal errors
+        while True:
+            try:
+                method, url, kwargs = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            response = await client.request(method, url, **kwargs)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    queries_before = counter.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+        "queries_per_request": round((counter.count - queries_before) / requests, 2),
+    }
+
+
+async def run_benchmarks(args, student_ids: list) -> dict:
+    import httpx
+    from app.main import app
+    from app.models import Item
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        item_ids = [row.id for row in db.query(Item.id).all()]
+    finally:
+        db.close()
+
+    counter = QueryCounter()
+    rng = random.Random(args.seed)
+    results = {}
+    async with app.router.lifespan_context(app):
+        # Report server errors as failed requests instead of raising them here
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for endpoint in args.endpoints:
+                # Short warm-up so caches and connection pools are primed
+                await run_endpoint(client, endpoint, min(20, args.requests), 1, rng, student_ids, item_ids, counter)
+                results[endpoint] = await run_endpoint(
+                    client, endpoint, args.requests, args.concurrency, rng, student_ids, item_ids, counter
+                )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    for endpoint, current in results.items():
+        previous = baseline.get("endpoints", {}).get(endpoint)
+        if not previous:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{endpoint}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} req/s"
+            )
+        if current["queries_per_request"] > previous["queries_per_request"]:
+            regressions.append(
+                f"{endpoint}: queries/request {previous['queries_per_request']} -> {current['queries_per_request']}"
+            )
+    return regressions
+
+
+def print_report(results: dict) -> None:
+    header = f"{'endpoint':<22}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>10}{'queries':>10}{'errors':>8}"
+    print(header)
+    print("-" * len(header))
+    for endpoint, row in results.items():
+        print(
+            f"{endpoint:<22}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+            f"{row['throughput_rps']:>10.1f}{row['queries_per_request']:>10.2f}{row['errors']:>8}"
+        )
+
+
+def main() -> int:
+    args = parse_args()
+    workdir = Path(tempfile.mkdtemp(prefix="mathcoach-bench-"))
+    configure_database(args.db or str(workdir / "bench.db"))
+
+    rng = random.Random(args.seed)
+    student_ids = seed(args.students, args.items, rng, workdir)
+    results = asyncio.run(run_benchmarks(args, student_ids))
+
+    print()
+    print(f"students={args.students} items={args.items} requests={args.requests} concurrency={args.concurrency}")
+    print_report(results)
+
+    report = {
+        "config": {
+            "students": args.students,
+            "items": args.items,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+        },
+        "endpoints": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"\n📝 Results saved to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,5 @@
 from datetime import datetime
+import os
 import sys
 from pathlib import Path
 
@@ -8,16 +9,43 @@ from sqlalchemy.orm import sessionmaker
 
 # Ensure `app` package is importable when running tests from services/api.
 sys.path.append(str(Path(__file__).resolve().parents[1]))
+# The content service's generator, pack I/O and validators are plain modules in services/content
+sys.path.append(str(Path(__file__).resolve().parents[2] / "content"))
 
+from app.event_dedup import recent_event_ids
+from app.item_cache import item_cache
+from app.item_index import item_index
 from app.models import Achievement, DailySession, Event, Item, Mastery, Student
 from app.models.student import Base
 
+# Set to also run the Postgres-only tests, e.g. postgresql://mathcoach@localhost/mathcoach_test
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+def _make_item(item_id, skill_id, difficulty):
+    return Item(
+        id=item_id,
+        skill_id=skill_id,
+        question_text=f"Question {item_id}",
+        question_type="numeric",
+        difficulty=difficulty,
+        parameters={"a": difficulty},
+        correct_answer="1",
+        hint=None,
+        explanation="Because.",
+        validation_rule="exact_match",
+    )
+
 
 @pytest.fixture()
 def db_session():
     engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
     TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     Base.metadata.create_all(bind=engine)
+    # Process-wide caches must not leak item ids between per-test databases.
+    item_index.invalidate()
+    item_cache.clear()
+    recent_event_ids.clear()
     db = TestingSessionLocal()
     try:
         yield db
@@ -54,3 +82,36 @@ def seeded_students(db_session):
     db_session.add_all(students)
     db_session.commit()
     return students
+
+
+@pytest.fixture()
+def make_item():
+    """Factory for items where only the id, skill and difficulty matter."""
+    return _make_item
+
+
+@pytest.fixture()
+def seeded_item(db_session):
+    """A single yr4_mult_div_001 item, "item_1"."""
+    item = Item(
+        id="item_1",
+        skill_id="yr4_mult_div_001",
+        question_text="What is 2 × 2?",
+        question_type="numeric",
+        difficulty=1,
+        parameters={"a": 2, "b": 2},
+        correct_answer="4",
+        hint=None,
+        explanation="2 × 2 = 4",
+        validation_rule="numeric",
+    )
+    db_session.add(item)
+    db_session.commit()
+    return item
+
+
+@pytest.fixture()
+def postgres_url():
+    if not POSTGRES_URL:
+        pytest.skip("TEST_POSTGRES_URL not set")
+    return POSTGRES_URL
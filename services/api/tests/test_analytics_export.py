@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+
+from app import columnar
+from app.migrations import migrate
+from app.models import Event
+from scripts.export_events import export_events, read_watermark
+
+DAY = datetime(2026, 2, 16, 9, 0)
+
+
+def _event(event_id, at, received_at=None, item_id="yr4_mult_div_001_a"):
+    return {
+        "id": event_id, "student_id": "jon_zhao", "item_id": item_id, "answer_given": "1", "is_correct": True,
+        "time_spent": 5.0, "hint_requested": False, "timestamp": at, "received_at": received_at or at,
+    }
+
+
+def _day(directory, at):
+    files = list((directory / f"date={at.date().isoformat()}").glob("events.*"))
+    assert len(files) == 1
+    return columnar.read_columns(files[0])
+
+
+def test_export_writes_daily_files_and_resumes_from_the_received_watermark(tmp_path, make_item):
+    if not columnar.available():
+        pytest.skip("needs pyarrow or numpy")
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}")
+    migrate(engine)
+    directory = tmp_path / "export"
+    with engine.begin() as conn:
+        item = make_item("yr4_mult_div_001_a", "yr4_mult_div_001", 3)
+        conn.execute(item.__table__.insert(), [{column.name: getattr(item, column.name) for column in item.__table__.columns}])
+        conn.execute(Event.__table__.insert(), [
+            _event(f"e{n}", DAY + timedelta(days=n // 2, minutes=n)) for n in range(8)
+        ])
+
+    stats = export_events(engine, directory)
+
+    assert (stats["rows"], stats["days"]) == (8, 4)
+    first_day = _day(directory, DAY)
+    assert first_day["id"] == ["e0", "e1"]
+    assert (first_day["skill_id"], first_day["difficulty"]) == (["yr4_mult_div_001"] * 2, [3, 3])
+    watermark = DAY + timedelta(days=3, minutes=7)
+    assert stats["watermark"] == read_watermark(directory) == watermark
+
+    received = watermark + timedelta(days=5)
+    with engine.begin() as conn:
+        conn.execute(Event.__table__.insert(), [
+            # Synced from offline a week after it was answered
+            _event("offline", DAY + timedelta(hours=5), received_at=received),
+            # Committed after the last export read its watermark, within the overlap
+            _event("in_flight", DAY + timedelta(days=3, hours=1), received_at=watermark - timedelta(minutes=1)),
+            _event("e9", DAY + timedelta(days=4), received_at=received),
+        ])
+    untouched = next((directory / f"date={(DAY + timedelta(days=1)).date().isoformat()}").glob("events.*"))
+    untouched_mtime = untouched.stat().st_mtime_ns
+    again = export_events(engine, directory, stats["watermark"])
+
+    assert again["since"] == watermark - timedelta(minutes=5)
+    assert (again["rows"], again["days"]) == (7, 3)
+    assert _day(directory, DAY)["id"] == ["e0", "e1", "offline"]
+    assert _day(directory, DAY + timedelta(days=3))["id"] == ["e6", "e7", "in_flight"]
+    assert _day(directory, DAY + timedelta(days=4))["id"] == ["e9"]
+    assert untouched.stat().st_mtime_ns == untouched_mtime
+    assert read_watermark(directory) == again["watermark"] == received
+
+    # Nothing new: only the days received within the overlap are rewritten, unchanged
+    repeat = export_events(engine, directory, received)
+    assert (repeat["rows"], repeat["days"]) == (4, 2)
+    assert _day(directory, DAY)["id"] == ["e0", "e1", "offline"]
+    assert read_watermark(directory) == received
+    engine.dispose()
@@ -0,0 +1,73 @@
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from app.badges import BADGES_BY_KEY, BadgeContext, badge_mask_for, evaluate
+from app.daily_stats import new_daily_stats, record_event
+from app.models import Achievement, Mastery, Student
+from app.routers.events import _unlock_achievements
+from scripts.reevaluate_badges import reevaluate_badges
+
+
+def _rollup(answers, correct, seconds_each):
+    rollup = new_daily_stats("jon_zhao", date(2026, 2, 19))
+    for index in range(answers):
+        record_event(rollup, index < correct, seconds_each, False, "yr4_mult_div_001")
+    return rollup
+
+
+def test_rules_evaluate_loaded_aggregates_without_queries(db_session, seeded_students):
+    student = db_session.query(Student).filter(Student.id == "jon_zhao").first()
+    mastery = Mastery(
+        student_id="jon_zhao", skill_id="yr4_mult_div_001", total_attempts=12, correct_attempts=11,
+        mastery_score=0.92, last_updated=datetime(2026, 2, 19),
+    )
+    statements = []
+
+    def listener(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db_session.get_bind(), "before_cursor_execute", listener)
+    try:
+        granted = _unlock_achievements(
+            db_session, student, None, datetime(2026, 2, 19), daily_stats=_rollup(10, 9, 8.0), mastery=mastery
+        )
+    finally:
+        event.remove(db_session.get_bind(), "before_cursor_execute", listener)
+
+    assert statements == []
+    assert {rule.key for rule in granted} == {"accuracy_90", "quick_10", "skill_master_1"}
+    assert student.badge_mask == badge_mask_for(["accuracy_90", "quick_10", "skill_master_1"])
+    # Slow but accurate: accuracy only, and nothing twice
+    assert evaluate(BadgeContext(student, daily_stats=_rollup(10, 10, 30.0))) == []
+    student.badge_mask = 0
+    assert [rule.key for rule in evaluate(BadgeContext(student, daily_stats=_rollup(10, 10, 30.0)))] == [
+        "accuracy_90"
+    ]
+
+
+def test_reevaluate_badges_syncs_masks_and_backfills(db_session, seeded_students):
+    student = db_session.query(Student).filter(Student.id == "jon_zhao").first()
+    student.longest_streak = 8
+    student.current_streak = 1
+    rule = BADGES_BY_KEY["streak_3"]
+    db_session.add(
+        Achievement(
+            id="existing", student_id="jon_zhao", badge_key=rule.key, title=rule.title,
+            description=rule.description, unlocked_at=datetime(2026, 1, 1),
+        )
+    )
+    db_session.add(_rollup(12, 11, 20.0))
+    db_session.commit()
+
+    stats = reevaluate_badges(db_session, now=datetime(2026, 3, 1))
+    db_session.commit()
+
+    assert stats["masks_synced"] == 1
+    assert stats["granted_by_badge"] == {"streak_7": 1, "accuracy_90": 1}
+    keys = {row.badge_key: row.unlocked_at for row in db_session.query(Achievement).all()}
+    assert set(keys) == {"streak_3", "streak_7", "accuracy_90"}
+    assert keys["accuracy_90"] == datetime(2026, 2, 19)
+
+    # Running it again changes nothing
+    assert reevaluate_badges(db_session)["granted"] == 0
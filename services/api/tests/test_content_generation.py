@@ -0,0 +1,39 @@
+from generate_items import derive_seed, generate_all_items, generate_item, reproduce_item
+from pack_io import PackReader
+
+
+def _pack_files(directory):
+    return {
+        path.relative_to(directory).as_posix(): path.read_bytes()
+        for path in sorted(directory.rglob("*"))
+        if path.is_file()
+    }
+
+
+def test_pack_is_byte_identical_whatever_the_worker_count(tmp_path):
+    for workers in (1, 2):
+        output = tmp_path / f"workers_{workers}" / "pack.json"
+        output.parent.mkdir()
+        generate_all_items(
+            workers=workers, output_path=str(output), items_per_difficulty=3, formats=("json", "jsonl", "columnar")
+        )
+
+    single, parallel = _pack_files(tmp_path / "workers_1"), _pack_files(tmp_path / "workers_2")
+    assert {"pack.json", "pack.jsonl", "pack/index.json"} <= set(single)
+    assert single == parallel
+
+    items = list(PackReader(tmp_path / "workers_1" / "pack.json"))
+    assert len({item["item_id"] for item in items}) == len(items)
+    assert reproduce_item(items[-1]) == items[-1]
+
+
+def test_items_depend_only_on_the_seed_template_and_difficulty():
+    seed = derive_seed(42, "MultiplicationFactsTemplate", 2, 5)
+    assert seed == derive_seed(42, "MultiplicationFactsTemplate", 2, 5)
+    assert seed != derive_seed(42, "MultiplicationFactsTemplate", 2, 6)
+    assert seed != derive_seed(43, "MultiplicationFactsTemplate", 2, 5)
+
+    item = generate_item("MultiplicationFactsTemplate", 2, seed)
+    assert generate_item("MultiplicationFactsTemplate", 2, seed) == item
+    assert item["generator"] == {"template": "MultiplicationFactsTemplate", "seed": seed}
+    assert reproduce_item(item) == item
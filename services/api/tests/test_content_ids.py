@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+from generate_items import generate_item
+from templates.ids import ID_DIGEST_CHARS, DedupIndex, content_digest, content_item_id
+
+COMMITTED_PACK = Path(__file__).resolve().parents[2] / "content" / "output" / "content_pack_v0.json"
+
+
+def test_item_id_is_the_content_hash_of_the_canonical_question():
+    item = generate_item("MultiplicationFactsTemplate", 1, seed=7)
+    reordered = {**item, "parameters": dict(reversed(list(item["parameters"].items())))}
+
+    assert item["item_id"] == content_item_id(item)
+    assert item["item_id"] == f"yr4_mult_div_001_d1_{content_digest(item)[:ID_DIGEST_CHARS]}"
+    # Same question whatever the key order of its parameters
+    assert content_item_id(reordered) == item["item_id"]
+    # Hints and generator metadata aren't part of the question
+    assert content_item_id({**item, "hint": "Count in fours", "generator": None}) == item["item_id"]
+    assert content_item_id({**item, "correct_answer": "5"}) != item["item_id"]
+
+
+def test_dedup_index_drops_repeated_questions_per_skill():
+    item = generate_item("MultiplicationFactsTemplate", 1, seed=7)
+    other_skill = {**item, "skill_id": "yr5_mult_div_002"}
+    other_skill["item_id"] = content_item_id(other_skill)
+
+    dedup = DedupIndex()
+    assert dedup.add(item)
+    assert not dedup.add(dict(item))
+    assert dedup.add(other_skill)
+    assert [(row["skill_id"], row["generated"], row["unique"], row["duplicates"]) for row in dedup.report()] == [
+        ("yr4_mult_div_001", 2, 1, 1),
+        ("yr5_mult_div_002", 1, 1, 0),
+    ]
+
+
+def test_committed_pack_uses_content_hash_ids():
+    items = json.loads(COMMITTED_PACK.read_text())
+    assert items
+    assert all(item["item_id"] == content_item_id(item) for item in items)
+    assert len({item["item_id"] for item in items}) == len(items)
@@ -0,0 +1,58 @@
+from generate_items import generate_item
+from validate_items import parse_answers, validate_batch, validate_content_pack
+
+
+def _validated(item):
+    report = validate_batch([item])
+    counts = report["per_skill"][item["skill_id"]]
+    return counts, report["invalid_items"], report["error_items"]
+
+
+def test_parse_answers_splits_fractions_and_flags_unparseable_rows():
+    columns = parse_answers(["3/4", "12", " -5 ", "4/", "/4", "x", None, "2/-3"])
+
+    assert columns["answer_num"].tolist() == [3, 12, -5, 4, 0, 0, 0, 2]
+    assert columns["answer_den"].tolist() == [4, 1, 1, 1, 1, 1, 1, -3]
+    assert columns["answer_is_fraction"].tolist() == [True, False, False, False, False, False, False, True]
+    assert columns["answer_parsed"].tolist() == [True, True, True, False, False, False, False, True]
+    assert {key: len(column) for key, column in parse_answers([]).items()} == dict.fromkeys(columns, 0)
+
+
+def test_each_validator_accepts_generated_items_and_rejects_a_known_bad_one():
+    comparison = generate_item("FractionComparisonTemplate", 1, seed=7)
+    addition = generate_item("FractionAdditionTemplate", 1, seed=7)
+    equivalent = generate_item("EquivalentFractionTemplate", 1, seed=7)
+    multiplication = generate_item("MultiplicationFactsTemplate", 1, seed=7)
+    known_bad = [
+        # The smaller fraction given as the larger
+        ({**comparison, "correct_answer": "2/8"}, "4/8"),
+        # Stored sum is wrong, so the answer built from it is too
+        ({**addition, "parameters": {**addition["parameters"], "result_num": 5}, "correct_answer": "5/7"}, "N/A"),
+        ({**equivalent, "correct_answer": "3/8"}, "equivalent to 1/4"),
+        ({**multiplication, "correct_answer": "13"}, "12"),
+    ]
+
+    for good in (comparison, addition, equivalent, multiplication):
+        counts, invalid, errors = _validated(good)
+        assert (counts["valid"], invalid, errors) == (1, [], [])
+
+    for bad, expected in known_bad:
+        counts, invalid, errors = _validated(bad)
+        assert (counts["valid"], counts["invalid"], errors) == (0, 1, [])
+        assert (invalid[0]["expected"], invalid[0]["actual"]) == (expected, bad["correct_answer"])
+
+    counts, invalid, errors = _validated({**multiplication, "parameters": {"a": "four", "b": 3}})
+    assert (counts["errors"], invalid) == (1, [])
+    assert errors[0]["item_id"] == multiplication["item_id"]
+
+
+def test_report_is_only_written_when_asked_for(tmp_path, monkeypatch):
+    pack = tmp_path / "pack.json"
+    pack.write_text("[]")
+    monkeypatch.chdir(tmp_path)
+
+    assert validate_content_pack(str(pack))
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["pack.json"]
+
+    assert validate_content_pack(str(pack), report_path=str(tmp_path / "report.json"))
+    assert (tmp_path / "report.json").exists()
@@ -0,0 +1,33 @@
+import sqlite3
+
+from app.database import _engine_options, apply_sqlite_pragmas
+
+
+def test_postgres_engine_options_configure_pool_and_timeout():
+    options = _engine_options("postgresql://mathcoach:pw@localhost:5432/mathcoach")
+    assert options["echo"] is False
+    assert options["pool_size"] == 10
+    assert options["max_overflow"] == 20
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == 1800
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_sqlite_connections_get_wal_and_relaxed_sync(tmp_path):
+    options = _engine_options("sqlite:///mathcoach.db")
+    assert "pool_size" not in options
+    assert options["connect_args"]["check_same_thread"] is False
+
+    connection = sqlite3.connect(tmp_path / "pragmas.db")
+    apply_sqlite_pragmas(connection)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    # 1 == NORMAL
+    assert connection.execute("PRAGMA synchronous").fetchone()[0] == 1
+    connection.close()
+
+
+def test_maintenance_engine_options_lift_the_statement_timeout():
+    options = _engine_options("postgresql://mathcoach:pw@localhost:5432/mathcoach", statement_timeout_ms=0)
+    assert options["connect_args"] == {"options": "-c statement_timeout=0"}
+    options = _engine_options("postgresql+asyncpg://mathcoach:pw@localhost:5432/mathcoach", statement_timeout_ms=0)
+    assert options["connect_args"] == {"server_settings": {"statement_timeout": "0"}}
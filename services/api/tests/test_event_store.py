@@ -0,0 +1,112 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, func, inspect, select
+from sqlalchemy.orm import sessionmaker
+
+from app import columnar
+from app.event_store import (
+    add_months,
+    archivable_months,
+    archive_month,
+    event_source,
+    month_start,
+    partition_name,
+    seal_cold_months,
+)
+from app.migrations import migrate
+from app.models import Event, EventOutbox, EventPartition, StudentDailyStats
+from scripts.backfill_daily_stats import rebuild_daily_stats
+
+CURRENT = month_start(date.today())
+OLD = add_months(CURRENT, -14)
+COLD = add_months(CURRENT, -5)
+
+
+@pytest.fixture()
+def store(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'events.db'}")
+    migrate(engine)
+    with engine.begin() as conn:
+        conn.execute(Event.__table__.insert(), [
+            _event(f"{month:%Y%m}_{n}", month, n)
+            for month, count in [(OLD, 2), (COLD, 3), (CURRENT, 1)]
+            for n in range(count)
+        ])
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+def _event(event_id, month, n=0):
+    return {
+        "id": event_id, "student_id": "jon_zhao", "item_id": "item_1", "answer_given": "1", "is_correct": True,
+        "time_spent": 5.0, "hint_requested": False, "timestamp": datetime.combine(month, datetime.min.time())
+        + timedelta(days=n, hours=9),
+    }
+
+
+def _count(db, source, start=None, end=None):
+    query = select(func.count()).select_from(source)
+    if start:
+        query = query.where(source.c.timestamp >= start)
+    if end:
+        query = query.where(source.c.timestamp < end)
+    return db.execute(query).scalar()
+
+
+def test_cold_months_move_to_shards_and_reads_prune_them(store):
+    assert seal_cold_months(store) == [(OLD, 2), (COLD, 3)]
+
+    db = sessionmaker(bind=store)()
+    assert db.query(Event).count() == 1
+    assert _count(db, event_source(db)) == 6
+
+    cold_start = datetime.combine(COLD, datetime.min.time())
+    cold_end = datetime.combine(add_months(COLD, 1), datetime.min.time())
+    source = event_source(db, cold_start, cold_end)
+    sql = str(select(source))
+    assert partition_name(COLD) in sql and partition_name(OLD) not in sql
+    assert _count(db, source, cold_start, cold_end) == 3
+    assert event_source(db, datetime.combine(CURRENT, datetime.min.time())) is Event.__table__
+
+    # A late answer for a sealed month joins its shard on the next run
+    db.execute(Event.__table__.insert(), [_event("late", COLD, 20)])
+    db.commit()
+    assert seal_cold_months(store) == [(COLD, 1)]
+    assert db.get(EventPartition, COLD).row_count == 4
+    db.close()
+
+
+def test_archive_exports_old_months_and_keeps_rollups(store, tmp_path):
+    if not columnar.available():
+        pytest.skip("needs pyarrow or numpy")
+    seal_cold_months(store)
+    db = sessionmaker(bind=store)()
+    db.add(StudentDailyStats(student_id="jon_zhao", stat_date=OLD, events_total=2, correct_total=2,
+                             time_spent_total=10.0, hints_total=0, skill_counts={}))
+    db.execute(Event.__table__.insert(), [_event("late", OLD, 25)])
+    db.add(EventOutbox(event_id="late", enqueued_at=datetime.now()))
+    db.commit()
+
+    assert archivable_months(store, 12) == [OLD]
+    assert archive_month(store, OLD, tmp_path / "archive")["skipped"] == "aggregates pending"
+
+    db.query(EventOutbox).delete()
+    db.commit()
+    result = archive_month(store, OLD, tmp_path / "archive")
+
+    assert result["rows"] == 3
+    exported = columnar.read_columns(result["path"])
+    assert sorted(exported["id"]) == [f"{OLD:%Y%m}_0", f"{OLD:%Y%m}_1", "late"]
+    assert not inspect(store).has_table(partition_name(OLD))
+    assert db.get(EventPartition, OLD).state == "archived"
+    assert _count(db, event_source(db)) == 4
+    assert archivable_months(store, 12) == []
+
+    # Rebuilding the rollup leaves archived days alone
+    rebuild_daily_stats(db)
+    db.commit()
+    assert db.get(StudentDailyStats, ("jon_zhao", OLD)).events_total == 2
+    db.close()
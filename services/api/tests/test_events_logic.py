@@ -1,12 +1,20 @@
 from datetime import date, datetime, timedelta
 
+import pytest
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 
-from app.models import Achievement, DailySession, Student
+from app.event_dedup import recent_event_ids
+from app.event_outbox import OutboxWorker
+from app.models import Achievement, DailySession, Event, EventOutbox, Mastery, Student, StudentDailyStats
 from app.routers.events import (
+    _drain_outbox,
+    _record_event,
+    _retry_on_conflict,
     _unlock_achievements,
     _update_daily_session_progress,
     _update_student_streak,
+    _record_events_batch,
     create_event,
 )
 
@@ -87,3 +95,294 @@ def test_update_daily_session_progress_creates_session(db_session, seeded_studen
     assert persisted is not None
     assert persisted.completed_questions == 1
     assert persisted.target_questions == student.target_daily_questions
+
+
+def _batch_event(event_id, day, minute, is_correct=True, item_id="item_1"):
+    return {
+        "event_id": event_id,
+        "student_id": "jon_zhao",
+        "item_id": item_id,
+        "answer_given": "4",
+        "is_correct": is_correct,
+        "time_spent": 5.0,
+        "timestamp": datetime(2026, 2, day, 8, minute).isoformat(),
+    }
+
+
+def test_create_events_batch_applies_updates_and_is_idempotent(db_session, seeded_students, seeded_item):
+    batch = [
+        _batch_event("b1", 17, 0),
+        _batch_event("b2", 18, 0, is_correct=False),
+        _batch_event("b3", 19, 0),
+        _batch_event("b3", 19, 1),
+        {"event_id": "b4", "student_id": "jon_zhao"},
+        {**_batch_event("b5", 19, 2), "student_id": "nobody"},
+    ]
+    response = _record_events_batch(db_session, batch)
+
+    assert [result["status"] for result in response["results"]] == [
+        "created", "created", "created", "duplicate", "rejected", "rejected",
+    ]
+    assert response["created"] == 3
+
+    student = db_session.query(Student).filter(Student.id == "jon_zhao").first()
+    assert student.current_streak == 3
+    assert student.total_sessions == 3
+    assert db_session.query(DailySession).count() == 3
+    assert db_session.query(Achievement).filter(Achievement.badge_key == "streak_3").count() == 1
+
+    mastery = db_session.query(Mastery).filter(Mastery.student_id == "jon_zhao").one()
+    assert mastery.total_attempts == 3
+    assert mastery.correct_attempts == 2
+
+    rollup = db_session.query(StudentDailyStats).filter(StudentDailyStats.stat_date == date(2026, 2, 18)).one()
+    assert (rollup.events_total, rollup.correct_total) == (1, 0)
+    assert rollup.skill_counts == {"yr4_mult_div_001": [1, 0]}
+
+    # Replaying the same batch must not re-apply any side effects.
+    replay = _record_events_batch(db_session, batch[:3])
+    assert [result["status"] for result in replay["results"]] == ["duplicate"] * 3
+    db_session.refresh(student)
+    assert student.total_sessions == 3
+    assert db_session.query(Event).count() == 3
+
+
+def test_record_event_is_idempotent(db_session, seeded_students, seeded_item):
+    event = _batch_event("retry_1", 19, 0)
+    assert _record_event(db_session, event) == {"status": "success", "event_id": "retry_1"}
+
+    # Resent from the same process: answered from the recent-id set
+    assert _record_event(db_session, event) == {"status": "success", "event_id": "retry_1", "duplicate": True}
+    assert recent_event_ids.hits == 1
+
+    # Resent to a process that hasn't seen it: the primary key catches it
+    recent_event_ids.clear()
+    assert _record_event(db_session, event) == {"status": "success", "event_id": "retry_1", "duplicate": True}
+
+    student = db_session.query(Student).filter(Student.id == "jon_zhao").first()
+    assert student.total_sessions == 1
+    assert db_session.query(DailySession).one().completed_questions == 1
+    assert db_session.query(Mastery).one().total_attempts == 1
+    assert db_session.query(Event).count() == 1
+
+
+def test_resend_with_another_timestamp_is_a_duplicate(db_session, seeded_students, seeded_item):
+    from app.event_store import seal_cold_months
+
+    event = {**_batch_event("late_1", 19, 0), "timestamp": "2025-03-04T08:00:00"}
+    assert _record_event(db_session, event) == {"status": "success", "event_id": "late_1"}
+    # The month moves out of `events`, as a Postgres partition key or SQLite shard would
+    seal_cold_months(db_session.get_bind(), today=date(2026, 2, 19))
+    assert db_session.query(Event).count() == 0
+    recent_event_ids.clear()
+
+    resent_later = {**event, "timestamp": "2026-02-19T08:00:00"}
+    resent_without_timestamp = {key: value for key, value in event.items() if key != "timestamp"}
+    for resend in (resent_later, resent_without_timestamp):
+        assert _record_event(db_session, resend) == {"status": "success", "event_id": "late_1", "duplicate": True}
+    batch = _record_events_batch(db_session, [resent_later, resent_without_timestamp])
+    assert [result["status"] for result in batch["results"]] == ["duplicate", "duplicate"]
+
+    student = db_session.query(Student).filter(Student.id == "jon_zhao").first()
+    assert student.total_sessions == 1
+    assert db_session.query(Mastery).one().total_attempts == 1
+    assert db_session.query(Event).count() == 0
+
+
+def test_write_behind_defers_aggregates_until_drained(db_session, seeded_students, seeded_item):
+    for day in (17, 18, 19):
+        response = _record_event(db_session, _batch_event(f"wb{day}", day, 0), defer=True)
+        assert response == {"status": "success", "event_id": f"wb{day}", "queued": True}
+    batch = _record_events_batch(db_session, [_batch_event("wb20", 20, 0)], defer=True)
+    assert batch["queued"] is True
+
+    student = db_session.query(Student).filter(Student.id == "jon_zhao").first()
+    assert student.total_sessions == 0
+    assert db_session.query(Mastery).count() == 0
+    assert [row.event_id for row in db_session.query(EventOutbox).order_by(EventOutbox.seq)] == [
+        "wb17", "wb18", "wb19", "wb20",
+    ]
+
+    state = _drain_outbox(db_session, 3)
+    assert (state["applied"], state["pending"]) == (3, 1)
+    assert state["oldest_enqueued_at"] is not None
+    assert _drain_outbox(db_session, 3)["pending"] == 0
+
+    db_session.refresh(student)
+    # Applied in arrival order, so the streak is the same as the synchronous path's
+    assert (student.total_sessions, student.current_streak) == (4, 4)
+    assert db_session.query(Mastery).one().total_attempts == 4
+    assert db_session.query(DailySession).count() == 4
+    assert db_session.query(Achievement).filter(Achievement.badge_key == "streak_3").count() == 1
+    assert _drain_outbox(db_session, 3) == {"applied": 0, "pending": 0, "oldest_enqueued_at": None}
+
+
+class _SyncRunner:
+    """Stands in for AsyncSessionLocal: runs the drain callable directly."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run_sync(self, fn, *args):
+        return fn(self, *args)
+
+
+def test_outbox_worker_tracks_lag_and_backlog(monkeypatch):
+    import asyncio
+
+    import app.event_outbox as event_outbox
+
+    queue = list(range(5))
+    enqueued_at = datetime(2026, 2, 19, 8, 0)
+
+    def drain(db, batch_size):
+        taken = queue[:batch_size]
+        del queue[:batch_size]
+        return {"applied": len(taken), "pending": len(queue), "oldest_enqueued_at": enqueued_at if queue else None}
+
+    worker = OutboxWorker(drain, batch_size=2, poll_seconds=0.01, max_pending=3)
+    assert worker.lag_seconds() == 0.0
+
+    worker.enqueued(5, enqueued_at)
+    assert worker.backlogged
+    assert worker.lag_seconds(enqueued_at + timedelta(seconds=30)) == 30.0
+
+    monkeypatch.setattr(event_outbox, "AsyncSessionLocal", _SyncRunner)
+    assert asyncio.run(worker.flush()) == 5
+    assert (worker.pending, worker.batches_total, worker.applied_total) == (0, 3, 5)
+    assert not worker.backlogged
+    assert worker.lag_seconds() == 0.0
+
+
+def _insert_conflicting_sessions(db):
+    # Stands in for a concurrent request inserting the same row first
+    for day in (19, 20):
+        db.add(DailySession(
+            id="dup", student_id="jon_zhao", session_date=date(2026, 2, day), started_at=datetime(2026, 2, day),
+            completed_questions=0, target_questions=10, is_completed=False,
+        ))
+    db.commit()
+
+
+def test_retry_on_conflict_reruns_the_write(db_session, seeded_students):
+    attempts = []
+
+    def write(db):
+        attempts.append(len(attempts))
+        if len(attempts) == 1:
+            _insert_conflicting_sessions(db)
+        return "ok"
+
+    assert _retry_on_conflict(db_session, write) == "ok"
+    assert attempts == [0, 1]
+    assert db_session.query(DailySession).count() == 0
+
+    try:
+        _retry_on_conflict(db_session, _insert_conflicting_sessions)
+        raise AssertionError("Expected IntegrityError after the last retry")
+    except IntegrityError:
+        pass
+
+
+def test_retry_on_conflict_raises_other_integrity_errors_at_once(db_session, seeded_students):
+    attempts = []
+
+    def write(db):
+        attempts.append(len(attempts))
+        # NOT NULL violation: retrying can't help
+        db.add(DailySession(id="broken", student_id="jon_zhao", session_date=date(2026, 2, 19)))
+        db.commit()
+
+    try:
+        _retry_on_conflict(db_session, write)
+        raise AssertionError("Expected IntegrityError")
+    except IntegrityError:
+        pass
+    assert attempts == [0]
+
+
+def test_create_event_through_async_session(tmp_path):
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.models.student import Base
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        AsyncTestingSession = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+        async with AsyncTestingSession() as db:
+            db.add(
+                Student(
+                    id="jon_zhao",
+                    name="Jon",
+                    year_level=4,
+                    created_at=datetime(2026, 2, 1),
+                )
+            )
+            await db.commit()
+
+            response = await create_event(event_data=_batch_event("async_1", 19, 0), db=db)
+            assert response == {"status": "success", "event_id": "async_1"}
+
+            student = await db.get(Student, "jon_zhao")
+            assert student.total_sessions == 1
+            assert student.current_streak == 1
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("dialect", ["sqlite", "postgresql"])
+def test_concurrent_events_for_one_student_lose_no_updates(request, tmp_path, make_item, dialect):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from sqlalchemy import create_engine, event
+    from sqlalchemy.orm import sessionmaker
+
+    from app.database import apply_sqlite_pragmas
+    from app.models.student import Base
+
+    if dialect == "sqlite":
+        engine = create_engine(f"sqlite:///{tmp_path / 'concurrent.db'}", connect_args={"check_same_thread": False})
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+    else:
+        engine = create_engine(request.getfixturevalue("postgres_url"))
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    TestingSession = sessionmaker(bind=engine, autoflush=False)
+    with TestingSession() as db:
+        db.add(Student(id="jon_zhao", name="Jon", year_level=4, created_at=datetime(2026, 2, 1),
+                       current_streak=0, longest_streak=0, total_sessions=0, target_daily_questions=10))
+        db.add(make_item("item_1", "yr4_mult_div_001", 1))
+        db.commit()
+
+    writers, per_writer = 8, 5
+
+    def post(writer):
+        events = [_batch_event(f"w{writer}_{n}", 19, writer * per_writer + n) for n in range(per_writer)]
+        with TestingSession() as db:
+            # Half the writers replay batches, the rest post one event at a time
+            if writer % 2:
+                _record_events_batch(db, events)
+            else:
+                for event_data in events:
+                    _record_event(db, event_data)
+
+    with ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(post, range(writers)))
+
+    total = writers * per_writer
+    with TestingSession() as db:
+        assert db.get(Student, "jon_zhao").total_sessions == total
+        assert db.query(DailySession).one().completed_questions == total
+        assert db.query(StudentDailyStats).one().events_total == total
+        assert db.query(Mastery).one().total_attempts == total
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
@@ -0,0 +1,131 @@
+import json
+from datetime import datetime
+
+from app.item_cache import item_cache
+from app.item_index import item_index
+from app.models import ContentPack, Item, Mastery
+from app.routers.items import _next_item_payload
+from app.routers.placement import start_placement_test
+
+
+def _seed_items(db_session, make_item):
+    items = [
+        make_item(f"{skill}_d{difficulty}_{n}", skill, difficulty)
+        for skill in ["skill_a", "skill_b"]
+        for difficulty in range(1, 6)
+        for n in range(3)
+    ]
+    db_session.add_all(items)
+    db_session.commit()
+    return items
+
+
+def test_item_index_buckets_and_refresh(db_session, make_item):
+    _seed_items(db_session, make_item)
+    item_index.rebuild(db_session)
+
+    assert len(item_index.item_ids(skill_id="skill_a", difficulty=2)) == 3
+    assert len(item_index.item_ids(skill_id="skill_b")) == 15
+    assert len(item_index.item_ids(difficulty=5)) == 6
+    assert item_index.choice(skill_id="missing") is None
+    assert sorted(item_index.sample(10, skill_id="skill_a", difficulty=1)) == [
+        "skill_a_d1_0", "skill_a_d1_1", "skill_a_d1_2",
+    ]
+
+    db_session.add(make_item("skill_c_d1_0", "skill_c", 1))
+    db_session.commit()
+    item_index.invalidate()
+    item_index.ensure_fresh(db_session)
+    assert item_index.item_ids(skill_id="skill_c") == ("skill_c_d1_0",)
+
+
+def test_next_item_uses_mastery_difficulty(db_session, seeded_students, make_item):
+    _seed_items(db_session, make_item)
+    db_session.add(
+        Mastery(
+            student_id="jon_zhao",
+            skill_id="skill_b",
+            total_attempts=10,
+            correct_attempts=6,
+            mastery_score=0.6,
+            last_updated=datetime.now(),
+        )
+    )
+    db_session.commit()
+
+    payload = json.loads(_next_item_payload(db_session, "jon_zhao", "skill_b"))
+    assert payload["skill_id"] == "skill_b"
+    assert payload["difficulty"] == 3
+    assert payload["parameters"] == {"a": 3}
+
+    fallback = _next_item_payload(db_session, "astrid_zhao", None)
+    assert json.loads(fallback)["difficulty"] == 1
+
+
+def test_placement_draws_two_items_per_difficulty(db_session, seeded_students, make_item):
+    _seed_items(db_session, make_item)
+
+    response = json.loads(start_placement_test(student_id="jon_zhao", year_level=4, db=db_session).body)
+    assert response["total_items"] == 10
+    assert [item["difficulty"] for item in response["items"]] == [1, 1, 2, 2, 3, 3, 4, 4, 5, 5]
+    assert len({item["item_id"] for item in response["items"]}) == 10
+
+
+def test_item_cache_counts_hits_and_invalidates_on_new_pack(db_session, make_item):
+    _seed_items(db_session, make_item)
+    item_index.ensure_fresh(db_session)
+    version = item_index.version
+
+    first = item_cache.get_many(db_session, ["skill_a_d1_0", "skill_a_d1_1", "unknown"], version)
+    assert len(first) == 2
+    assert json.loads(first[0])["item_id"] == "skill_a_d1_0"
+    assert item_cache.get(db_session, "skill_a_d1_0", version) == first[0]
+    assert item_cache.stats()["hits"] == 1
+    assert item_cache.stats()["misses"] == 3
+
+    db_session.add(ContentPack(version="pack:abc", source="pack.json", item_count=30, loaded_at=datetime.now()))
+    db_session.commit()
+    item_index.invalidate()
+    item_index.ensure_fresh(db_session)
+    assert item_index.version == "pack:abc"
+
+    item_cache.get(db_session, "skill_a_d1_0", item_index.version)
+    stats = item_cache.stats()
+    assert stats["version"] == "pack:abc"
+    assert stats["entries"] == 1
+    assert stats["misses"] == 4
+
+
+def test_concurrent_rebuilds_on_async_session_finish(tmp_path, make_item):
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.item_index import ItemIndex
+    from app.models.student import Base
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        AsyncTestingSession = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+        async with AsyncTestingSession() as db:
+            db.add_all(make_item(f"skill_a_d1_{n}", "skill_a", 1) for n in range(3))
+            await db.commit()
+
+        index = ItemIndex(refresh_interval=0)
+
+        async def rebuild():
+            async with AsyncTestingSession() as db:
+                await db.run_sync(index.rebuild)
+
+        # Each rebuild's queries yield to the loop while the other one is mid-rebuild
+        await asyncio.wait_for(asyncio.gather(rebuild(), rebuild(), rebuild()), timeout=10)
+        assert index.item_ids(skill_id="skill_a") == ("skill_a_d1_0", "skill_a_d1_1", "skill_a_d1_2")
+
+        index.invalidate()
+        await asyncio.wait_for(asyncio.gather(rebuild(), rebuild()), timeout=10)
+        assert index.is_loaded
+        await engine.dispose()
+
+    asyncio.run(scenario())
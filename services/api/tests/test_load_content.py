@@ -0,0 +1,69 @@
+import hashlib
+import json
+
+from app.models import Item
+from scripts.load_content import PackReader, load_items
+
+
+def _pack_items(count):
+    return [
+        {
+            "item_id": f"pack_item_{index}",
+            "skill_id": "yr3_frac_compare_001",
+            "question_text": f"Which is larger: {index}/7 or ½? ✓",
+            "question_type": "fraction",
+            "difficulty": 1 + index % 3,
+            "parameters": {"num1": index},
+            "correct_answer": f"{index}/7",
+            "hint": "Compare numerators",
+            "explanation": "",
+        }
+        for index in range(count)
+    ]
+
+
+def test_pack_reader_streams_json_array_and_jsonl_in_small_chunks(tmp_path):
+    items = _pack_items(25)
+    array_path = tmp_path / "pack.json"
+    array_path.write_text(json.dumps(items, indent=2, ensure_ascii=False), encoding="utf-8")
+    lines_path = tmp_path / "pack.jsonl"
+    lines_path.write_text("\n".join(json.dumps(item, ensure_ascii=False) for item in items) + "\n", encoding="utf-8")
+
+    # Tiny chunks force items and multi-byte characters across chunk boundaries
+    array_reader = PackReader(array_path, chunk_size=7)
+    assert list(array_reader) == items
+    assert list(PackReader(lines_path, chunk_size=5)) == items
+    # Version hashes the raw bytes, independent of chunking
+    digest = hashlib.sha256(array_path.read_bytes()).hexdigest()[:12]
+    assert array_reader.version == f"pack:{digest}"
+
+
+def test_load_items_batches_skip_and_update_existing(db_session):
+    items = _pack_items(7)
+    first = load_items(db_session, items[:4], batch_size=3)
+    assert first == {"seen": 4, "added": 4, "updated": 0, "skipped": 0, "repeated": 0}
+
+    # items[4] is repeated in a later batch than the one that added it
+    second = load_items(db_session, items + [items[0], items[4]], batch_size=3)
+    assert second == {"seen": 9, "added": 3, "updated": 0, "skipped": 4, "repeated": 2}
+    assert db_session.query(Item).count() == 7
+    assert db_session.get(Item, "pack_item_0").validation_rule == "exact_match"
+
+    items[1]["hint"] = "Look at the top numbers"
+    updated = load_items(db_session, items[:2], batch_size=10, update_existing=True)
+    assert updated["updated"] == 2
+    db_session.expire_all()
+    assert db_session.get(Item, "pack_item_1").hint == "Look at the top numbers"
+
+    # A repeated id is written over by its later copy but counted once, whether
+    # it was new or already in the database
+    new_item = _pack_items(9)[8]
+    repeated = [
+        _pack_items(9)[7], new_item, {**new_item, "hint": "Second copy"},
+        {**items[2], "hint": "First copy"}, {**items[2], "hint": "Second copy"},
+    ]
+    counts = load_items(db_session, repeated, batch_size=10, update_existing=True)
+    assert counts == {"seen": 5, "added": 2, "updated": 1, "skipped": 0, "repeated": 2}
+    db_session.expire_all()
+    assert db_session.get(Item, "pack_item_2").hint == "Second copy"
+    assert db_session.get(Item, "pack_item_8").hint == "Second copy"
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.config import settings
+from app.mastery_engine import BKTEngine, EloEngine, MasteryEngine, RatioEngine, get_mastery_engine
+from app.models import Event, Item, Mastery, ReviewSchedule
+from scripts.rebuild_mastery import rebuild_mastery
+
+
+def _new_mastery(at):
+    return Mastery(
+        student_id="jon_zhao",
+        skill_id="yr4_mult_div_001",
+        total_attempts=0,
+        correct_attempts=0,
+        mastery_score=0.0,
+        last_updated=at,
+    )
+
+
+def test_bkt_update_moves_with_evidence_and_decays_on_read():
+    engine = BKTEngine(half_life_days=10)
+    start = datetime(2026, 2, 1, 8, 0)
+    mastery = _new_mastery(start)
+
+    engine.update(mastery, True, 2, start)
+    after_correct = mastery.mastery_score
+    assert after_correct > engine.p_init
+
+    engine.update(mastery, False, 2, start + timedelta(minutes=1))
+    assert mastery.mastery_score < after_correct
+    assert (mastery.total_attempts, mastery.correct_attempts) == (2, 1)
+
+    for minute in range(2, 12):
+        engine.update(mastery, True, 2, start + timedelta(minutes=minute))
+    fresh = engine.current_score(mastery, mastery.last_updated)
+    assert fresh > 0.9
+
+    # One half-life later the score is halfway back to the prior
+    decayed = engine.current_score(mastery, mastery.last_updated + timedelta(days=10))
+    assert abs(decayed - (engine.p_init + (fresh - engine.p_init) / 2)) < 1e-9
+
+
+def test_elo_rewards_hard_items_more_and_ratio_matches_legacy():
+    at = datetime(2026, 2, 1, 8, 0)
+    elo = EloEngine()
+    easy = _new_mastery(at)
+    hard = _new_mastery(at)
+    elo.update(easy, True, 1, at)
+    elo.update(hard, True, 5, at)
+    assert hard.mastery_score > easy.mastery_score > 0.5
+
+    ratio = RatioEngine()
+    mastery = _new_mastery(at)
+    for is_correct in [True, False, True, True]:
+        ratio.update(mastery, is_correct, 3, at)
+    assert mastery.mastery_score == 0.75
+    assert ratio.current_score(mastery, at + timedelta(days=365)) == 0.75
+
+
+def test_late_answer_never_moves_last_updated_backwards():
+    engine = BKTEngine(half_life_days=10)
+    start = datetime(2026, 2, 10, 8, 0)
+    mastery = _new_mastery(start)
+    engine.update(mastery, True, 2, start)
+    before = mastery.model_state
+
+    # Answered offline two days earlier, synced now
+    engine.update(mastery, False, 2, start - timedelta(days=2))
+
+    assert mastery.last_updated == start
+    assert mastery.model_state == engine.observe(before, False, 2, mastery)
+    assert mastery.total_attempts == 2
+    with pytest.raises(TypeError):
+        MasteryEngine()
+
+
+def test_default_engine_needs_enough_answers_before_a_skill_counts_as_mastered():
+    engine = get_mastery_engine()
+    at = datetime(2026, 2, 1, 8, 0)
+    mastery = _new_mastery(at)
+
+    for minute in range(2):
+        engine.update(mastery, True, 3, at + timedelta(minutes=minute))
+    # Two lucky answers already score above the threshold, but don't count yet
+    assert engine.current_score(mastery, mastery.last_updated) >= settings.skill_mastery_threshold
+    assert not engine.is_mastered(mastery, mastery.last_updated)
+
+    for minute in range(2, settings.skill_mastery_min_attempts):
+        engine.update(mastery, True, 3, at + timedelta(minutes=minute))
+    assert mastery.total_attempts == settings.skill_mastery_min_attempts
+    assert engine.is_mastered(mastery, mastery.last_updated)
+
+    # A mastered skill lapses again once decay takes the score below the threshold
+    assert not engine.is_mastered(mastery, mastery.last_updated + timedelta(days=365))
+
+
+def test_rebuild_mastery_replays_events(db_session, seeded_students):
+    db_session.add(
+        Item(
+            id="item_1",
+            skill_id="yr4_mult_div_001",
+            question_text="What is 3 × 4?",
+            question_type="numeric",
+            difficulty=2,
+            parameters={"a": 3, "b": 4},
+            correct_answer="12",
+            hint=None,
+            explanation="3 × 4 = 12",
+            validation_rule="numeric",
+        )
+    )
+    db_session.add(_new_mastery(datetime(2020, 1, 1)))
+    start = datetime(2026, 2, 1, 8, 0)
+    for index, is_correct in enumerate([True, True, False, True]):
+        db_session.add(
+            Event(
+                id=f"e{index}",
+                student_id="astrid_zhao",
+                item_id="item_1",
+                answer_given="12",
+                is_correct=is_correct,
+                time_spent=5.0,
+                hint_requested=False,
+                timestamp=start + timedelta(minutes=index),
+            )
+        )
+    db_session.commit()
+
+    stats = rebuild_mastery(db_session, "ratio")
+    db_session.commit()
+
+    assert stats == {"events": 4, "rows": 1}
+    rows = db_session.query(Mastery).all()
+    assert len(rows) == 1
+    assert rows[0].student_id == "astrid_zhao"
+    assert (rows[0].total_attempts, rows[0].correct_attempts) == (4, 3)
+    assert rows[0].model == "ratio"
+    assert rows[0].last_updated == start + timedelta(minutes=3)
+    # The lapse at minute 2 restarts the SM-2 run; the final correct answer is early practice
+    schedule = db_session.query(ReviewSchedule).one()
+    assert (schedule.repetitions, schedule.due_at) == (0, start + timedelta(days=1, minutes=2))
@@ -0,0 +1,54 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.metrics import MetricsMiddleware, MetricsRegistry, instrument_engine
+
+
+def test_middleware_counts_queries_per_route_and_sets_server_timing():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    registry = MetricsRegistry()
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    # Plain def, so the queries run in the threadpool like the sync routers
+    @app.get("/students/{student_id}")
+    def read_student(student_id: str, db=Depends(get_db)):
+        if student_id == "ava":
+            # A failing statement is counted once and leaves no timing state behind
+            with pytest.raises(OperationalError):
+                db.execute(text("SELECT * FROM missing_table"))
+            db.rollback()
+        db.execute(text("SELECT 1"))
+        db.execute(text("SELECT 2"))
+        return {"id": student_id}
+
+    async def exercise():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            first = await client.get("/students/ava")
+            await client.get("/students/ben")
+            return first
+
+    response = asyncio.run(exercise())
+    assert response.status_code == 200
+    assert 'desc="3 queries"' in response.headers["server-timing"]
+
+    exposition = registry.render_prometheus()
+    labels = 'method="GET",route="/students/{student_id}",status="200"'
+    assert f"mathcoach_http_request_duration_seconds_count{{{labels}}} 2" in exposition
+    assert f"mathcoach_db_queries_per_request_sum{{{labels}}} 5" in exposition
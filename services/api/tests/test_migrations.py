@@ -0,0 +1,216 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.badges import badge_mask_for
+from app.event_store import seal_cold_months
+from app.migrations import (
+    HEAD_VERSION,
+    MIGRATIONS,
+    _add_composite_indexes,
+    _create_missing_tables,
+    current_version,
+    invalid_indexes,
+    migrate,
+    pending_migrations,
+)
+from app.models import Achievement, DailySession, Event, EventId, Item, SchemaVersion, Student, StudentDailyStats
+from app.models.student import Base
+
+DAY = date(2026, 2, 19)
+
+
+def test_empty_database_is_created_at_latest_version(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    assert current_version(engine) is None
+    assert migrate(engine, dry_run=True) == MIGRATIONS
+    assert current_version(engine) is None
+
+    assert migrate(engine) == MIGRATIONS
+    assert current_version(engine) == HEAD_VERSION
+    assert set(Base.metadata.tables) <= set(inspect(engine).get_table_names())
+    assert pending_migrations(engine) == [] and migrate(engine) == []
+    engine.dispose()
+
+
+def test_unversioned_database_is_upgraded_in_place(tmp_path, make_item):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Roll back to a database from before versioned migrations, with the duplicates it allowed
+        conn.exec_driver_sql("DROP TABLE schema_version")
+        conn.exec_driver_sql("DROP TABLE student_daily_stats")
+        conn.exec_driver_sql("DROP TABLE event_ids")
+        for name in ("ix_events_student_timestamp", "ix_items_skill_difficulty",
+                     "uq_daily_sessions_student_date", "uq_achievements_student_badge"):
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+        conn.exec_driver_sql("CREATE INDEX ix_events_student_id ON events (student_id)")
+        conn.exec_driver_sql("CREATE INDEX ix_achievements_student_id ON achievements (student_id)")
+
+        at = datetime.combine(DAY, datetime.min.time()) + timedelta(hours=8)
+        conn.execute(Student.__table__.insert(), [
+            {"id": f"student_{n}", "name": f"S{n}", "year_level": 4, "created_at": at, "current_streak": 0,
+             "longest_streak": 0, "total_sessions": 0, "target_daily_questions": 10}
+            for n in range(3)
+        ])
+        conn.execute(Item.__table__.insert(), [
+            {column.name: getattr(make_item("item_1", "yr4_mult_div_001", 2), column.name)
+             for column in Item.__table__.columns}
+        ])
+        conn.execute(DailySession.__table__.insert(), [
+            {"id": "a", "student_id": "student_0", "session_date": DAY, "started_at": at,
+             "completed_questions": 6, "target_questions": 10, "is_completed": False},
+            {"id": "b", "student_id": "student_0", "session_date": DAY, "started_at": at + timedelta(minutes=1),
+             "completed_questions": 5, "target_questions": 10, "is_completed": False},
+        ])
+        conn.execute(Achievement.__table__.insert(), [
+            {"id": "x", "student_id": "student_0", "badge_key": "streak_3", "title": "t", "description": "d",
+             "unlocked_at": at},
+            {"id": "y", "student_id": "student_0", "badge_key": "streak_3", "title": "t", "description": "d",
+             "unlocked_at": at + timedelta(days=1)},
+            {"id": "z", "student_id": "student_1", "badge_key": "daily_goal_1", "title": "t", "description": "d",
+             "unlocked_at": at},
+        ])
+        conn.execute(Event.__table__.insert(), [
+            {"id": f"e{n}", "student_id": f"student_{n % 2}", "item_id": "item_1", "answer_given": "1",
+             "is_correct": n != 3, "time_spent": 5.0, "hint_requested": False,
+             "timestamp": at + timedelta(days=n // 2)}
+            for n in range(5)
+        ])
+        for column in ("badge_mask", "avatar"):
+            conn.exec_driver_sql(f"ALTER TABLE students DROP COLUMN {column}")
+        conn.exec_driver_sql("ALTER TABLE mastery DROP COLUMN model_state")
+        conn.exec_driver_sql("DROP INDEX ix_events_received_at")
+        conn.exec_driver_sql("ALTER TABLE events DROP COLUMN received_at")
+
+    assert current_version(engine) is None
+    applied = migrate(engine)
+
+    assert [migration.version for migration in applied] == list(range(1, HEAD_VERSION + 1))
+    assert current_version(engine) == HEAD_VERSION
+    inspector = inspect(engine)
+    assert {"badge_mask", "avatar"} <= {column["name"] for column in inspector.get_columns("students")}
+    assert "model_state" in {column["name"] for column in inspector.get_columns("mastery")}
+    event_indexes = {index["name"] for index in inspector.get_indexes("events")}
+    assert "ix_events_student_timestamp" in event_indexes and "ix_events_student_id" not in event_indexes
+    assert "ix_events_received_at" in event_indexes
+
+    db = sessionmaker(bind=engine)()
+    assert sorted(db.scalars(select(EventId.id))) == ["e0", "e1", "e2", "e3", "e4"]
+    session = db.query(DailySession).one()
+    assert (session.id, session.completed_questions, session.is_completed) == ("a", 11, True)
+    assert sorted(row.id for row in db.query(Achievement)) == ["x", "z"]
+    masks = {student.id: student.badge_mask for student in db.query(Student)}
+    assert masks == {
+        "student_0": badge_mask_for(["streak_3"]),
+        "student_1": badge_mask_for(["daily_goal_1"]),
+        "student_2": 0,
+    }
+    rollups = {
+        (row.student_id, row.stat_date): (row.events_total, row.correct_total, row.skill_counts)
+        for row in db.query(StudentDailyStats)
+    }
+    assert rollups == {
+        ("student_0", DAY): (1, 1, {"yr4_mult_div_001": [1, 1]}),
+        ("student_0", DAY + timedelta(days=1)): (1, 1, {"yr4_mult_div_001": [1, 1]}),
+        ("student_0", DAY + timedelta(days=2)): (1, 1, {"yr4_mult_div_001": [1, 1]}),
+        ("student_1", DAY): (1, 1, {"yr4_mult_div_001": [1, 1]}),
+        ("student_1", DAY + timedelta(days=1)): (1, 0, {"yr4_mult_div_001": [1, 0]}),
+    }
+    db.close()
+
+    assert migrate(engine) == []
+    engine.dispose()
+
+
+def test_first_migration_creates_the_frozen_version_1_tables(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'v1.db'}")
+    with engine.begin() as conn:
+        _create_missing_tables(conn)
+    inspector = inspect(engine)
+    # Tables and columns added by later migrations are left to them
+    assert "event_ids" not in inspector.get_table_names()
+    assert "event_partitions" not in inspector.get_table_names()
+    assert "received_at" not in {column["name"] for column in inspector.get_columns("events")}
+
+    # ...which then bring the version 1 tables up to the models
+    with engine.begin() as conn:
+        conn.execute(Student.__table__.insert(), [{"id": "student_0", "name": "S0", "year_level": 4,
+                                                   "created_at": datetime(2026, 2, 1)}])
+    migrate(engine)
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        assert {column.name for column in table.columns} == {
+            column["name"] for column in inspector.get_columns(table.name)
+        }, table.name
+    engine.dispose()
+
+
+def test_daily_stats_backfill_reads_sealed_shards(tmp_path, make_item):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sharded.db'}")
+    migrate(engine)
+    cold = datetime(2025, 6, 10, 8, 0)
+    with engine.begin() as conn:
+        conn.execute(Student.__table__.insert(), [{"id": "student_0", "name": "S0", "year_level": 4,
+                                                   "created_at": cold}])
+        item = make_item("item_1", "yr4_mult_div_001", 2)
+        conn.execute(Item.__table__.insert(), [{column.name: getattr(item, column.name)
+                                                for column in Item.__table__.columns}])
+        conn.execute(Event.__table__.insert(), [
+            {"id": f"e{n}", "student_id": "student_0", "item_id": "item_1", "answer_given": "1",
+             "is_correct": True, "time_spent": 5.0, "hint_requested": False, "timestamp": at, "received_at": at}
+            for n, at in enumerate([cold, cold + timedelta(minutes=1), datetime.now()])
+        ])
+    assert seal_cold_months(engine) == [(date(2025, 6, 1), 2)]
+
+    # Replay migration 6 onwards on the sharded database
+    with engine.begin() as conn:
+        conn.execute(SchemaVersion.__table__.delete().where(SchemaVersion.__table__.c.version >= 6))
+    assert [migration.version for migration in migrate(engine)] == list(range(6, HEAD_VERSION + 1))
+
+    with engine.connect() as conn:
+        totals = dict(conn.execute(select(StudentDailyStats.stat_date, StudentDailyStats.events_total)).all())
+    assert totals == {cold.date(): 2, date.today(): 1}
+    engine.dispose()
+
+
+def test_invalid_unique_index_is_dropped_and_rebuilt(postgres_url):
+    engine = create_engine(postgres_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    at = datetime.combine(DAY, datetime.min.time())
+    try:
+        with engine.connect() as conn:
+            conn.execution_options(isolation_level="AUTOCOMMIT")
+            conn.exec_driver_sql("DROP INDEX uq_achievements_student_badge")
+            conn.execute(Student.__table__.insert(), [{
+                "id": "student_0", "name": "S0", "year_level": 4, "created_at": at, "current_streak": 0,
+                "longest_streak": 0, "total_sessions": 0, "target_daily_questions": 10,
+            }])
+            conn.execute(Achievement.__table__.insert(), [
+                {"id": badge_id, "student_id": "student_0", "badge_key": "streak_3", "title": "t",
+                 "description": "d", "unlocked_at": at}
+                for badge_id in ("x", "y")
+            ])
+            # A build that failed on a duplicate leaves the index behind, invalid
+            with pytest.raises(IntegrityError):
+                conn.exec_driver_sql(
+                    "CREATE UNIQUE INDEX CONCURRENTLY uq_achievements_student_badge "
+                    "ON achievements (student_id, badge_key)"
+                )
+            assert invalid_indexes(conn) == {"uq_achievements_student_badge"}
+
+        with engine.connect() as conn:
+            _add_composite_indexes(conn)
+            assert invalid_indexes(conn) == set()
+            assert "uq_achievements_student_badge" in {
+                index["name"] for index in inspect(conn).get_indexes("achievements")
+            }
+            assert conn.execute(select(Achievement.__table__.c.id)).scalars().all() == ["x"]
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+import pack_io
+from generate_items import generate_all_items
+from pack_io import PACK_FORMATS, PackReader, open_pack_writer, pack_path_for
+
+
+def _items():
+    return [
+        {
+            "item_id": f"item_{index}",
+            "skill_id": "yr4_mult_div_001" if index % 2 else "yr3_frac_compare_001",
+            "question_text": f"What is {index} × 3? ✓",
+            "question_type": "numeric",
+            "difficulty": 3 - index % 3,
+            # Parameter keys differ between rows, so columnar packs store them per row
+            "parameters": {"a": index, "b": 3} if index % 4 else {"b": 3, "a": index},
+            "correct_answer": str(index * 3),
+            "hint": None,
+        }
+        for index in sorted(range(8), key=lambda index: index % 2)
+    ]
+
+
+@pytest.mark.parametrize("fmt", PACK_FORMATS)
+def test_every_format_round_trips_items_in_order(tmp_path, fmt):
+    items = _items()
+    writer = open_pack_writer(fmt, tmp_path / "pack.json")
+    for item in items:
+        writer.write(item)
+    writer.close()
+
+    path = pack_path_for(tmp_path / "pack.json", fmt)
+    assert writer.path == path
+    reader = PackReader(path, chunk_size=16)
+    assert list(reader) == items
+    assert reader.version.startswith("pack:")
+    assert [item for batch in PackReader(path).batches(3) for item in batch] == items
+
+
+def test_json_array_writer_matches_json_dump(tmp_path):
+    writer = open_pack_writer("json", tmp_path / "pack.json")
+    for item in _items():
+        writer.write(item)
+    writer.close()
+    assert (tmp_path / "pack.json").read_text() == json.dumps(_items(), indent=2)
+
+
+def test_skills_filter_reads_only_the_requested_skill_files(tmp_path):
+    output = tmp_path / "pack.json"
+    generate_all_items(output_path=str(output), items_per_difficulty=2, formats=PACK_FORMATS)
+    wanted = ["yr4_mult_div_001"]
+    expected = [item for item in PackReader(output) if item["skill_id"] in wanted]
+    assert expected
+
+    for fmt in ("json", "jsonl"):
+        assert list(PackReader(pack_path_for(output, fmt), skills=wanted)) == expected
+
+    # Only the requested skill's file is opened
+    columnar = pack_path_for(output, "columnar")
+    for path in columnar.glob("*.json"):
+        if path.name not in ("index.json", "yr4_mult_div_001.json"):
+            path.unlink()
+    reader = PackReader(columnar / "index.json", skills=wanted)
+    assert list(reader) == expected
+    assert [entry["count"] for entry in reader.index["skills"] if entry["skill_id"] in wanted] == [len(expected)]
+    with pytest.raises(KeyError):
+        reader.read_skill("no_such_skill")
+
+
+def test_malformed_json_array_fails_without_buffering_the_rest(tmp_path, monkeypatch):
+    monkeypatch.setattr(pack_io, "MAX_ITEM_CHARS", 64)
+    path = tmp_path / "pack.json"
+    path.write_text("[\n" + '{"item_id": "ok"},\n{"item_id": oops},\n' + '{"item_id": "x"},\n' * 10000 + "]")
+
+    read = []
+
+    class CountingReader(PackReader):
+        def _chunks(self, handle):
+            for raw in super()._chunks(handle):
+                read.append(len(raw))
+                yield raw
+
+    reader = CountingReader(path, chunk_size=16)
+    rows = iter(reader)
+    assert next(rows) == {"item_id": "ok"}
+    with pytest.raises(ValueError, match="malformed"):
+        next(rows)
+    assert sum(read) < 200
+
+    path.write_text('[{"item_id": "ok"}, {"item_id": "cut')
+    with pytest.raises(ValueError, match="Truncated"):
+        list(PackReader(path, chunk_size=16))
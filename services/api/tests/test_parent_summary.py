@@ -1,7 +1,15 @@
 from datetime import date, datetime, timedelta
 
-from app.models import Achievement, DailySession, Event, Student
-from app.routers.parent import _build_student_daily_summary, _build_student_weekly_summary
+from sqlalchemy import event
+
+from app.models import Achievement, DailySession, Event, Item, Student
+from app.routers.parent import (
+    _build_student_daily_summary,
+    _build_student_weekly_summary,
+    _daily_summary_rows,
+    _serialize_daily_summary,
+)
+from scripts.backfill_daily_stats import rebuild_daily_stats
 
 
 def test_daily_summary_metrics(db_session, seeded_students):
@@ -146,6 +154,24 @@ def test_weekly_summary_metrics(db_session, seeded_students):
             ),
         ]
     )
+    db_session.add(
+        Item(
+            id="item_1",
+            skill_id="yr4_mult_div_001",
+            question_text="What is 1 × 1?",
+            question_type="numeric",
+            difficulty=1,
+            parameters={"a": 1, "b": 1},
+            correct_answer="1",
+            hint=None,
+            explanation="1 × 1 = 1",
+            validation_rule="numeric",
+        )
+    )
+    db_session.commit()
+
+    # Weekly summaries read the daily rollup, so build it from the raw events.
+    assert rebuild_daily_stats(db_session) == {"events": 3, "rows": 3}
     db_session.commit()
 
     summary = _build_student_weekly_summary(db_session, student, start_day, end_day)
@@ -155,3 +181,54 @@ def test_weekly_summary_metrics(db_session, seeded_students):
     assert summary["accuracy_percent"] == 66.7
     assert summary["current_streak"] == 4
     assert summary["longest_streak"] == 6
+    assert summary["active_days"] == 3
+    assert summary["hints_used"] == 1
+    assert summary["skills"] == {
+        "yr4_mult_div_001": {"attempts": 1, "correct": 1, "accuracy_percent": 100.0}
+    }
+
+
+def test_daily_summary_for_all_students_is_one_query(db_session, seeded_students):
+    today = date(2026, 2, 19)
+    for index in range(4):
+        db_session.add(
+            Event(
+                id=f"ae{index}",
+                student_id="astrid_zhao",
+                item_id="item_1",
+                answer_given="4",
+                is_correct=index % 2 == 0,
+                time_spent=4.0 + index,
+                hint_requested=False,
+                timestamp=datetime(2026, 2, 19, 9, index),
+            )
+        )
+    db_session.add(
+        Event(
+            id="yesterday",
+            student_id="jon_zhao",
+            item_id="item_1",
+            answer_given="4",
+            is_correct=True,
+            time_spent=3.0,
+            hint_requested=False,
+            timestamp=datetime(2026, 2, 18, 9, 0),
+        )
+    )
+    db_session.commit()
+
+    statements = []
+    event.listen(db_session.bind, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    rows = _daily_summary_rows(db_session, today)
+    assert len(statements) == 1
+
+    summaries = [_serialize_daily_summary(row, today) for row in rows]
+    assert [summary["student_id"] for summary in summaries] == ["astrid_zhao", "jon_zhao"]
+    astrid, jon = summaries
+    assert astrid["events_total"] == 4
+    assert astrid["correct_answers"] == 2
+    assert astrid["average_time_spent_seconds"] == 5.5
+    assert astrid["badge_count"] == 0
+    assert jon["events_total"] == 0
+    assert jon["accuracy_percent"] == 0.0
+    assert jon["target_questions"] == 10
@@ -0,0 +1,165 @@
+import re
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.event_dedup import recent_event_ids
+from app.item_cache import item_cache
+from app.item_index import item_index
+from app.models import Achievement, DailySession, Event, Mastery, Student, StudentDailyStats
+from app.models.student import Base
+from app.review_scheduler import due_skill_ids, new_schedule
+from app.routers.achievements import get_achievements
+from app.routers.daily_sessions import _plan_daily_set
+from app.routers.events import _drain_outbox, _record_event, _record_events_batch
+from app.routers.items import _next_item_payload
+from app.routers.mastery import get_mastery
+from app.routers.parent import _build_range_summaries, _build_student_daily_summary
+
+# Tables that grow with usage; a hot path must never read one of these in full
+HOT_TABLES = {
+    "events", "items", "daily_sessions", "achievements", "mastery", "review_schedule", "student_daily_stats",
+}
+SKILLS = ["yr3_frac_compare_001", "yr4_frac_equiv_001", "yr4_mult_div_001"]
+DAY = date(2026, 2, 19)
+
+
+@pytest.fixture(params=["sqlite", "postgresql"])
+def plan_engine(request, tmp_path):
+    if request.param == "sqlite":
+        engine = create_engine(f"sqlite:///{tmp_path / 'plans.db'}")
+    else:
+        engine = create_engine(request.getfixturevalue("postgres_url"))
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    item_index.invalidate()
+    item_cache.clear()
+    recent_event_ids.clear()
+    try:
+        yield engine
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+@pytest.fixture()
+def plan_db(plan_engine, make_item):
+    db = sessionmaker(bind=plan_engine, autoflush=False)()
+    at = datetime.combine(DAY, datetime.min.time()) + timedelta(hours=8)
+    db.add_all(
+        Student(id=f"student_{n}", name=f"S{n}", year_level=4, created_at=at, current_streak=0,
+                longest_streak=0, total_sessions=0, target_daily_questions=10)
+        for n in range(20)
+    )
+    db.add_all(
+        make_item(f"{skill}_d{difficulty}_{n}", skill, difficulty)
+        for skill in SKILLS
+        for difficulty in range(1, 6)
+        for n in range(5)
+    )
+    db.flush()
+    for n in range(20):
+        student_id = f"student_{n}"
+        db.add(Mastery(student_id=student_id, skill_id=SKILLS[0], total_attempts=5, correct_attempts=4,
+                       mastery_score=0.85, last_updated=at))
+        db.add(new_schedule(student_id, SKILLS[0], at))
+        db.add(DailySession(id=f"session_{n}", student_id=student_id, session_date=DAY, started_at=at,
+                            completed_questions=3, target_questions=10, is_completed=False))
+        db.add(StudentDailyStats(student_id=student_id, stat_date=DAY, events_total=3, correct_total=2,
+                                 time_spent_total=30.0, hints_total=0, skill_counts={}))
+        db.add(Achievement(id=f"badge_{n}", student_id=student_id, badge_key="streak_3", title="t",
+                           description="d", unlocked_at=at))
+        db.add_all(
+            Event(id=f"seed_{n}_{k}", student_id=student_id, item_id=f"{SKILLS[0]}_d1_{k}", answer_given="1",
+                  is_correct=True, time_spent=5.0, hint_requested=False, timestamp=at + timedelta(minutes=k))
+            for k in range(3)
+        )
+    db.commit()
+    item_index.rebuild(db)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _event(event_id, student_id="student_0", minute=0):
+    return {
+        "event_id": event_id,
+        "student_id": student_id,
+        "item_id": f"{SKILLS[1]}_d2_0",
+        "answer_given": "1",
+        "is_correct": True,
+        "time_spent": 4.0,
+        "timestamp": (datetime.combine(DAY, datetime.min.time()) + timedelta(hours=9, minutes=minute)).isoformat(),
+    }
+
+
+def _captured_statements(db, action):
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        action()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+
+def _full_scans(db, statement, parameters) -> list:
+    """Hot tables the plan reads in full (SQLite SCAN, Postgres Seq Scan)."""
+    with db.get_bind().connect() as conn:
+        if conn.dialect.name == "sqlite":
+            plan = [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+            pattern = re.compile(r"^SCAN (\w+)")
+        else:
+            # Tiny test tables make a seq scan cheapest; only fail when no index is usable at all
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            plan = [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)]
+            pattern = re.compile(r"Seq Scan on (\w+)")
+    tables = [match.group(1) for line in plan for match in [pattern.search(line.strip())] if match]
+    return [table for table in tables if table in HOT_TABLES]
+
+
+HOT_PATHS = {
+    "next_item_for_skill": lambda db: _next_item_payload(db, "student_1", SKILLS[1]),
+    "next_item_auto": lambda db: _next_item_payload(db, "student_1", None),
+    "daily_set": lambda db: _plan_daily_set(db, "student_2", 10),
+    "due_reviews": lambda db: due_skill_ids(db, "student_3", datetime(2026, 3, 1)),
+    "record_event": lambda db: _record_event(db, _event("plan_single")),
+    "record_event_duplicate": lambda db: (_record_event(db, _event("plan_dup")), recent_event_ids.clear(),
+                                          _record_event(db, _event("plan_dup"))),
+    "record_events_batch": lambda db: _record_events_batch(
+        db, [_event(f"plan_batch_{n}", f"student_{n}", n) for n in range(5)]
+    ),
+    "write_behind_drain": lambda db: (_record_event(db, _event("plan_queued"), defer=True), _drain_outbox(db, 50)),
+    "mastery": lambda db: get_mastery("student_4", db),
+    "achievements": lambda db: get_achievements("student_5", db),
+    "parent_daily_summary_for_student": lambda db: _build_student_daily_summary(
+        db, db.get(Student, "student_6"), DAY
+    ),
+    "parent_range_summary": lambda db: _build_range_summaries(
+        db, [db.get(Student, "student_7"), db.get(Student, "student_8")], DAY - timedelta(days=6), DAY
+    ),
+}
+
+
+@pytest.mark.parametrize("path", sorted(HOT_PATHS))
+def test_hot_path_queries_use_indexes(plan_db, path):
+    statements = _captured_statements(plan_db, lambda: HOT_PATHS[path](plan_db))
+    assert statements, f"{path} issued no queries"
+
+    scans = {
+        statement: tables
+        for statement, parameters in statements
+        for tables in [_full_scans(plan_db, statement, parameters)]
+        if tables
+    }
+    assert not scans, f"{path} reads whole tables: {scans}"
+
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from app.models import ReviewSchedule
+from app.review_scheduler import answer_quality, due_skill_ids, new_schedule, schedule_review
+from app.routers.events import _record_events_batch
+
+
+def test_schedule_review_follows_sm2_intervals():
+    start = datetime(2026, 2, 1, 8, 0)
+    schedule = new_schedule("jon_zhao", "yr4_mult_div_001", start)
+
+    schedule_review(schedule, answer_quality(True), start)
+    assert (schedule.repetitions, schedule.interval_days) == (1, 1.0)
+    assert schedule.due_at == start + timedelta(days=1)
+
+    # Extra practice before the due date leaves the schedule alone
+    schedule_review(schedule, answer_quality(True), start + timedelta(hours=1))
+    assert schedule.due_at == start + timedelta(days=1)
+
+    schedule_review(schedule, answer_quality(True), start + timedelta(days=1))
+    assert (schedule.repetitions, schedule.interval_days) == (2, 6.0)
+    schedule_review(schedule, answer_quality(True), start + timedelta(days=7))
+    assert schedule.repetitions == 3
+    assert schedule.interval_days == 6.0 * schedule.ease_factor
+
+    # A lapse resets the run and lowers the ease factor
+    ease = schedule.ease_factor
+    schedule_review(schedule, answer_quality(False), start + timedelta(days=8))
+    assert (schedule.repetitions, schedule.interval_days) == (0, 1.0)
+    assert schedule.ease_factor < ease
+    assert schedule.due_at == start + timedelta(days=9)
+
+
+def test_event_batch_maintains_review_schedule(db_session, seeded_students, seeded_item):
+    events = [
+        {
+            "event_id": f"r{day}",
+            "student_id": "jon_zhao",
+            "item_id": "item_1",
+            "answer_given": "4",
+            "is_correct": True,
+            "time_spent": 5.0,
+            "timestamp": datetime(2026, 2, day, 8, 0).isoformat(),
+        }
+        for day in (1, 2)
+    ]
+    _record_events_batch(db_session, events)
+
+    schedule = db_session.query(ReviewSchedule).one()
+    assert (schedule.student_id, schedule.skill_id) == ("jon_zhao", "yr4_mult_div_001")
+    assert schedule.repetitions == 2
+    assert schedule.due_at == datetime(2026, 2, 8, 8, 0)
+    assert due_skill_ids(db_session, "jon_zhao", datetime(2026, 2, 7)) == []
+    assert due_skill_ids(db_session, "jon_zhao", datetime(2026, 2, 8, 9, 0)) == ["yr4_mult_div_001"]
+
+
+def test_due_skill_ids_orders_by_due_date_with_index_scan(db_session, seeded_students):
+    now = datetime(2026, 3, 1)
+    db_session.add_all([
+        new_schedule("jon_zhao", "later", now - timedelta(days=1)),
+        new_schedule("jon_zhao", "overdue", now - timedelta(days=5)),
+        new_schedule("jon_zhao", "future", now + timedelta(days=2)),
+        new_schedule("astrid_zhao", "other_student", now - timedelta(days=9)),
+    ])
+    db_session.commit()
+
+    assert due_skill_ids(db_session, "jon_zhao", now) == ["overdue", "later"]
+
+    plan = db_session.execute(
+        text(
+            "EXPLAIN QUERY PLAN SELECT skill_id FROM review_schedule "
+            "WHERE student_id = :student_id AND due_at <= :before ORDER BY due_at"
+        ),
+        {"student_id": "jon_zhao", "before": now},
+    ).all()
+    detail = " ".join(row[-1] for row in plan)
+    assert "COVERING INDEX ix_review_schedule_student_due" in detail
+    assert "TEMP B-TREE" not in detail
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta
+
+from app.item_index import item_index
+from app.models import Event, Mastery
+from app.review_scheduler import new_schedule
+from app.routers.daily_sessions import _plan_daily_set
+from app.session_planner import _split_slots
+
+SKILLS = ["yr3_frac_compare_001", "yr4_frac_equiv_001", "yr4_mult_div_001", "yr5_frac_add_001"]
+
+
+def _mastery(skill_id, score, days_ago=0):
+    return Mastery(
+        student_id="jon_zhao",
+        skill_id=skill_id,
+        total_attempts=10,
+        correct_attempts=int(score * 10),
+        mastery_score=score,
+        last_updated=datetime.now() - timedelta(days=days_ago),
+    )
+
+
+def test_split_slots_redistributes_empty_buckets():
+    assert _split_slots(10, {"weak": ["a"], "new": ["b"], "review": ["c"]}) == {"weak": 5, "new": 3, "review": 2}
+    assert _split_slots(10, {"weak": ["a"], "new": [], "review": ["c"]}) == {"weak": 7, "review": 3}
+    assert _split_slots(10, {"weak": [], "new": [], "review": []}) == {}
+
+
+def test_daily_set_mixes_weak_review_and_new_skills(db_session, seeded_students, make_item):
+    db_session.add_all(
+        make_item(f"{skill}_d{difficulty}_{n}", skill, difficulty)
+        for skill in SKILLS
+        for difficulty in range(1, 6)
+        for n in range(4)
+    )
+    # compare mastered (review), equiv started but weak; mult_div and frac_add
+    # (prerequisites met) are new frontier skills
+    db_session.add_all([
+        _mastery("yr3_frac_compare_001", 0.95, days_ago=3),
+        _mastery("yr4_frac_equiv_001", 0.4),
+        new_schedule("jon_zhao", "yr3_frac_compare_001", datetime.now() - timedelta(days=1)),
+    ])
+    recent_item = "yr4_frac_equiv_001_d2_0"
+    db_session.add(
+        Event(
+            id="evt_recent",
+            student_id="jon_zhao",
+            item_id=recent_item,
+            answer_given="1",
+            is_correct=True,
+            time_spent=5.0,
+            hint_requested=False,
+            timestamp=datetime.now(),
+        )
+    )
+    db_session.commit()
+    item_index.rebuild(db_session)
+
+    plan = _plan_daily_set(db_session, "jon_zhao", 10)
+
+    assert len(plan["items"]) == 10
+    assert plan["mix"] == {"weak": 5, "new": 3, "review": 2}
+    assert len({item["item_id"] for item in plan["items"]}) == 10
+    by_reason = {}
+    for item in plan["items"]:
+        by_reason.setdefault(item["reason"], set()).add(item["skill"])
+        assert item["answer"] == item["correct_answer"]
+    assert by_reason["weak"] == {"yr4_frac_equiv_001"}
+    assert by_reason["review"] == {"yr3_frac_compare_001"}
+    assert by_reason["new"] == {"yr4_mult_div_001", "yr5_frac_add_001"}
+    # Weak skill at 0.4 is served at difficulty 2, avoiding the item answered today
+    weak_items = [item for item in plan["items"] if item["reason"] == "weak"]
+    assert all(item["difficulty"] == 2 for item in weak_items[:3])
+    assert recent_item not in {item["item_id"] for item in plan["items"]}
+
+    assert _plan_daily_set(db_session, "nobody", 10) is None
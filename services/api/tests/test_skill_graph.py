@@ -0,0 +1,71 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from app.item_index import item_index
+from app.models import Mastery
+from app.routers.items import _next_item_payload
+from app.routers.skills import get_skill_frontier
+from app.skill_graph import SkillGraph
+
+
+def _skill(skill_id, *prerequisites):
+    return {"skill_id": skill_id, "prerequisites": list(prerequisites)}
+
+
+def test_graph_orders_skills_and_computes_frontier_from_ancestor_bitsets():
+    graph = SkillGraph([
+        _skill("fractions_add", "fractions_equiv", "times_tables"),
+        _skill("fractions_intro"),
+        _skill("fractions_equiv", "fractions_intro"),
+        _skill("times_tables"),
+    ])
+
+    order = graph.skill_ids
+    assert order.index("fractions_intro") < order.index("fractions_equiv") < order.index("fractions_add")
+    assert graph.ancestors("fractions_add") == ["fractions_intro", "times_tables", "fractions_equiv"]
+
+    assert graph.frontier(0) == ["fractions_intro", "times_tables"]
+    mastered = graph.mask(["fractions_intro", "fractions_equiv"])
+    assert graph.frontier(mastered) == ["times_tables"]
+    # A skill with no content can't be practised, so it must not block others
+    assert graph.frontier(mastered, satisfied=graph.mask(["times_tables"])) == ["fractions_add"]
+
+
+def test_graph_rejects_cycles_and_unknown_prerequisites():
+    with pytest.raises(ValueError):
+        SkillGraph([_skill("a", "b"), _skill("b", "a")])
+    with pytest.raises(ValueError):
+        SkillGraph([_skill("a", "missing")])
+
+
+def test_next_item_moves_to_frontier_once_prerequisite_is_mastered(db_session, seeded_students, make_item):
+    db_session.add_all(
+        [make_item(f"yr3_frac_compare_001_d{d}", "yr3_frac_compare_001", d) for d in (1, 2, 3)]
+        + [make_item(f"yr4_frac_equiv_001_d{d}", "yr4_frac_equiv_001", d) for d in (1, 2, 3)]
+    )
+    db_session.commit()
+    item_index.rebuild(db_session)
+
+    # Nothing mastered: the first skill with content whose prerequisites are met
+    payload = json.loads(_next_item_payload(db_session, "jon_zhao", None))
+    assert payload["skill_id"] == "yr3_frac_compare_001"
+
+    db_session.add(
+        Mastery(
+            student_id="jon_zhao",
+            skill_id="yr3_frac_compare_001",
+            total_attempts=20,
+            correct_attempts=19,
+            mastery_score=0.95,
+            last_updated=datetime.now(),
+        )
+    )
+    db_session.commit()
+
+    payload = json.loads(_next_item_payload(db_session, "jon_zhao", None))
+    assert payload["skill_id"] == "yr4_frac_equiv_001"
+
+    frontier = get_skill_frontier("jon_zhao", db_session)
+    assert [skill["skill_id"] for skill in frontier["frontier"]] == ["yr4_frac_equiv_001"]
@@ -1,20 +1,73 @@
 """
 Generate items from templates and output to JSON
 Generates deterministic math content for MathCoach platform
+
+Every (template, difficulty, index) slot gets its own seed derived from the
+base seed, so the pack is byte-identical whatever --workers is, and any item
+can be regenerated on its own from the seed recorded in its "generator" field.
+
+Item ids are content hashes of the canonical question; repeats of a question
+already produced for the same skill are dropped as they stream in, and a
+unique-coverage table per (skill, difficulty) is printed at the end.
+
+Usage:
+  python generate_items.py [--workers 8] [--seed 0] [--items-per-difficulty 1000] [--output PATH]
+                           [--coverage-report PATH] [--formats json jsonl columnar]
 """
+import argparse
+import hashlib
 import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 from curriculum.nsw_year3_6 import get_skill_tree
+from pack_io import PACK_FORMATS, open_pack_writer
 from templates import TEMPLATES
+from templates.ids import DedupIndex
 
+DEFAULT_OUTPUT_PATH = "output/content_pack_v0.json"
+DEFAULT_SEED = 0
+# Slots per worker task; small enough to keep every worker busy on big packs
+TASK_SIZE = 500
 
-def generate_all_items():
-    """Generate items for all skills using available templates"""
-    all_items = []
-    skill_tree = get_skill_tree()
+TEMPLATES_BY_NAME = {template.__name__: template for template in TEMPLATES}
 
-    print("Starting item generation...")
-    print(f"Total skills: {len(skill_tree)}")
 
+def derive_seed(base_seed: int, template_name: str, difficulty: int, index: int) -> int:
+    """Stable 64-bit seed for one generation slot (independent of hash randomisation)."""
+    key = f"{base_seed}:{template_name}:{difficulty}:{index}".encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+
+def generate_item(template_name: str, difficulty: int, seed: int) -> dict:
+    """Generate one item from its slot seed; raises whatever the template raises."""
+    item = TEMPLATES_BY_NAME[template_name].generate(difficulty, rng=random.Random(seed))
+    item["generator"] = {"template": template_name, "seed": seed}
+    return item
+
+
+def reproduce_item(item: dict) -> dict:
+    """Regenerate `item` from the generator metadata recorded in the pack."""
+    generator = item["generator"]
+    return generate_item(generator["template"], item["difficulty"], generator["seed"])
+
+
+def _generate_slots(task):
+    """Worker entry point: generate slots [start, stop) of one template/difficulty."""
+    template_name, difficulty, start, stop, base_seed = task
+    results = []
+    for index in range(start, stop):
+        try:
+            results.append((True, generate_item(template_name, difficulty, derive_seed(base_seed, template_name, difficulty, index))))
+        except Exception as e:
+            results.append((False, str(e)))
+    return results
+
+
+def _plan_tasks(skill_tree, base_seed: int, items_per_difficulty=None):
+    tasks = []
     for skill in skill_tree:
         skill_id = skill["skill_id"]
         difficulty_levels = skill["difficulty_levels"]
@@ -30,34 +83,81 @@ def generate_all_items():
 
         for template in templates:
             for difficulty in difficulty_levels:
-                item_count = getattr(template, "items_per_difficulty", 10)
-                for i in range(item_count):
-                    try:
-                        item = template.generate(difficulty)
-                        all_items.append(item)
-                    except Exception as e:
-                        print(f"❌ Error generating item: {skill_id}, difficulty {difficulty}, template {template.__name__}")
-                        print(f"   Error: {e}")
-
-    # Save to JSON
-    output_path = "output/content_pack_v0.json"
-    with open(output_path, 'w') as f:
-        json.dump(all_items, f, indent=2)
+                item_count = items_per_difficulty or getattr(template, "items_per_difficulty", 10)
+                for start in range(0, item_count, TASK_SIZE):
+                    stop = min(start + TASK_SIZE, item_count)
+                    tasks.append((template.__name__, difficulty, start, stop, base_seed))
+    return tasks
+
+
+def generate_all_items(
+    workers: int = 1,
+    seed: int = DEFAULT_SEED,
+    output_path: str = DEFAULT_OUTPUT_PATH,
+    items_per_difficulty: int = None,
+    coverage_report_path: str = None,
+    formats=("json",),
+):
+    """Generate items for all skills using available templates"""
+    skill_tree = get_skill_tree()
 
-    print(f"\n✅ Generated {len(all_items)} items")
-    print(f"📦 Saved to {output_path}")
+    print("Starting item generation...")
+    print(f"Total skills: {len(skill_tree)}")
 
-    # Print summary
+    tasks = _plan_tasks(skill_tree, seed, items_per_difficulty)
+    started = time.perf_counter()
     skill_counts = {}
-    for item in all_items:
-        skill_id = item["skill_id"]
-        skill_counts[skill_id] = skill_counts.get(skill_id, 0) + 1
+    generated = 0
+    dedup = DedupIndex()
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        # map() yields in submission order, so the file is written in order
+        # while later tasks are still running
+        results = executor.map(_generate_slots, tasks) if executor else map(_generate_slots, tasks)
+        writers = [open_pack_writer(fmt, output_path) for fmt in formats]
+        try:
+            for (template_name, difficulty, start, _, _), task_results in zip(tasks, results):
+                for offset, (ok, value) in enumerate(task_results):
+                    if not ok:
+                        print(f"❌ Error generating item: {template_name}, difficulty {difficulty}, index {start + offset}")
+                        print(f"   Error: {value}")
+                        continue
+                    if not dedup.add(value):
+                        continue
+                    for writer in writers:
+                        writer.write(value)
+                    generated += 1
+                    skill_counts[value["skill_id"]] = skill_counts.get(value["skill_id"], 0) + 1
+        finally:
+            for writer in writers:
+                writer.close()
+    finally:
+        if executor:
+            executor.shutdown()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n✅ Generated {generated} items in {elapsed:.1f}s ({workers} worker{'s' if workers != 1 else ''})")
+    for writer in writers:
+        print(f"📦 Saved to {writer.path}")
 
     print("\n📊 Items per skill:")
     for skill_id, count in sorted(skill_counts.items()):
         print(f"  {skill_id}: {count} items")
 
-    return all_items
+    coverage = dedup.report()
+    print("\n🧮 Unique coverage (unique / generated):")
+    for row in coverage:
+        print(
+            f"  {row['skill_id']} d{row['difficulty']}: {row['unique']}/{row['generated']} "
+            f"({row['unique_ratio']:.0%}, {row['duplicates']} duplicates dropped)"
+        )
+    if coverage_report_path:
+        with open(coverage_report_path, "w") as f:
+            json.dump(coverage, f, indent=2)
+        print(f"📝 Coverage report saved to {coverage_report_path}")
+
+    return generated
 
 
 def generate_skill_tree_json():
@@ -72,7 +172,20 @@ def generate_skill_tree_json():
     print(f"   Total skills: {len(skill_tree)}")
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=1, help=f"worker processes (this machine has {os.cpu_count()})")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="base seed for every generation slot")
+    parser.add_argument("--items-per-difficulty", type=int, help="override each template's item count")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH, help="base path; each format gets its own suffix")
+    parser.add_argument("--formats", nargs="+", choices=PACK_FORMATS, default=["json"], help="pack formats to write")
+    parser.add_argument("--coverage-report", help="also write the unique-coverage table as JSON")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+
     print("=" * 60)
     print("MathCoach Content Generator v0.1")
     print("=" * 60)
@@ -83,4 +196,11 @@ if __name__ == "__main__":
     print()
 
     # Generate items
-    generate_all_items()
+    generate_all_items(
+        workers=args.workers,
+        seed=args.seed,
+        output_path=args.output,
+        items_per_difficulty=args.items_per_difficulty,
+        coverage_report_path=args.coverage_report,
+        formats=args.formats,
+    )
@@ -0,0 +1,339 @@
+"""
+Streaming readers and writers for content packs.
+
+A pack comes in one of three formats:
+- "json":     a single pretty-printed JSON array (the original format)
+- "jsonl":    one compact JSON object per line
+- "columnar": a directory with `index.json` and one `<skill_id>.json` file per
+              skill holding each field as an array
+
+JSON and JSON Lines packs are read in fixed-size chunks, so memory stays flat
+however many items a pack holds, and the raw bytes are hashed on the way
+through to give the pack version the API records in `content_packs`. A
+columnar pack only opens the files of the skills asked for, so one skill can
+be loaded without touching the rest of the pack.
+"""
+import codecs
+import hashlib
+import json
+import shutil
+import textwrap
+from pathlib import Path
+
+READ_CHUNK_SIZE = 1 << 16
+# Largest single item a JSON array pack may hold; past this the pack is malformed
+MAX_ITEM_CHARS = 1 << 22
+COLUMNAR_FORMAT = "mathcoach-columnar"
+COLUMNAR_FORMAT_VERSION = 1
+COLUMNAR_INDEX = "index.json"
+PACK_FORMATS = ("json", "jsonl", "columnar")
+
+
+def pack_path_for(output_path, fmt: str) -> Path:
+    """Where a pack in `fmt` lives, given the base output path (e.g. output/content_pack_v0.json)."""
+    base = Path(output_path).with_suffix("")
+    if fmt == "columnar":
+        return base
+    return base.with_suffix(f".{fmt}")
+
+
+class PackReader:
+    """Iterates items from a pack in any format, optionally only for some skills.
+
+    For JSON / JSON Lines the raw bytes are hashed as they stream; for a
+    columnar pack the version comes from its index.
+    """
+
+    def __init__(self, path, chunk_size: int = READ_CHUNK_SIZE, skills=None):
+        self.path = Path(path)
+        if self.path.name == COLUMNAR_INDEX:
+            self.path = self.path.parent
+        self.chunk_size = chunk_size
+        self.skills = set(skills) if skills else None
+        self._sha256 = hashlib.sha256()
+        self._index = None
+
+    @property
+    def is_columnar(self) -> bool:
+        return self.path.is_dir()
+
+    @property
+    def index(self) -> dict:
+        """The columnar pack index (skills, files, counts)."""
+        if self._index is None:
+            self._index = json.loads((self.path / COLUMNAR_INDEX).read_text())
+            if self._index.get("format") != COLUMNAR_FORMAT:
+                raise ValueError(f"Not a columnar content pack: {self.path}")
+        return self._index
+
+    @property
+    def version(self) -> str:
+        """Pack version; for JSON / JSON Lines only complete once the items have been fully iterated."""
+        if self.is_columnar:
+            return f"{self.path.name}:{self.index['sha256'][:12]}"
+        return f"{self.path.stem}:{self._sha256.hexdigest()[:12]}"
+
+    def read_skill(self, skill_id: str) -> dict:
+        """Columns of one skill from a columnar pack: {"columns": {...}, "parameters": {...}}."""
+        entry = next((entry for entry in self.index["skills"] if entry["skill_id"] == skill_id), None)
+        if entry is None:
+            raise KeyError(f"Skill not in pack: {skill_id}")
+        return json.loads((self.path / entry["file"]).read_bytes())
+
+    def _iter_columnar(self):
+        for entry in self.index["skills"]:
+            if self.skills is not None and entry["skill_id"] not in self.skills:
+                continue
+            data = self.read_skill(entry["skill_id"])
+            columns = data["columns"]
+            names = list(columns)
+            parameters = data["parameters"]
+            if "rows" in parameters:
+                parameter_rows = parameters["rows"]
+            else:
+                keys = list(parameters["columns"])
+                parameter_rows = (dict(zip(keys, values)) for values in zip(*parameters["columns"].values()))
+            for values, params in zip(zip(*columns.values()), parameter_rows):
+                item = dict(zip(names, values))
+                item["skill_id"] = data["skill_id"]
+                item["parameters"] = params
+                yield item
+
+    def _chunks(self, handle):
+        while True:
+            raw = handle.read(self.chunk_size)
+            if not raw:
+                return
+            self._sha256.update(raw)
+            yield raw
+
+    def _open(self, handle):
+        """Return (is_json_array, first non-blank chunk(s), remaining chunks)."""
+        chunks = self._chunks(handle)
+        head = b""
+        for raw in chunks:
+            head += raw
+            if head.strip():
+                break
+        return head.lstrip()[:1] == b"[", head, chunks
+
+    def __iter__(self):
+        if self.is_columnar:
+            yield from self._iter_columnar()
+            return
+        if self.skills is not None:
+            yield from (item for item in self._iter_rows() if item.get("skill_id") in self.skills)
+            return
+        yield from self._iter_rows()
+
+    def _iter_rows(self):
+        with open(self.path, "rb") as handle:
+            is_array, head, chunks = self._open(handle)
+            if is_array:
+                yield from self._iter_array(head, chunks)
+            else:
+                for block in self._iter_line_blocks(head, chunks):
+                    for line in block.split(b"\n"):
+                        if line.strip():
+                            yield json.loads(line)
+
+    def batches(self, size: int):
+        """Yield lists of up to `size` items."""
+        batch = []
+        for item in self:
+            batch.append(item)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def raw_batches(self, size: int):
+        """Like `batches`, but JSON Lines packs yield undecoded bytes blocks of about `size` lines.
+
+        Lets a process pool do the JSON decoding; decode a block with
+        `decode_block`. JSON array packs can only be split by decoding them,
+        so they (like columnar packs, or a pack read for some skills only)
+        still yield lists of items.
+        """
+        if self.is_columnar or self.skills is not None:
+            yield from self.batches(size)
+            return
+
+        with open(self.path, "rb") as handle:
+            is_array, head, chunks = self._open(handle)
+            if is_array:
+                batch = []
+                for item in self._iter_array(head, chunks):
+                    batch.append(item)
+                    if len(batch) >= size:
+                        yield batch
+                        batch = []
+                if batch:
+                    yield batch
+                return
+
+            pending = []
+            lines = 0
+            for block in self._iter_line_blocks(head, chunks):
+                pending.append(block)
+                lines += block.count(b"\n") + 1
+                if lines >= size:
+                    yield b"\n".join(pending)
+                    pending = []
+                    lines = 0
+            if pending:
+                yield b"\n".join(pending)
+
+    @staticmethod
+    def _iter_line_blocks(head: bytes, chunks):
+        """Yield runs of complete lines (without the final newline)."""
+        pending = head
+        for raw in chunks:
+            pending += raw
+            cut = pending.rfind(b"\n")
+            if cut >= 0:
+                yield pending[:cut]
+                pending = pending[cut + 1:]
+        if pending.strip():
+            yield pending
+
+    def _iter_array(self, head: bytes, chunks):
+        decoder = json.JSONDecoder()
+        # Incremental so a multi-byte character split across chunks survives
+        utf8 = codecs.getincrementaldecoder("utf-8")()
+        buffer = utf8.decode(head)
+        position = buffer.index("[") + 1
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Item straddles the chunk boundary: drop what's consumed and read on,
+                # unless no item could be this long and the pack is simply broken
+                raw = next(chunks, None)
+                if raw is None or len(buffer) - position > MAX_ITEM_CHARS:
+                    raise ValueError(f"Truncated or malformed content pack: {self.path}")
+                buffer = buffer[position:] + utf8.decode(raw)
+                position = 0
+                continue
+            yield item
+
+
+def decode_block(block) -> list:
+    """Items from a `raw_batches` entry (a bytes block of JSON lines, or already a list)."""
+    if isinstance(block, list):
+        return block
+    return [json.loads(line) for line in block.split(b"\n") if line.strip()]
+
+
+class JsonArrayWriter:
+    """Writes the same bytes as json.dump(items, f, indent=2), one item at a time."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "w")
+        self._file.write("[")
+        self.count = 0
+
+    def write(self, item: dict) -> None:
+        self._file.write(",\n" if self.count else "\n")
+        self._file.write(textwrap.indent(json.dumps(item, indent=2), "  "))
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.write("\n]" if self.count else "]")
+        self._file.close()
+
+
+class JsonLinesWriter:
+    def __init__(self, path):
+        self.path = Path(path)
+        self._file = open(self.path, "w")
+        self.count = 0
+
+    def write(self, item: dict) -> None:
+        self._file.write(json.dumps(item, separators=(",", ":")))
+        self._file.write("\n")
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ColumnarWriter:
+    """Writes a columnar pack directory. Items of one skill must arrive together."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self.path.mkdir(parents=True)
+        self.count = 0
+        self._sha256 = hashlib.sha256()
+        self._skills = []
+        self._skill_id = None
+        self._rows = []
+
+    def write(self, item: dict) -> None:
+        if item["skill_id"] != self._skill_id:
+            self._flush()
+            if any(entry["skill_id"] == item["skill_id"] for entry in self._skills):
+                raise ValueError(f"Items for skill {item['skill_id']} are not contiguous")
+            self._skill_id = item["skill_id"]
+        self._rows.append(item)
+        self.count += 1
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        rows = self._rows
+        names = [name for name in rows[0] if name not in ("skill_id", "parameters")]
+        columns = {name: [item.get(name) for item in rows] for name in names}
+
+        parameter_keys = list(rows[0]["parameters"])
+        if all(list(item["parameters"]) == parameter_keys for item in rows):
+            parameters = {"columns": {key: [item["parameters"][key] for item in rows] for key in parameter_keys}}
+        else:
+            parameters = {"rows": [item["parameters"] for item in rows]}
+
+        data = json.dumps(
+            {"skill_id": self._skill_id, "columns": columns, "parameters": parameters},
+            separators=(",", ":"),
+        ).encode()
+        file_name = f"{self._skill_id}.json"
+        (self.path / file_name).write_bytes(data)
+        self._sha256.update(data)
+        self._skills.append({
+            "skill_id": self._skill_id,
+            "file": file_name,
+            "count": len(rows),
+        })
+        self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        index = {
+            "format": COLUMNAR_FORMAT,
+            "format_version": COLUMNAR_FORMAT_VERSION,
+            "sha256": self._sha256.hexdigest(),
+            "item_count": self.count,
+            "skills": self._skills,
+        }
+        (self.path / COLUMNAR_INDEX).write_text(json.dumps(index, indent=2))
+
+
+PACK_WRITERS = {
+    "json": JsonArrayWriter,
+    "jsonl": JsonLinesWriter,
+    "columnar": ColumnarWriter,
+}
+
+
+def open_pack_writer(fmt: str, output_path):
+    """Writer for `fmt`, placed next to `output_path` (see `pack_path_for`)."""
+    return PACK_WRITERS[fmt](pack_path_for(output_path, fmt))
@@ -1,10 +1,15 @@
 """
 Fraction item templates with deterministic generation and validation
+
+Templates draw from `rng` (the global random module by default); pass a
+seeded random.Random to make an item reproducible.
 """
 import random
 from fractions import Fraction as FractionCalc
 import math
 
+from .ids import with_content_id
+
 
 class FractionComparisonTemplate:
     """Compare two fractions - which is larger?"""
@@ -12,7 +17,7 @@ class FractionComparisonTemplate:
     question_type = "fraction"
 
     @staticmethod
-    def generate(difficulty: int):
+    def generate(difficulty: int, rng=random):
         """
         Difficulty scaling:
         1: Same denominator, denominators ≤ 10
@@ -22,22 +27,22 @@ class FractionComparisonTemplate:
         5: Different denominators, requires LCM, up to 20
         """
         if difficulty == 1:
-            denom = random.randint(3, 10)
-            num1 = random.randint(1, denom - 1)
-            num2 = random.randint(1, denom - 1)
+            denom = rng.randint(3, 10)
+            num1 = rng.randint(1, denom - 1)
+            num2 = rng.randint(1, denom - 1)
             while num1 == num2:
-                num2 = random.randint(1, denom - 1)
+                num2 = rng.randint(1, denom - 1)
 
             correct = f"{max(num1, num2)}/{denom}"
             hint = "When denominators are the same, compare the numerators"
             explanation = f"Since both fractions have denominator {denom}, we compare numerators: {max(num1, num2)} > {min(num1, num2)}, so {max(num1, num2)}/{denom} is larger"
 
         elif difficulty == 2:
-            denom = random.randint(3, 20)
-            num1 = random.randint(1, denom - 1)
-            num2 = random.randint(1, denom - 1)
+            denom = rng.randint(3, 20)
+            num1 = rng.randint(1, denom - 1)
+            num2 = rng.randint(1, denom - 1)
             while num1 == num2:
-                num2 = random.randint(1, denom - 1)
+                num2 = rng.randint(1, denom - 1)
 
             correct = f"{max(num1, num2)}/{denom}"
             hint = "When denominators are the same, which numerator is larger?"
@@ -45,21 +50,21 @@ class FractionComparisonTemplate:
 
         else:  # difficulty 3-5: different denominators
             if difficulty == 3:
-                denom1 = random.randint(2, 5)
-                denom2 = denom1 * random.randint(2, 3)
+                denom1 = rng.randint(2, 5)
+                denom2 = denom1 * rng.randint(2, 3)
             elif difficulty == 4:
-                denom1 = random.randint(2, 12)
-                denom2 = random.randint(2, 12)
+                denom1 = rng.randint(2, 12)
+                denom2 = rng.randint(2, 12)
                 while denom2 == denom1:
-                    denom2 = random.randint(2, 12)
+                    denom2 = rng.randint(2, 12)
             else:  # 5
-                denom1 = random.randint(2, 20)
-                denom2 = random.randint(2, 20)
+                denom1 = rng.randint(2, 20)
+                denom2 = rng.randint(2, 20)
                 while denom2 == denom1:
-                    denom2 = random.randint(2, 20)
+                    denom2 = rng.randint(2, 20)
 
-            num1 = random.randint(1, denom1 - 1)
-            num2 = random.randint(1, denom2 - 1)
+            num1 = rng.randint(1, denom1 - 1)
+            num2 = rng.randint(1, denom2 - 1)
 
             # Use fractions library for correct comparison
             frac1 = FractionCalc(num1, denom1)
@@ -74,10 +79,7 @@ class FractionComparisonTemplate:
             lcm = (denom1 * denom2) // math.gcd(denom1, denom2)
             explanation = f"Convert to common denominator {lcm}: {num1}/{denom1} = {num1 * (lcm // denom1)}/{lcm} and {num2}/{denom2} = {num2 * (lcm // denom2)}/{lcm}. Then compare numerators."
 
-        item_id = f"{FractionComparisonTemplate.skill_id}_d{difficulty}_{random.randint(1000, 9999)}"
-
-        return {
-            "item_id": item_id,
+        return with_content_id({
             "skill_id": FractionComparisonTemplate.skill_id,
             "question_text": f"Which is larger: {num1}/{denom if difficulty <= 2 else denom1} or {num2}/{denom if difficulty <= 2 else denom2}?",
             "question_type": FractionComparisonTemplate.question_type,
@@ -92,7 +94,7 @@ class FractionComparisonTemplate:
             "hint": hint,
             "explanation": explanation,
             "validation_rule": "exact_match"
-        }
+        })
 
 
 class FractionAdditionTemplate:
@@ -101,7 +103,7 @@ class FractionAdditionTemplate:
     question_type = "fraction"
 
     @staticmethod
-    def generate(difficulty: int):
+    def generate(difficulty: int, rng=random):
         """
         Difficulty scaling:
         1: Same denominator ≤ 10, sum < 1
@@ -111,13 +113,13 @@ class FractionAdditionTemplate:
         5: Different denominators, result needs simplification
         """
         if difficulty <= 2:
-            denom = random.randint(2, 10)
+            denom = rng.randint(2, 10)
             if difficulty == 1:
-                num1 = random.randint(1, denom - 2)
-                num2 = random.randint(1, denom - num1 - 1)
+                num1 = rng.randint(1, denom - 2)
+                num2 = rng.randint(1, denom - num1 - 1)
             else:
-                num1 = random.randint(1, denom - 1)
-                num2 = random.randint(1, denom - 1)
+                num1 = rng.randint(1, denom - 1)
+                num2 = rng.randint(1, denom - 1)
 
             result_num = num1 + num2
             result_denom = denom
@@ -127,16 +129,16 @@ class FractionAdditionTemplate:
 
         else:  # different denominators
             if difficulty == 3:
-                denom1 = random.randint(2, 5)
-                denom2 = denom1 * random.randint(2, 3)
+                denom1 = rng.randint(2, 5)
+                denom2 = denom1 * rng.randint(2, 3)
             else:
-                denom1 = random.randint(2, 12)
-                denom2 = random.randint(2, 12)
+                denom1 = rng.randint(2, 12)
+                denom2 = rng.randint(2, 12)
                 while denom2 == denom1:
-                    denom2 = random.randint(2, 12)
+                    denom2 = rng.randint(2, 12)
 
-            num1 = random.randint(1, denom1 - 1)
-            num2 = random.randint(1, denom2 - 1)
+            num1 = rng.randint(1, denom1 - 1)
+            num2 = rng.randint(1, denom2 - 1)
 
             # Calculate using fractions library
             frac_result = FractionCalc(num1, denom1) + FractionCalc(num2, denom2)
@@ -155,10 +157,8 @@ class FractionAdditionTemplate:
             explanation = f"Common denominator is {result_denom}. Convert and add: ({num1 * (result_denom // denom1)} + {num2 * (result_denom // denom2)}) / {result_denom} = {result_num}/{result_denom}"
 
         correct_answer = f"{result_num}/{result_denom}"
-        item_id = f"{FractionAdditionTemplate.skill_id}_d{difficulty}_{random.randint(1000, 9999)}"
 
-        return {
-            "item_id": item_id,
+        return with_content_id({
             "skill_id": FractionAdditionTemplate.skill_id,
             "question_text": f"What is {num1}/{denom if difficulty <= 2 else denom1} + {num2}/{denom if difficulty <= 2 else denom2}?",
             "question_type": FractionAdditionTemplate.question_type,
@@ -175,7 +175,7 @@ class FractionAdditionTemplate:
             "hint": hint,
             "explanation": explanation,
             "validation_rule": "equivalent_fraction"
-        }
+        })
 
 
 class EquivalentFractionTemplate:
@@ -184,7 +184,7 @@ class EquivalentFractionTemplate:
     question_type = "fraction"
 
     @staticmethod
-    def generate(difficulty: int):
+    def generate(difficulty: int, rng=random):
         """
         Difficulty scaling:
         1: Multiply numerator and denominator by 2
@@ -193,11 +193,11 @@ class EquivalentFractionTemplate:
         4: Find missing numerator or denominator
         5: Simplify to lowest terms
         """
-        base_denom = random.randint(2, 8)
-        base_num = random.randint(1, base_denom - 1)
+        base_denom = rng.randint(2, 8)
+        base_num = rng.randint(1, base_denom - 1)
 
         if difficulty <= 3:
-            multiplier = 2 if difficulty == 1 else (random.randint(2, 3) if difficulty == 2 else random.randint(2, 6))
+            multiplier = 2 if difficulty == 1 else (rng.randint(2, 3) if difficulty == 2 else rng.randint(2, 6))
             target_num = base_num * multiplier
             target_denom = base_denom * multiplier
 
@@ -207,8 +207,8 @@ class EquivalentFractionTemplate:
             explanation = f"To get denominator {target_denom}, multiply {base_denom} by {multiplier}. Also multiply numerator: {base_num} × {multiplier} = {target_num}"
 
         elif difficulty == 4:
-            multiplier = random.randint(2, 5)
-            if random.choice([True, False]):
+            multiplier = rng.randint(2, 5)
+            if rng.choice([True, False]):
                 # Missing numerator
                 target_denom = base_denom * multiplier
                 target_num = base_num * multiplier
@@ -225,7 +225,7 @@ class EquivalentFractionTemplate:
             explanation = f"Multiply both parts by {multiplier}"
 
         else:  # difficulty == 5: simplify
-            multiplier = random.randint(2, 6)
+            multiplier = rng.randint(2, 6)
             unsimplified_num = base_num * multiplier
             unsimplified_denom = base_denom * multiplier
 
@@ -234,10 +234,7 @@ class EquivalentFractionTemplate:
             hint = "Find the greatest common divisor and divide both numerator and denominator by it"
             explanation = f"GCD of {unsimplified_num} and {unsimplified_denom} is {multiplier}. Divide both: {unsimplified_num}÷{multiplier} = {base_num}, {unsimplified_denom}÷{multiplier} = {base_denom}"
 
-        item_id = f"{EquivalentFractionTemplate.skill_id}_d{difficulty}_{random.randint(1000, 9999)}"
-
-        return {
-            "item_id": item_id,
+        return with_content_id({
             "skill_id": EquivalentFractionTemplate.skill_id,
             "question_text": question,
             "question_type": EquivalentFractionTemplate.question_type,
@@ -251,7 +248,7 @@ class EquivalentFractionTemplate:
             "hint": hint,
             "explanation": explanation,
             "validation_rule": "equivalent_fraction" if "/" in correct else "exact_match"
-        }
+        })
 
 
 # Template registry
@@ -0,0 +1,78 @@
+"""
+Content-hash item ids.
+
+An item's id is derived from its canonical question (skill, difficulty,
+question type, text, sorted parameters and answer), so the same question always
+gets the same id and two different questions practically never share one.
+"""
+import hashlib
+import json
+
+ID_DIGEST_CHARS = 12
+
+
+def canonical_key(item: dict) -> str:
+    """Stable string identifying the question an item asks, independent of key order."""
+    return json.dumps(
+        [
+            item["skill_id"],
+            item["difficulty"],
+            item["question_type"],
+            item["question_text"],
+            item["parameters"],
+            item["correct_answer"],
+        ],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+
+
+def content_digest(item: dict) -> str:
+    return hashlib.sha256(canonical_key(item).encode("utf-8")).hexdigest()
+
+
+def content_item_id(item: dict) -> str:
+    return f"{item['skill_id']}_d{item['difficulty']}_{content_digest(item)[:ID_DIGEST_CHARS]}"
+
+
+def with_content_id(item: dict) -> dict:
+    """Return `item` with its content-hash `item_id` as the first key."""
+    return {"item_id": content_item_id(item), **item}
+
+
+class DedupIndex:
+    """Per-skill set of content-hash item ids; `add` says whether an item is new.
+
+    Keys on the item's `item_id` (computed once by `with_content_id`), so the
+    canonical question isn't serialised and hashed a second time.
+    """
+
+    def __init__(self):
+        self._seen = {}
+        # (skill_id, difficulty) -> [generated, unique]
+        self.coverage = {}
+
+    def add(self, item: dict) -> bool:
+        item_id = item.get("item_id") or content_item_id(item)
+        seen = self._seen.setdefault(item["skill_id"], set())
+        counts = self.coverage.setdefault((item["skill_id"], item["difficulty"]), [0, 0])
+        counts[0] += 1
+        if item_id in seen:
+            return False
+        seen.add(item_id)
+        counts[1] += 1
+        return True
+
+    def report(self) -> list:
+        return [
+            {
+                "skill_id": skill_id,
+                "difficulty": difficulty,
+                "generated": generated,
+                "unique": unique,
+                "duplicates": generated - unique,
+                "unique_ratio": round(unique / generated, 4) if generated else 0.0,
+            }
+            for (skill_id, difficulty), (generated, unique) in sorted(self.coverage.items())
+        ]
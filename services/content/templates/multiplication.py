@@ -1,8 +1,13 @@
 """
 Multiplication fact templates (times tables) for Year 3-4 learners.
+
+Templates draw from `rng` (the global random module by default); pass a
+seeded random.Random to make an item reproducible.
 """
 import random
 
+from .ids import with_content_id
+
 
 class MultiplicationFactsTemplate:
     skill_id = "yr4_mult_div_001"
@@ -10,32 +15,30 @@ class MultiplicationFactsTemplate:
     items_per_difficulty = 25  # 4 levels * 25 = 100 items total
 
     @staticmethod
-    def generate(difficulty: int):
+    def generate(difficulty: int, rng=random):
         if difficulty == 1:
-            a = random.randint(2, 5)
-            b = random.randint(1, 10)
+            a = rng.randint(2, 5)
+            b = rng.randint(1, 10)
             hint = "Use repeated addition or skip counting."
         elif difficulty == 2:
-            a = random.randint(6, 9)
-            b = random.randint(1, 10)
+            a = rng.randint(6, 9)
+            b = rng.randint(1, 10)
             hint = "Break it into easier chunks (e.g. 7×6 = 7×5 + 7)."
         elif difficulty == 3:
-            a = random.randint(2, 12)
-            b = random.randint(6, 12)
+            a = rng.randint(2, 12)
+            b = rng.randint(6, 12)
             hint = "Recall times-table patterns and commutative property."
         else:
-            a = random.randint(11, 20)
-            b = random.randint(2, 9)
+            a = rng.randint(11, 20)
+            b = rng.randint(2, 9)
             hint = "Split by place value: 14×6 = (10×6) + (4×6)."
 
-        if random.choice([True, False]):
+        if rng.choice([True, False]):
             a, b = b, a
 
         answer = a * b
-        item_id = f"{MultiplicationFactsTemplate.skill_id}_d{difficulty}_{random.randint(1000, 9999)}"
 
-        return {
-            "item_id": item_id,
+        return with_content_id({
             "skill_id": MultiplicationFactsTemplate.skill_id,
             "question_text": f"What is {a} × {b}?",
             "question_type": MultiplicationFactsTemplate.question_type,
@@ -45,7 +48,7 @@ class MultiplicationFactsTemplate:
             "hint": hint,
             "explanation": f"{a} × {b} = {answer}",
             "validation_rule": "numeric",
-        }
+        })
 
 
 TEMPLATES = [MultiplicationFactsTemplate]
@@ -1,162 +1,297 @@
 """
 Validate generated items by recomputing answers
 Ensures all items have correct, deterministic answers
-"""
-import json
-from fractions import Fraction
-import math
-
-
-def validate_fraction_comparison(item):
-    """Validate fraction comparison item"""
-    params = item["parameters"]
-    num1 = params["num1"]
-    num2 = params["num2"]
-    denom1 = params["denom1"]
-    denom2 = params["denom2"]
-
-    frac1 = Fraction(num1, denom1)
-    frac2 = Fraction(num2, denom2)
-
-    if frac1 > frac2:
-        expected = f"{num1}/{denom1}"
-    else:
-        expected = f"{num2}/{denom2}"
-
-    return expected
-
-
-def validate_fraction_addition(item):
-    """Validate fraction addition item"""
-    params = item["parameters"]
-
-    # Recompute the answer
-    num1 = params["num1"]
-    num2 = params["num2"]
-    denom1 = params["denom1"]
-    denom2 = params["denom2"]
-
-    result = Fraction(num1, denom1) + Fraction(num2, denom2)
-
-    # Check if stored result matches
-    stored_result = Fraction(params["result_num"], params["result_denom"])
-
-    if result != stored_result:
-        return None  # Invalid
-
-    return f"{params['result_num']}/{params['result_denom']}"
-
-
-def validate_equivalent_fraction(item):
-    """Validate equivalent fraction item"""
-    params = item["parameters"]
-    base_num = params["base_num"]
-    base_denom = params["base_denom"]
-    multiplier = params.get("multiplier", 1)
-
-    # The correct answer should be equivalent to base fraction
-    correct = item["correct_answer"]
-
-    if "/" in correct:
-        # It's a fraction
-        parts = correct.split("/")
-        result_num = int(parts[0])
-        result_denom = int(parts[1])
-
-        frac1 = Fraction(base_num, base_denom)
-        frac2 = Fraction(result_num, result_denom)
 
-        if frac1 != frac2:
-            return None  # Not equivalent
+Validators are registered per template (keyed by its skill_id) and check a
+whole column of items at once: parameters become NumPy integer arrays and
+fractions are compared by cross-multiplication, so no per-item Fraction
+objects are built. Packs are streamed in batches; with --workers the batches
+(and, for JSON Lines packs, their JSON decoding) are spread over a process
+pool. Results are summarised on stdout, and written as a JSON report when
+--report is given.
 
-    return correct
-
-
-def validate_item(item):
-    """Validate a single item based on its question type and skill"""
-    skill_id = item["skill_id"]
+Usage:
+  python validate_items.py [PACK] [--workers 8] [--batch-size 50000] [--report PATH] [--skills ID ...]
 
+PACK may be a JSON array, a JSON Lines file or a columnar pack directory.
+"""
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from pack_io import PackReader, decode_block
+from templates.fractions import EquivalentFractionTemplate, FractionAdditionTemplate, FractionComparisonTemplate
+from templates.multiplication import MultiplicationFactsTemplate
+
+DEFAULT_PACK_PATH = "output/content_pack_v0.json"
+DEFAULT_BATCH_SIZE = 50000
+
+# skill_id -> (validator, parameter names it needs as integer columns)
+VALIDATORS = {}
+
+
+def register(template, params):
+    """Register a column validator for every item of `template.skill_id`.
+
+    The validator is called as `fn(columns, items)` where `columns` maps each
+    name in `params` (plus "answer_num", "answer_den", "answer_is_fraction",
+    "answer_parsed") to an array with one entry per item. It returns a bool
+    array of valid rows and a function giving the expected answer for a row.
+    """
+    def decorator(fn):
+        VALIDATORS[template.skill_id] = (fn, tuple(params))
+        return fn
+    return decorator
+
+
+def _parse_ints(column):
+    """(values, ok) for a string array of optionally negative decimal integers."""
+    column = np.char.strip(column)
+    negative = np.char.startswith(column, "-")
+    ok = np.char.isdecimal(np.where(negative, np.char.replace(column, "-", "", 1), column))
+    values = np.zeros(len(column), dtype=np.int64)
+    values[ok] = column[ok].astype(np.int64)
+    return values, ok
+
+
+def parse_answers(answers):
+    """Split "a/b" or "a" answers into integer columns; unparseable rows get parsed=False."""
+    if not len(answers):
+        # np.char.partition can't size its output for an empty array
+        ints, flags = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)
+        return {"answer_num": ints, "answer_den": ints, "answer_is_fraction": flags, "answer_parsed": flags}
+    parts = np.char.partition(np.array([str(answer) for answer in answers]), "/")
+    num, num_ok = _parse_ints(parts[:, 0])
+    den, den_ok = _parse_ints(parts[:, 2])
+    has_slash = parts[:, 1] == "/"
+    parsed = num_ok & (den_ok | ~has_slash)
+    is_fraction = has_slash & parsed
+    den[~is_fraction] = 1
+    return {"answer_num": num, "answer_den": den, "answer_is_fraction": is_fraction, "answer_parsed": parsed}
+
+
+@register(FractionComparisonTemplate, params=("num1", "denom1", "num2", "denom2"))
+def validate_fraction_comparison(columns, items):
+    """The answer must be the larger fraction, written as given (ties expect the second)."""
+    first_larger = columns["num1"] * columns["denom2"] > columns["num2"] * columns["denom1"]
+    expected_num = np.where(first_larger, columns["num1"], columns["num2"])
+    expected_den = np.where(first_larger, columns["denom1"], columns["denom2"])
+    valid = (
+        columns["answer_parsed"]
+        & columns["answer_is_fraction"]
+        & (columns["answer_num"] == expected_num)
+        & (columns["answer_den"] == expected_den)
+    )
+    return valid, lambda row: f"{expected_num[row]}/{expected_den[row]}"
+
+
+@register(FractionAdditionTemplate, params=("num1", "denom1", "num2", "denom2", "result_num", "result_denom"))
+def validate_fraction_addition(columns, items):
+    """Stored result must equal the sum, and the answer must match it (or be equivalent)."""
+    sum_num = columns["num1"] * columns["denom2"] + columns["num2"] * columns["denom1"]
+    sum_den = columns["denom1"] * columns["denom2"]
+    result_num, result_den = columns["result_num"], columns["result_denom"]
+    stored_ok = result_num * sum_den == sum_num * result_den
+
+    answer_num, answer_den = columns["answer_num"], columns["answer_den"]
+    equivalent = np.fromiter(
+        (item.get("validation_rule") == "equivalent_fraction" for item in items), dtype=bool, count=len(items)
+    )
+    answer_ok = np.where(
+        equivalent,
+        answer_num * result_den == result_num * answer_den,
+        (answer_num == result_num) & (answer_den == result_den),
+    )
+    valid = columns["answer_parsed"] & columns["answer_is_fraction"] & stored_ok & answer_ok
+    return valid, lambda row: f"{result_num[row]}/{result_den[row]}" if stored_ok[row] else "N/A"
+
+
+@register(EquivalentFractionTemplate, params=("base_num", "base_denom", "multiplier"))
+def validate_equivalent_fraction(columns, items):
+    """Fraction answers must equal the base fraction; missing-value answers must be base × multiplier."""
+    base_num, base_den, multiplier = columns["base_num"], columns["base_denom"], columns["multiplier"]
+    missing_numerator = np.fromiter(
+        ("missing numerator" in item["question_text"] for item in items), dtype=bool, count=len(items)
+    )
+    expected_whole = np.where(missing_numerator, base_num, base_den) * multiplier
+
+    answer_num, answer_den = columns["answer_num"], columns["answer_den"]
+    valid = columns["answer_parsed"] & np.where(
+        columns["answer_is_fraction"],
+        answer_num * base_den == base_num * answer_den,
+        answer_num == expected_whole,
+    )
+
+    def expected(row):
+        if columns["answer_is_fraction"][row]:
+            return f"equivalent to {base_num[row]}/{base_den[row]}"
+        return str(expected_whole[row])
+
+    return valid, expected
+
+
+@register(MultiplicationFactsTemplate, params=("a", "b"))
+def validate_multiplication_facts(columns, items):
+    product = columns["a"] * columns["b"]
+    valid = columns["answer_parsed"] & ~columns["answer_is_fraction"] & (columns["answer_num"] == product)
+    return valid, lambda row: str(product[row])
+
+
+def _extract_columns(items, params):
+    """Integer parameter columns; returns (columns, rows kept, [(row, error)])."""
     try:
-        if "compare" in skill_id:
-            expected = validate_fraction_comparison(item)
-        elif "add" in skill_id:
-            expected = validate_fraction_addition(item)
-        elif "equiv" in skill_id:
-            expected = validate_equivalent_fraction(item)
-        else:
-            # Unknown type - skip validation
-            return {"status": "skipped", "reason": "Unknown skill type"}
-
-        if expected is None:
-            return {"status": "invalid", "expected": "N/A", "actual": item["correct_answer"]}
-
-        # Check equivalence for fractions
-        if item.get("validation_rule") == "equivalent_fraction" and "/" in expected and "/" in item["correct_answer"]:
-            expected_frac = Fraction(expected.split("/")[0], expected.split("/")[1])
-            actual_frac = Fraction(item["correct_answer"].split("/")[0], item["correct_answer"].split("/")[1])
-
-            if expected_frac == actual_frac:
-                return {"status": "valid"}
-            else:
-                return {"status": "invalid", "expected": expected, "actual": item["correct_answer"]}
-
-        # Exact match
-        if expected == item["correct_answer"]:
-            return {"status": "valid"}
-        else:
-            return {"status": "invalid", "expected": expected, "actual": item["correct_answer"]}
-
-    except Exception as e:
-        return {"status": "error", "error": str(e)}
-
-
-def validate_content_pack():
+        columns = {
+            name: np.fromiter((item["parameters"][name] for item in items), dtype=np.int64, count=len(items))
+            for name in params
+        }
+        return columns, list(range(len(items))), []
+    except (KeyError, TypeError, ValueError):
+        pass
+
+    # Slow path only for batches that contain a malformed item
+    kept, errors = [], []
+    for row, item in enumerate(items):
+        try:
+            [int(item["parameters"][name]) for name in params]
+            kept.append(row)
+        except (KeyError, TypeError, ValueError) as e:
+            errors.append((row, f"bad parameters: {e!r}"))
+    good_items = [items[row] for row in kept]
+    columns = {
+        name: np.fromiter((int(item["parameters"][name]) for item in good_items), dtype=np.int64, count=len(good_items))
+        for name in params
+    }
+    return columns, kept, errors
+
+
+def _empty_counts():
+    return {"total": 0, "valid": 0, "invalid": 0, "errors": 0, "skipped": 0}
+
+
+def validate_batch(items) -> dict:
+    """Validate a list of items (or a raw JSON Lines block) and return a partial report."""
+    items = decode_block(items)
+    report = {"per_skill": {}, "invalid_items": [], "error_items": []}
+
+    by_skill = {}
+    for item in items:
+        by_skill.setdefault(item.get("skill_id"), []).append(item)
+
+    for skill_id, skill_items in by_skill.items():
+        counts = report["per_skill"].setdefault(skill_id, _empty_counts())
+        counts["total"] += len(skill_items)
+
+        if skill_id not in VALIDATORS:
+            counts["skipped"] += len(skill_items)
+            continue
+
+        validator, params = VALIDATORS[skill_id]
+        columns, kept, errors = _extract_columns(skill_items, params)
+        for row, error in errors:
+            report["error_items"].append({"item_id": skill_items[row].get("item_id"), "error": error})
+        counts["errors"] += len(errors)
+
+        kept_items = [skill_items[row] for row in kept]
+        columns.update(parse_answers([item.get("correct_answer") for item in kept_items]))
+        try:
+            valid, expected = validator(columns, kept_items)
+        except Exception as e:
+            counts["errors"] += len(kept_items)
+            report["error_items"].extend({"item_id": item.get("item_id"), "error": str(e)} for item in kept_items)
+            continue
+
+        counts["valid"] += int(valid.sum())
+        for row in np.flatnonzero(~valid):
+            item = kept_items[row]
+            report["invalid_items"].append({
+                "item_id": item["item_id"],
+                "skill_id": skill_id,
+                "expected": expected(row),
+                "actual": item.get("correct_answer"),
+                "parameters": item["parameters"],
+            })
+        counts["invalid"] += int(len(valid) - valid.sum())
+
+    return report
+
+
+def _merge(report, partial):
+    for skill_id, counts in partial["per_skill"].items():
+        merged = report["per_skill"].setdefault(skill_id, _empty_counts())
+        for key, value in counts.items():
+            merged[key] += value
+    report["invalid_items"].extend(partial["invalid_items"])
+    report["error_items"].extend(partial["error_items"])
+
+
+def _run_batches(batches, workers: int):
+    """Yield partial reports, keeping at most 2 batches per worker in flight."""
+    if workers <= 1:
+        for batch in batches:
+            yield validate_batch(batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(validate_batch, batch))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def validate_content_pack(
+    pack_path: str = DEFAULT_PACK_PATH,
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    report_path: str = None,
+    skills=None,
+):
     """Validate all items in content pack"""
     print("=" * 60)
     print("MathCoach Content Validator v0.1")
     print("=" * 60)
     print()
 
-    with open('output/content_pack_v0.json') as f:
-        items = json.load(f)
-
-    print(f"Validating {len(items)} items...")
+    print(f"Validating {pack_path} ({workers} worker{'s' if workers != 1 else ''})...")
     print()
 
-    invalid_items = []
-    error_items = []
-    skipped_items = []
-    valid_count = 0
-
-    for item in items:
-        result = validate_item(item)
-
-        if result["status"] == "valid":
-            valid_count += 1
-        elif result["status"] == "invalid":
-            invalid_items.append({
-                "item_id": item["item_id"],
-                "skill_id": item["skill_id"],
-                "expected": result.get("expected"),
-                "actual": result.get("actual"),
-                "parameters": item["parameters"]
-            })
-        elif result["status"] == "error":
-            error_items.append({
-                "item_id": item["item_id"],
-                "error": result["error"]
-            })
-        elif result["status"] == "skipped":
-            skipped_items.append({
-                "item_id": item["item_id"],
-                "reason": result["reason"]
-            })
+    started = time.perf_counter()
+    reader = PackReader(pack_path, skills=skills)
+    report = {"per_skill": {}, "invalid_items": [], "error_items": []}
+    batches = reader.raw_batches(batch_size) if workers > 1 else reader.batches(batch_size)
+    for partial in _run_batches(batches, workers):
+        _merge(report, partial)
+    elapsed = time.perf_counter() - started
+
+    totals = _empty_counts()
+    for counts in report["per_skill"].values():
+        for key, value in counts.items():
+            totals[key] += value
+    report = {
+        "pack": str(pack_path),
+        "version": reader.version,
+        "elapsed_seconds": round(elapsed, 3),
+        "items_per_second": round(totals["total"] / elapsed, 1) if elapsed else 0.0,
+        "totals": totals,
+        **report,
+    }
+
+    invalid_items = report["invalid_items"]
+    error_items = report["error_items"]
 
     # Print results
-    print(f"✅ Valid items: {valid_count}/{len(items)}")
+    print(f"✅ Valid items: {totals['valid']}/{totals['total']} ({report['items_per_second']:,.0f} items/sec)")
 
-    if skipped_items:
-        print(f"⏭️  Skipped: {len(skipped_items)} items")
+    if totals["skipped"]:
+        skipped_skills = [skill for skill, counts in report["per_skill"].items() if counts["skipped"]]
+        print(f"⏭️  Skipped: {totals['skipped']} items (no validator for {', '.join(map(str, skipped_skills))})")
 
     if error_items:
         print(f"\n⚠️  Errors: {len(error_items)} items")
@@ -179,9 +314,31 @@ def validate_content_pack():
     else:
         print("\n🎉 All items validated successfully!")
 
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report saved to {report_path}")
+
     return len(invalid_items) == 0 and len(error_items) == 0
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pack", nargs="?", default=DEFAULT_PACK_PATH, help="JSON array or JSON Lines pack")
+    parser.add_argument("--workers", type=int, default=1, help=f"worker processes (this machine has {os.cpu_count()})")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="items per validation batch")
+    parser.add_argument("--report", help="also write the full report as JSON to this path")
+    parser.add_argument("--skills", nargs="+", help="only validate these skill ids")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    success = validate_content_pack()
+    args = parse_args()
+    success = validate_content_pack(
+        args.pack,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        report_path=args.report,
+        skills=args.skills,
+    )
     exit(0 if success else 1)